@@ -1,6 +1,7 @@
 from tkintertester import harness
 
 from patchboard_atlas import gui_scaffold
+from patchboard_atlas import log
 
 
 def register_gui_scaffold_tests():
@@ -20,6 +21,16 @@ def register_gui_scaffold_tests():
         ],
     )
 
+    harness.add_test(
+        "gui scaffold console streams log",
+        [
+            step_open_console,
+            step_log_console_record,
+            step_check_console_shows_record,
+            step_close_console,
+        ],
+    )
+
     harness.add_test(
         "gui scaffold status",
         [
@@ -78,6 +89,20 @@ def step_close_console():
     return ("next", None)
 
 
+def step_log_console_record():
+    log.log("guitest", "console feed probe")
+    return ("next", 400)
+
+
+def step_check_console_shows_record():
+    output = gui_scaffold.widgets.get("console-output")
+    if output is None or not output.winfo_exists():
+        return ("fail", "missing console-output")
+    if "console feed probe" not in output.get("1.0", "end"):
+        return ("fail", "console did not show new log record")
+    return ("next", None)
+
+
 def step_set_status_foreground():
     gui_scaffold.set_status("Ready.", gui_scaffold.FOREGROUND)
     return ("next", None)
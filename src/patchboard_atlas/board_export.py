@@ -0,0 +1,303 @@
+"""
+Headless board export for Patchboard Atlas: render intent -> SVG / PNG.
+
+Render intent descriptors (see rendering.py) are streamed to the output
+file CHUNK owners at a time, so no Tk canvas, display or full-board
+postscript pass is needed:
+
+  iter_world_descriptors()   world -> descriptors, built chunk by chunk
+                             with the normal rules, using RENDER as
+                             scratch space (headless only: it clears RENDER).
+  iter_render_descriptors()  the live RENDER dict, for a running GUI.
+
+Wires are emitted before components so components paint on top, as on
+the canvas (lines are tag_lower'd there).  Coordinates are world units;
+the SVG viewBox is the placed bounds plus MARGIN.
+
+PNG output uses a small pure-Python rasterizer: filled/outlined
+rectangles and polylines only -- titles are not drawn, since there is
+no font rasterizer without Tk.  The pixel buffer is capped at
+PNG_MAX_PX per side (the scale shrinks to fit); rows are compressed
+and written as IDAT chunks incrementally.
+"""
+
+import math
+import os
+import struct
+import zlib
+from xml.sax.saxutils import escape, quoteattr
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import rendering
+
+
+CHUNK = 2000         # owners per descriptor batch
+MARGIN = 40          # world units around the placed bounds
+BACKGROUND = "#dddddd"
+PNG_MAX_PX = 4096
+
+
+# ============================================================
+# DESCRIPTOR SOURCES
+# ============================================================
+
+def export_bounds():
+    """(x0, y0, x1, y1) world box covering every placed component, or None."""
+    bounds = None
+    for _eid, x, y in ecs.cmp_spatial.iter_xy():
+        if bounds is None:
+            bounds = [x, y, x, y]
+        else:
+            bounds[0] = min(bounds[0], x)
+            bounds[1] = min(bounds[1], y)
+            bounds[2] = max(bounds[2], x)
+            bounds[3] = max(bounds[3], y)
+    if bounds is None:
+        return None
+    half_w = rendering.COMPONENT_W // 2 + MARGIN
+    half_h = rendering.COMPONENT_H // 2 + MARGIN
+    return (bounds[0] - half_w, bounds[1] - half_h, bounds[2] + half_w, bounds[3] + half_h)
+
+
+def _drain_scratch():
+    batch = list(rendering.RENDER.values())
+    rendering.RENDER.clear()
+    rendering.RENDER_OWNED.clear()
+    return batch
+
+
+def iter_world_descriptors(chunk=CHUNK):
+    """Yield descriptor lists for the whole world, wires first.
+
+    Only idx_placed_inbox (one entry per placed entity) lives for the
+    whole pass; RENDER and the anchor cache hold at most one chunk.
+    """
+    rendering.reset_rendering()
+    eids = ecs.query("entities", "spatial")
+    for eid in eids:
+        anchors = rendering.channel_anchors(eid)
+        if anchors is not None:
+            rendering.idx_placed_inbox[anchors["inbox-key"]] = eid
+    rendering.g_anchor_cache.clear()
+
+    pending = 0
+    for wire_id in ecs.cmp_wires:
+        pending += rendering.emit_wire(wire_id)
+        if pending >= chunk:
+            yield _drain_scratch()
+            rendering.g_anchor_cache.clear()
+            pending = 0
+    if pending:
+        yield _drain_scratch()
+
+    for start in range(0, len(eids), chunk):
+        for eid in eids[start:start + chunk]:
+            spatial = ecs.cmp_spatial[eid]
+            for rule in rendering.RULES:
+                rule(eid, spatial["x"], spatial["y"])
+        yield _drain_scratch()
+    rendering.reset_rendering()
+
+
+def iter_render_descriptors(chunk=CHUNK):
+    """Yield descriptor lists from the live RENDER dict, wires first."""
+    for kind in ("wire", "entity"):
+        batch = []
+        for ek, desc in rendering.RENDER.items():
+            if ek[0] == kind:
+                batch.append(desc)
+                if len(batch) >= chunk:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+
+# ============================================================
+# SVG
+# ============================================================
+
+def _svg_font(font):
+    family, size = font[0], font[1]
+    return f'font-family={quoteattr(family)} font-size="{size}pt"'
+
+
+def svg_element(desc):
+    """One SVG element string for a render descriptor."""
+    kind = desc["type"]
+    if kind == "rectangle":
+        return (f'<rect x="{desc["x0"]}" y="{desc["y0"]}" '
+                f'width="{desc["x1"] - desc["x0"]}" height="{desc["y1"] - desc["y0"]}" '
+                f'fill={quoteattr(desc["fill"])} stroke={quoteattr(desc["outline"])} '
+                f'stroke-width="{desc["width"]}"/>')
+    if kind == "text":
+        return (f'<text x="{desc["x"]}" y="{desc["y"]}" fill={quoteattr(desc["fill"])} '
+                f'{_svg_font(desc["font"])} text-anchor="middle" dominant-baseline="central">'
+                f'{escape(desc["text"])}</text>')
+    if kind == "line":
+        points = " ".join(f"{x},{y}" for x, y in zip(desc["coords"][0::2], desc["coords"][1::2]))
+        return (f'<polyline points="{points}" fill="none" stroke={quoteattr(desc["fill"])} '
+                f'stroke-width="{desc["width"]}"/>')
+    raise ValueError(f"svg_element: unknown type '{kind}'")
+
+
+def write_svg(fh, batches, bounds):
+    """Stream an SVG document for bounds and descriptor batches to a text file."""
+    x0, y0, x1, y1 = bounds
+    fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    fh.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x0} {y0} {x1 - x0} {y1 - y0}" '
+             f'width="{x1 - x0}" height="{y1 - y0}">\n')
+    fh.write(f'<rect x="{x0}" y="{y0}" width="{x1 - x0}" height="{y1 - y0}" fill="{BACKGROUND}"/>\n')
+    count = 0
+    for batch in batches:
+        fh.write("\n".join(svg_element(desc) for desc in batch))
+        fh.write("\n")
+        count += len(batch)
+    fh.write("</svg>\n")
+    return count
+
+
+# ============================================================
+# PNG (pure-Python rasterizer)
+# ============================================================
+
+def parse_color(color, default=(136, 136, 136)):
+    """(r, g, b) for "#rgb" / "#rrggbb"; default for anything else (Tk color names)."""
+    if isinstance(color, str) and color.startswith("#"):
+        digits = color[1:]
+        if len(digits) == 3:
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) == 6:
+            try:
+                return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+            except ValueError:
+                pass
+    return default
+
+
+class Raster:
+    """RGB pixel buffer in world coordinates: px = (wx - x0) * scale."""
+
+    def __init__(self, bounds, scale):
+        x0, y0, x1, y1 = bounds
+        scale = min(scale, PNG_MAX_PX / max(1, x1 - x0), PNG_MAX_PX / max(1, y1 - y0))
+        self.x0 = x0
+        self.y0 = y0
+        self.scale = scale
+        self.width = max(1, math.ceil((x1 - x0) * scale))
+        self.height = max(1, math.ceil((y1 - y0) * scale))
+        self.pixels = bytearray(bytes(parse_color(BACKGROUND)) * (self.width * self.height))
+
+    def _px(self, wx, wy):
+        return (wx - self.x0) * self.scale, (wy - self.y0) * self.scale
+
+    def fill_px(self, px0, py0, px1, py1, rgb):
+        """Fill the pixel box [px0, px1) x [py0, py1), clipped."""
+        px0 = max(0, int(px0))
+        py0 = max(0, int(py0))
+        px1 = min(self.width, int(math.ceil(px1)))
+        py1 = min(self.height, int(math.ceil(py1)))
+        if px0 >= px1 or py0 >= py1:
+            return
+        run = bytes(rgb) * (px1 - px0)
+        for py in range(py0, py1):
+            start = (py * self.width + px0) * 3
+            self.pixels[start:start + len(run)] = run
+
+    def rectangle(self, desc):
+        px0, py0 = self._px(desc["x0"], desc["y0"])
+        px1, py1 = self._px(desc["x1"], desc["y1"])
+        self.fill_px(px0, py0, px1, py1, parse_color(desc["fill"]))
+        w = max(1.0, desc["width"] * self.scale)
+        outline = parse_color(desc["outline"])
+        self.fill_px(px0, py0, px1, py0 + w, outline)
+        self.fill_px(px0, py1 - w, px1, py1, outline)
+        self.fill_px(px0, py0, px0 + w, py1, outline)
+        self.fill_px(px1 - w, py0, px1, py1, outline)
+
+    def line(self, desc):
+        rgb = parse_color(desc["fill"])
+        half = max(1.0, desc["width"] * self.scale) / 2
+        coords = desc["coords"]
+        for i in range(0, len(coords) - 2, 2):
+            ax, ay = self._px(coords[i], coords[i + 1])
+            bx, by = self._px(coords[i + 2], coords[i + 3])
+            if ax == bx or ay == by:
+                self.fill_px(min(ax, bx) - half, min(ay, by) - half,
+                             max(ax, bx) + half, max(ay, by) + half, rgb)
+                continue
+            steps = int(max(abs(bx - ax), abs(by - ay))) + 1
+            for s in range(steps + 1):
+                t = s / steps
+                x = ax + (bx - ax) * t
+                y = ay + (by - ay) * t
+                self.fill_px(x - half, y - half, x + half, y + half, rgb)
+
+    def draw(self, desc):
+        if desc["type"] == "rectangle":
+            self.rectangle(desc)
+        elif desc["type"] == "line":
+            self.line(desc)
+
+
+def _png_chunk(fh, tag, data):
+    fh.write(struct.pack(">I", len(data)))
+    fh.write(tag)
+    fh.write(data)
+    fh.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def write_png(fh, batches, bounds, scale=1.0):
+    """Rasterize descriptor batches and write an RGB PNG to a binary file."""
+    raster = Raster(bounds, scale)
+    count = 0
+    for batch in batches:
+        for desc in batch:
+            raster.draw(desc)
+        count += len(batch)
+
+    fh.write(b"\x89PNG\r\n\x1a\n")
+    _png_chunk(fh, b"IHDR", struct.pack(">IIBBBBB", raster.width, raster.height, 8, 2, 0, 0, 0))
+    compressor = zlib.compressobj(6)
+    stride = raster.width * 3
+    for py in range(raster.height):
+        data = compressor.compress(b"\x00" + raster.pixels[py * stride:(py + 1) * stride])
+        if data:
+            _png_chunk(fh, b"IDAT", data)
+    _png_chunk(fh, b"IDAT", compressor.flush())
+    _png_chunk(fh, b"IEND", b"")
+    return count
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def export_board(path, batches=None, scale=1.0):
+    """
+    Write the board to path (.svg, or .png); returns the element count.
+
+    batches defaults to iter_world_descriptors() (headless).  The file is
+    written to a temp name and renamed into place.  Raises ValueError
+    for an unsupported suffix or an empty board.
+    """
+    path = os.fspath(path)
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in (".svg", ".png"):
+        raise ValueError(f"export_board: unsupported format '{suffix}' (use .svg or .png)")
+    bounds = export_bounds()
+    if bounds is None:
+        raise ValueError("export_board: no placed components to export")
+    if batches is None:
+        batches = iter_world_descriptors()
+
+    dirpath, name = os.path.split(path)
+    tmp_path = os.path.join(dirpath, f".{name}.tmp")
+    if suffix == ".svg":
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as fh:
+            count = write_svg(fh, batches, bounds)
+    else:
+        with open(tmp_path, "wb") as fh:
+            count = write_png(fh, batches, bounds, scale)
+    os.replace(tmp_path, path)
+    return count
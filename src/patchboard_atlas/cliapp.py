@@ -1,40 +1,107 @@
 """
 Patchboard Atlas CLI entrypoint (lionscliapp).
+
+Only lionscliapp is imported at module load.  Tk, tkintertester and the
+GUI/runtime modules are imported inside the command that needs them, so
+invocations that never open the GUI do not pay for them
+(see test/test_import_time.py).
 """
 
 import sys
 from pathlib import Path
 
 import lionscliapp as app
-from tkintertester import harness
-
-from patchboard_atlas import gui_scaffold
-from patchboard_atlas import startup
-from patchboard_atlas.reset import reset
 
 
 def run():
     """
     Default command (no subcommand).
     """
+    from tkintertester import harness
+    from patchboard_atlas import log
+    from patchboard_atlas import gui_scaffold
+    from patchboard_atlas import log_sink
+    from patchboard_atlas import folder_watch
+    from patchboard_atlas import drop_folder
+    from patchboard_atlas import filetalk_writer
+    from patchboard_atlas import router_observer
+    from patchboard_atlas import workspace
+    from patchboard_atlas import persist_queue
+    from patchboard_atlas import profiling
+
+    harness.set_resetfn(app_reset)
     flags = ""
 
+    if app.ctx["runtime.profile"]:
+        profiling.enable_profiling()
+    if app.ctx["runtime.profile.capture"]:
+        profiling.start_capture()
+
     if app.ctx["runtime.testing"]:
         gui_scaffold.g["quit-on-close"] = False
         register_tests()
         flags += "x"
 
-    harness.run_host(app_entry, flags)
+    log_sink.start_log_sink()
+    try:
+        harness.run_host(app_entry, flags)
+    finally:
+        if not app.ctx["runtime.testing"]:
+            try:
+                workspace.flush_workspace()
+            except OSError as exc:
+                log.log("workspace", f"Workspace save failed: {exc}", "e")
+        router_observer.stop_observer_thread()
+        filetalk_writer.stop_filetalk_writer()
+        drop_folder.stop_drop_thread()
+        folder_watch.stop_watch_thread()
+        persist_queue.stop_persist_queue()
+        profiling.stop_capture()
+        if profiling.g["enabled"]:
+            profiling.export_json()
+        log_sink.stop_log_sink()
 
     if app.ctx["runtime.testing"]:
         harness.print_results()
 
 
+def export():
+    """
+    "export" command: write the board to execpath.export.out (.svg or .png)
+    without opening a window.  Wires come from the router's routes.json
+    (path.router.routes, else beside path.router.outbox).
+    """
+    from patchboard_atlas import workspace
+    from patchboard_atlas import board_export
+    from patchboard_atlas import router_observer
+    from patchboard_atlas import router_projection
+
+    out = app.ctx["execpath.export.out"]
+    workspace.restore_snapshot()
+    routes_path = app.ctx.get("path.router.routes")
+    if routes_path is None and app.ctx.get("path.router.outbox") is not None:
+        routes_path = router_observer.default_routes_path(app.ctx["path.router.outbox"])
+    if routes_path is not None:
+        router_projection.reload_routes(routes_path)
+    try:
+        count = board_export.export_board(out, scale=float(app.ctx["export.scale"]))
+    except (ValueError, OSError) as exc:
+        print(f"patchboard-atlas: export failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+    print(f"patchboard-atlas: exported {count} elements to {out}")
+
+
 def app_entry():
     """
     Create the GUI application instance and perform startup load.
     """
+    from tkintertester import harness
+    from patchboard_atlas import gui_scaffold
+    from patchboard_atlas import startup
+    from patchboard_atlas import frame_monitor
+
     gui_scaffold.create_gui(harness.g["root"])
+    frame_monitor.g["enabled"] = bool(app.ctx["runtime.frame-monitor"])
     startup.startup_load()
 
 
@@ -42,6 +109,9 @@ def app_reset():
     """
     Tear down the GUI application instance between tests.
     """
+    from patchboard_atlas import gui_scaffold
+    from patchboard_atlas.reset import reset
+
     gui_scaffold.destroy_gui()
     reset()
 
@@ -79,10 +149,17 @@ def main():
 
     app.declare_key("path.router.inbox", None)
     app.declare_key("path.router.outbox", None)
+    app.declare_key("path.router.routes", None)
+    app.declare_key("path.import.dropfolder", None)
     app.declare_key("runtime.testing", False)
+    app.declare_key("runtime.profile", False)
+    app.declare_key("runtime.profile.capture", False)
+    app.declare_key("runtime.frame-monitor", False)
+    app.declare_key("execpath.export.out", "board.svg")
+    app.declare_key("export.scale", 1.0)
 
     app.declare_cmd("", run)
-
-    harness.set_resetfn(app_reset)
+    app.declare_cmd("export", export)
+    app.describe_cmd("export", "Write the board to execpath.export.out (.svg or .png), headless")
 
     app.main()
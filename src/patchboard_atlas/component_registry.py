@@ -11,12 +11,21 @@ from pathlib import Path
 
 from patchboard_atlas import mem
 from patchboard_atlas import paths
+from patchboard_atlas import persist_queue
+from patchboard_atlas import profiling as prof
 from patchboard_atlas import ecs_world as ecs
 
 
 loaded_component_id_cards = {}
 
+idx_inbox_to_entity = {}  # canonical inbox key -> eid
 
+idx_entity_to_inbox = {}  # eid -> canonical inbox key (reverse of the above)
+
+g_index = {"card-ref-version": 0}  # cmp_card_ref.version the inbox index reflects
+
+
+@prof.timed("validate")
 def validate_card():
     """( card -- card )  Castle-gate validation for top-of-stack card.
 
@@ -71,9 +80,7 @@ def validate_card():
     return (True, None)
 
 
-def canonical_inbox_key(inbox_path):
-    """Normalize an inbox path to a canonical key."""
-    return os.path.normcase(os.path.abspath(inbox_path))
+canonical_inbox_key = paths.canonical_inbox_key  # lives in paths so ecs_world can use it
 
 
 def _persist_filename(key):
@@ -82,19 +89,68 @@ def _persist_filename(key):
     return sanitized + ".json"
 
 
-def find_entity_by_inbox(inbox_key):
-    """Return eid for inbox_key, or None."""
+def _unindex_entity(eid):
+    key = idx_entity_to_inbox.pop(eid, None)
+    if key is not None and idx_inbox_to_entity.get(key) == eid:
+        del idx_inbox_to_entity[key]
+
+
+def _index_entity(eid, card):
+    _unindex_entity(eid)
+    if card is None or "inbox" not in card:
+        return
+    key = canonical_inbox_key(card["inbox"])
+    idx_inbox_to_entity[key] = eid
+    idx_entity_to_inbox[eid] = key
+
+
+def _index_in_sync():
+    return g_index["card-ref-version"] == ecs.cmp_card_ref.version
+
+
+def _rebuild_inbox_index():
+    idx_inbox_to_entity.clear()
+    idx_entity_to_inbox.clear()
     for eid, card in ecs.cmp_card_ref.items():
-        if canonical_inbox_key(card["inbox"]) == inbox_key:
-            return eid
-    return None
+        _index_entity(eid, card)
+    g_index["card-ref-version"] = ecs.cmp_card_ref.version
+
+
+def attach_card(eid, card):
+    """Set eid's card_ref and index its inbox."""
+    in_sync = _index_in_sync()
+    ecs.cmp_card_ref[eid] = card
+    _index_entity(eid, card)
+    if in_sync:
+        g_index["card-ref-version"] = ecs.cmp_card_ref.version
+
+
+def _remove_entity(eid):
+    in_sync = _index_in_sync()
+    _unindex_entity(eid)
+    ecs.remove_entity(eid)
+    if in_sync:
+        g_index["card-ref-version"] = ecs.cmp_card_ref.version
+
+
+def find_entity_by_inbox(inbox_key):
+    """Return eid for inbox_key, or None.
+
+    Cards attached or removed outside attach_card() / the registry
+    (workspace restore, bulk deletes) change cmp_card_ref membership,
+    which triggers a one-time rebuild here.
+    """
+    if not _index_in_sync():
+        _rebuild_inbox_index()
+    return idx_inbox_to_entity.get(inbox_key)
 
 
-def ingest_card():
+def ingest_card(keep_entity=False):
     """( card -- card )  Validate and insert top-of-stack card into registry.
 
-    If inbox key already exists, removes the old ECS entity first,
-    then replaces the registry entry.
+    If inbox key already exists, removes the old ECS entity first
+    (unless keep_entity, in which case the caller re-attaches the card
+    to it), then replaces the registry entry.
     Returns (True, canonical_key) or (False, reason).
     Card remains on stack for subsequent pipeline steps.
     """
@@ -104,8 +160,8 @@ def ingest_card():
         return (False, reason)
     key = canonical_inbox_key(card["inbox"])
     old_eid = find_entity_by_inbox(key)
-    if old_eid is not None:
-        ecs.remove_entity(old_eid)
+    if old_eid is not None and not keep_entity:
+        _remove_entity(old_eid)
     loaded_component_id_cards[key] = card
     return (True, key)
 
@@ -146,7 +202,7 @@ def ingest_cards_from_folder(dirpath):
         if ok:
             persist_card()
             eid = ecs.allocate_entity()
-            ecs.cmp_card_ref[eid] = mem.pop()
+            attach_card(eid, mem.pop())
             ok_count += 1
         else:
             fail_count += 1
@@ -154,16 +210,15 @@ def ingest_cards_from_folder(dirpath):
 
 
 def persist_card():
-    """( card -- card )  Write top-of-stack card to persistence directory.
+    """( card -- card )  Queue top-of-stack card for persistence.
 
-    Card remains on stack.
+    The card is serialized now and written atomically by persist_queue's
+    background thread.  Card remains on stack.
     """
     card = mem.top()
-    persist_dir = paths.component_id_cards_dir()
-    persist_dir.mkdir(parents=True, exist_ok=True)
     key = canonical_inbox_key(card["inbox"])
-    filepath = persist_dir / _persist_filename(key)
-    filepath.write_text(json.dumps(card, indent=2), encoding="utf-8")
+    filepath = paths.component_id_cards_dir() / _persist_filename(key)
+    persist_queue.enqueue_write(filepath, json.dumps(card, indent=2).encode("utf-8"))
 
 
 def load_persisted_cards():
@@ -171,6 +226,7 @@ def load_persisted_cards():
 
     Invalid files are skipped. Returns (ok_count, fail_count).
     """
+    persist_queue.flush_persist_queue()
     persist_dir = paths.component_id_cards_dir()
     if not persist_dir.is_dir():
         return (0, 0)
@@ -178,41 +234,56 @@ def load_persisted_cards():
 
 
 def delete_persisted_card(key):
-    """Remove the persisted card file for a canonical inbox key."""
-    persist_dir = paths.component_id_cards_dir()
-    filepath = persist_dir / _persist_filename(key)
-    if filepath.exists():
-        filepath.unlink()
+    """Queue removal of the persisted card file for a canonical inbox key."""
+    persist_queue.enqueue_delete(paths.component_id_cards_dir() / _persist_filename(key))
+
+
+def cull_card(key, category):
+    """Remove a card whose inbox/outbox folder is missing.
+
+    Logs the removal under category, removes the ECS entity, deletes
+    the persisted file, and drops the registry entry.
+    """
+    from patchboard_atlas import log
+
+    card = loaded_component_id_cards[key]
+    log.log(category, f"Culling card: inbox/outbox not found: {card['title']}", "w")
+    log.attach_context({"inbox": card["inbox"], "outbox": card["outbox"]})
+    remove_card(key)
+
+
+def remove_card(key):
+    """Remove a card's ECS entity, persisted file, and registry entry."""
+    eid = find_entity_by_inbox(key)
+    if eid is not None:
+        _remove_entity(eid)
+
+    delete_persisted_card(key)
+    del loaded_component_id_cards[key]
 
 
+@prof.timed("cull")
 def validate_or_cull_persisted_cards():
     """Check all loaded cards for valid inbox/outbox folders on disk.
 
     Cards whose inbox or outbox folder no longer exists are removed
     from loaded_component_id_cards, deleted from disk persistence,
     and their ECS entities are removed. Each removal is logged.
-    Called once at startup after load_persisted_cards().
+    Called once at startup after load_persisted_cards(); afterwards
+    folder_watch keeps this up to date.
     """
-    from patchboard_atlas import log
-
     keys_to_remove = []
     for key, card in loaded_component_id_cards.items():
         if not os.path.isdir(card["inbox"]) or not os.path.isdir(card["outbox"]):
             keys_to_remove.append(key)
 
     for key in keys_to_remove:
-        card = loaded_component_id_cards[key]
-        log.log("startup", f"Culling card: inbox/outbox not found: {card['title']}", "w")
-        log.attach_context({"inbox": card["inbox"], "outbox": card["outbox"]})
-
-        eid = find_entity_by_inbox(key)
-        if eid is not None:
-            ecs.remove_entity(eid)
-
-        delete_persisted_card(key)
-        del loaded_component_id_cards[key]
+        cull_card(key, "startup")
 
 
 def clear_registry():
-    """Empty loaded_component_id_cards."""
+    """Empty loaded_component_id_cards and the inbox index."""
     loaded_component_id_cards.clear()
+    idx_inbox_to_entity.clear()
+    idx_entity_to_inbox.clear()
+    g_index["card-ref-version"] = -1  # never a live version: next lookup rebuilds
@@ -0,0 +1,216 @@
+"""
+Console feed for Patchboard Atlas.
+
+Streams g_log into the Console window's console-output Text widget.
+Each refresh appends only records added since the previous refresh,
+in one batched insert, and trims the widget to MAX_LINES.
+"""
+
+from patchboard_atlas import log
+from patchboard_atlas import gui_scaffold
+
+
+REFRESH_MS = 250
+MAX_LINES = 2000
+
+LEVEL_LETTERS = {
+    "info": "I",
+    "warning": "W",
+    "error": "E",
+}
+
+LEVEL_COLORS = {
+    "info": "foreground",
+    "warning": "info",
+    "error": "error",
+}
+
+g = {
+    "cursor": 0,
+    "last-record": None,
+    "levels": None,      # None = all, else set of level names
+    "categories": None,  # None = all, else set of category names
+    "after-id": None,
+}
+
+
+# ============================================================
+# PURE LOGIC
+# ============================================================
+
+def format_record(record):
+    """Render one log record as a single console line."""
+    ts = record["timestamp"][11:19]
+    letter = LEVEL_LETTERS.get(record["level"], "?")
+    line = f"{ts} {letter} [{record['category']}] {record['message']}"
+    context = record.get("context")
+    if context:
+        line += f"  {context}"
+    return line + "\n"
+
+
+def record_passes_filter(record):
+    """True if record matches the current level and category filters."""
+    levels = g["levels"]
+    if levels is not None and record["level"] not in levels:
+        return False
+    categories = g["categories"]
+    if categories is not None and record["category"] not in categories:
+        return False
+    return True
+
+
+def collect_new_records():
+    """Return filtered records added to g_log since the last call.
+
+    Advances the cursor.  If g_log was cleared (or replaced) since the
+    last call, restarts from the beginning and returns (True, records);
+    otherwise returns (False, records).
+    """
+    restarted = False
+    cursor = g["cursor"]
+    if cursor > len(log.g_log) or (cursor > 0 and log.g_log[cursor - 1] is not g["last-record"]):
+        cursor = 0
+        restarted = True
+
+    end = len(log.g_log)
+    if end == cursor:
+        return (restarted, [])
+
+    records = [rec for rec in log.g_log[cursor:end] if record_passes_filter(rec)]
+    g["cursor"] = end
+    g["last-record"] = log.g_log[end - 1]
+    return (restarted, records[-MAX_LINES:])
+
+
+def set_console_filter(levels=None, categories=None):
+    """Set level/category filters (None = no filter) and replay from the start."""
+    g["levels"] = set(levels) if levels is not None else None
+    g["categories"] = set(categories) if categories is not None else None
+    g["cursor"] = 0
+    g["last-record"] = None
+    output = gui_scaffold.widgets.get("console-output")
+    if output is not None and output.winfo_exists():
+        output.delete("1.0", "end")
+        refresh_console()
+
+
+def parse_filter_command(text):
+    """Parse "filter [level=a,b] [category=x,y]" into (levels, categories).
+
+    A bare "filter" clears both filters.  Returns None if text is not a
+    filter command.
+    """
+    words = text.split()
+    if not words or words[0] != "filter":
+        return None
+    levels = None
+    categories = None
+    for word in words[1:]:
+        name, _, value = word.partition("=")
+        items = [v for v in value.split(",") if v]
+        if name == "level":
+            levels = items
+        elif name == "category":
+            categories = items
+        else:
+            raise ValueError(f"parse_filter_command: unknown field '{name}'")
+    return (levels, categories)
+
+
+# ============================================================
+# WIDGET
+# ============================================================
+
+def refresh_console():
+    """Append new records to console-output in one insert, then trim."""
+    output = gui_scaffold.widgets.get("console-output")
+    if output is None or not output.winfo_exists():
+        return
+
+    restarted, records = collect_new_records()
+    if restarted:
+        output.delete("1.0", "end")
+    if not records:
+        return
+
+    args = []
+    for record in records:
+        args.append(format_record(record))
+        args.append(("level|" + record["level"],))
+    output.insert("end", *args)
+
+    # every record ends in "\n", so "end-1c" sits on the empty line after
+    # the last record; "end-2c" is the last record's own line
+    line_count = int(output.index("end-2c").split(".")[0])
+    excess = line_count - MAX_LINES
+    if excess > 0:
+        output.delete("1.0", f"{excess + 1}.0")
+    output.see("end")
+
+
+def on_console_input(event):
+    """console-input <Return> handler: apply "filter ...", "prof ..." and "frames ..." commands."""
+    from patchboard_atlas import profiling
+    from patchboard_atlas import frame_monitor
+
+    entry = event.widget
+    text = entry.get().strip()
+    try:
+        parsed = parse_filter_command(text)
+    except ValueError as exc:
+        log.log("console", str(exc), "w")
+        return
+    if parsed is None:
+        if (profiling.handle_console_command(text)
+                or frame_monitor.handle_console_command(text)):
+            entry.delete(0, "end")
+            return
+        log.log("console", f"Unknown console command: {text}", "w")
+        return
+    entry.delete(0, "end")
+    set_console_filter(*parsed)
+
+
+def start_console_feed():
+    """Configure console widgets and begin periodic refresh."""
+    output = gui_scaffold.widgets.get("console-output")
+    if output is None:
+        return
+    for level, color_key in LEVEL_COLORS.items():
+        output.tag_configure("level|" + level, foreground=gui_scaffold.colors[color_key])
+    entry = gui_scaffold.widgets.get("console-input")
+    if entry is not None:
+        entry.bind("<Return>", on_console_input)
+
+    g["cursor"] = 0
+    g["last-record"] = None
+    stop_console_feed()
+    _tick()
+
+
+def stop_console_feed():
+    """Cancel the pending refresh, if any."""
+    after_id = g["after-id"]
+    g["after-id"] = None
+    root = gui_scaffold.widgets.get("root")
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+
+
+def _tick():
+    output = gui_scaffold.widgets.get("console-output")
+    if output is None or not output.winfo_exists():
+        g["after-id"] = None
+        return
+    refresh_console()
+    g["after-id"] = gui_scaffold.widgets["root"].after(REFRESH_MS, _tick)
+
+
+def reset_console_feed():
+    """Reset cursor and filters to initial state."""
+    stop_console_feed()
+    g["cursor"] = 0
+    g["last-record"] = None
+    g["levels"] = None
+    g["categories"] = None
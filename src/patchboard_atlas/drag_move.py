@@ -0,0 +1,168 @@
+"""
+Drag-to-move for placed components in Patchboard Atlas.
+
+Pressing Button-1 on a placed component (found by hit_test) starts a
+drag.  While dragging, only that entity's canvas items (its
+entity|<eid> tag) are shifted with canvas.move(), at most once per idle
+cycle; the world is not touched.
+On release the new position is committed to cmp_spatial and
+rendering.sync_entity() re-emits render intent for that entity and its
+wires and reconciles just their items, so the final drawing still
+flows through RENDER.  The canvas.move() feedback is transient: it is
+always overwritten by the reconcile at release.
+
+Pressing on an unselected component selects it (Shift adds it to the
+selection).  Pressing on a component that is part of a multi-selection
+drags the whole selection: its items get the transient DRAG_TAG so each
+frame is still one canvas.move(), and release commits one
+selection.bulk_move().
+"""
+
+import tkinter as tk
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas import hit_test
+
+
+DRAG_TAG = "drag|group"
+
+SHIFT_MASK = 0x0001
+
+g = {
+    "eid": None,            # entity being dragged, or None
+    "group": None,          # tuple of eids for a selection drag, else None
+    "origin": (0, 0),       # pointer at press (canvas px)
+    "pointer": (0, 0),      # latest pointer (canvas px)
+    "applied": (0, 0),      # pixel offset already applied to the entity's items
+    "start": (0, 0),        # cmp_spatial x/y at press
+    "frame-id": None,
+    "canvas": None,
+}
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def drag_to_world(dx_px, dy_px):
+    """Convert a pixel drag into a world-space offset (rounded, exact integers)."""
+    zn = cm.g_cam["zoom-num"]
+    zd = cm.g_cam["zoom-den"]
+    return ((2 * dx_px * zd + zn) // (2 * zn), (2 * dy_px * zd + zn) // (2 * zn))
+
+
+# ============================================================
+# DRAG
+# ============================================================
+
+def begin_drag(event):
+    """Start dragging the placed entity under the pointer.  Returns True if started."""
+    canvas = event.widget
+    hit = hit_test.hit_test_event(event)
+    if hit is None:
+        return False
+    from patchboard_atlas import rendering
+    from patchboard_atlas import selection
+
+    eid = hit[0]
+    if eid not in rendering.g_highlight["selected"]:
+        selection.select((eid,), add=bool(event.state & SHIFT_MASK))
+    group = tuple(e for e in selection.selected() if e in ecs.cmp_spatial)
+
+    spatial = ecs.cmp_spatial[eid]
+    g["eid"] = eid
+    g["group"] = group if len(group) > 1 else None
+    g["origin"] = (event.x, event.y)
+    g["pointer"] = (event.x, event.y)
+    g["applied"] = (0, 0)
+    g["start"] = (spatial["x"], spatial["y"])
+    g["canvas"] = canvas
+    if g["group"] is None:
+        canvas.tag_raise(rendering.entity_tag(eid))
+    else:
+        for member in g["group"]:
+            canvas.addtag_withtag(DRAG_TAG, rendering.entity_tag(member))
+        canvas.tag_raise(DRAG_TAG)
+    return True
+
+
+def on_drag_motion(event):
+    if g["eid"] is None:
+        return
+    g["pointer"] = (event.x, event.y)
+    if g["frame-id"] is None:
+        g["frame-id"] = event.widget.after_idle(_drag_frame)
+
+
+def _drag_frame():
+    """Shift the dragged entity's items by the movement since the last frame."""
+    from patchboard_atlas import rendering
+
+    g["frame-id"] = None
+    eid = g["eid"]
+    if eid is None:
+        return
+    total_dx = g["pointer"][0] - g["origin"][0]
+    total_dy = g["pointer"][1] - g["origin"][1]
+    dx = total_dx - g["applied"][0]
+    dy = total_dy - g["applied"][1]
+    if dx or dy:
+        tag = DRAG_TAG if g["group"] is not None else rendering.entity_tag(eid)
+        g["canvas"].move(tag, dx, dy)
+    g["applied"] = (total_dx, total_dy)
+
+
+def on_drag_release(event):
+    """Commit the dragged position and re-render the moved entities and their wires."""
+    from patchboard_atlas import rendering
+    from patchboard_atlas import selection
+    from patchboard_atlas import gui_scaffold
+
+    eid = g["eid"]
+    if eid is None:
+        return
+    g["pointer"] = (event.x, event.y)
+    if g["frame-id"] is not None:
+        event.widget.after_cancel(g["frame-id"])
+    _drag_frame()
+    total_dx, total_dy = g["applied"]
+    group = g["group"]
+    g["eid"] = None
+    g["group"] = None
+    if group is not None:
+        event.widget.dtag(DRAG_TAG)
+    if not (total_dx or total_dy) or eid not in ecs.cmp_spatial:
+        return
+
+    wdx, wdy = drag_to_world(total_dx, total_dy)
+    if group is not None:
+        moved = selection.bulk_move(group, wdx, wdy)
+        gui_scaffold.set_status(f"Moved {len(moved)} components by ({wdx}, {wdy})", gui_scaffold.GREEN)
+        return
+    wx = g["start"][0] + wdx
+    wy = g["start"][1] + wdy
+    ecs.cmp_spatial.set_xy(eid, wx, wy)
+    rendering.sync_entity(eid)
+    gui_scaffold.set_status(f"Moved entity {eid} to ({wx}, {wy})", gui_scaffold.GREEN)
+
+
+# ============================================================
+# RESET
+# ============================================================
+
+def reset_drag_move():
+    """Abandon any drag in progress."""
+    if g["frame-id"] is not None and g["canvas"] is not None:
+        try:
+            g["canvas"].after_cancel(g["frame-id"])
+        except tk.TclError:
+            pass  # canvas already destroyed
+    g["eid"] = None
+    g["group"] = None
+    g["origin"] = (0, 0)
+    g["pointer"] = (0, 0)
+    g["applied"] = (0, 0)
+    g["start"] = (0, 0)
+    g["frame-id"] = None
+    g["canvas"] = None
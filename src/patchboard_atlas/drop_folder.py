@@ -0,0 +1,435 @@
+"""
+Drop folder for Patchboard Atlas.
+
+Continuously imports Component ID Cards from a configured folder
+(config key "path.import.dropfolder").  New or modified *.json files
+are ingested through ingest_card_from_file(); deleted files remove
+their entities.
+
+A background thread turns filesystem activity into per-file deltas:
+
+  inotify  -- Linux (see inotify.py); close-write / move / delete events
+  poll     -- elsewhere; os.scandir snapshot diff of (mtime, size)
+
+Deltas are debounced (DEBOUNCE_S of quiet, at most MAX_DELAY_S from the
+first event) and queued as one batch to the Tk thread, so a script that
+writes thousands of cards produces a handful of batches, each followed
+by a single tree rebuild and render sync.
+
+A modified card is re-attached to its existing entity, so placement
+and wires survive.  The per-file index (card key plus (mtime_ns, size))
+is persisted to paths.drop_index_file(); on start the folder is diffed
+against it, so only files added, changed or deleted while the app was
+closed are processed.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import lionscliapp as app
+
+from patchboard_atlas import mem
+from patchboard_atlas import log
+from patchboard_atlas import paths
+from patchboard_atlas import inotify
+from patchboard_atlas import persist_queue
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import component_registry as reg
+
+
+DRAIN_MS = 100
+DEBOUNCE_S = 0.2
+MAX_DELAY_S = 0.8
+POLL_S = 0.5
+
+DROP_MASK = (inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO
+             | inotify.IN_DELETE | inotify.IN_MOVED_FROM
+             | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF)
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+idx_drop_file_to_key = {}  # file name -> canonical inbox key it last ingested
+
+idx_drop_file_sig = {}  # file name -> (mtime_ns, size) when last applied
+
+g = {
+    "drop-dir": None,
+    "index-dirty": False,
+    "queue": None,
+    "thread": None,
+    "stop": None,
+    "wake": None,
+    "wake-event": None,
+    "backend": None,  # "inotify" | "poll", set by the thread
+    "after-id": None,
+}
+
+
+# ============================================================
+# PURE HELPERS
+# ============================================================
+
+def is_card_name(name):
+    """True for names the drop folder ingests (*.json, not hidden/temp)."""
+    return name.endswith(".json") and not name.startswith(".")
+
+
+def snapshot_dir(dirpath):
+    """Return {name: (mtime_ns, size)} for card files in dirpath."""
+    snap = {}
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if not is_card_name(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snap[entry.name] = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        pass
+    return snap
+
+
+def diff_snapshots(old, new):
+    """Return {name: UPSERT | DELETE} describing old -> new."""
+    changes = {}
+    for name, sig in new.items():
+        if old.get(name) != sig:
+            changes[name] = UPSERT
+    for name in old:
+        if name not in new:
+            changes[name] = DELETE
+    return changes
+
+
+# ============================================================
+# WATCH THREAD
+# ============================================================
+
+def _drop_loop(q, stop, wake_event, wake_fd, drop_dir, known):
+    """Background thread: debounce per-file deltas into queued batches.
+
+    known is {name: (mtime_ns, size)} as of the last run; the first batch
+    is the difference between it and the folder.  Each queued message is
+    (batch, listing): batch is {name: op}; listing is the full set of
+    present names when the thread had to resynchronize (start, inotify
+    overflow), else None.
+    """
+    fd = inotify.init()
+    wd = -1
+    if fd is not None:
+        wd = inotify.add_watch(fd, drop_dir, DROP_MASK)
+    g["backend"] = "inotify" if wd >= 0 else "poll"
+
+    snapshot = snapshot_dir(drop_dir)
+    pending = diff_snapshots(known, snapshot)
+    listing = set(snapshot)
+    first_event = time.monotonic()
+    last_event = first_event
+
+    try:
+        while not stop.is_set():
+            changes = {}
+            if wd >= 0:
+                timeout = DEBOUNCE_S if pending else POLL_S
+                for _wd, mask, name in inotify.read_events(fd, wake_fd, timeout):
+                    if mask & inotify.IN_Q_OVERFLOW:
+                        snapshot = snapshot_dir(drop_dir)
+                        changes.update({n: UPSERT for n in snapshot})
+                        listing = set(snapshot)
+                    elif mask & (inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF | inotify.IN_IGNORED):
+                        wd = -1  # watch lost: continue by polling
+                        snapshot = {}
+                    elif not is_card_name(name) or mask & inotify.IN_ISDIR:
+                        continue
+                    elif mask & (inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO):
+                        changes[name] = UPSERT
+                    elif mask & (inotify.IN_DELETE | inotify.IN_MOVED_FROM):
+                        changes[name] = DELETE
+            else:
+                wake_event.wait(DEBOUNCE_S if pending else POLL_S)
+                wake_event.clear()
+                current = snapshot_dir(drop_dir)
+                changes = diff_snapshots(snapshot, current)
+                snapshot = current
+
+            now = time.monotonic()
+            if changes:
+                if not pending:
+                    first_event = now
+                last_event = now
+                pending.update(changes)
+                if listing is not None:
+                    for name, op in changes.items():
+                        if op == UPSERT:
+                            listing.add(name)
+                        else:
+                            listing.discard(name)
+
+            if pending and (now - last_event >= DEBOUNCE_S or now - first_event >= MAX_DELAY_S):
+                q.put((pending, listing))
+                pending = {}
+                listing = None
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def start_drop_thread(drop_dir, known=None):
+    """Start watching drop_dir on a background thread.  No-op if running.
+
+    known is {name: (mtime_ns, size)} for files already applied; they are
+    not re-ingested unless changed.
+    """
+    if g["thread"] is not None:
+        return
+    g["drop-dir"] = drop_dir
+    g["queue"] = queue.Queue()
+    g["stop"] = threading.Event()
+    g["wake-event"] = threading.Event()
+    g["wake"] = os.pipe()
+    os.set_blocking(g["wake"][1], False)
+    g["thread"] = threading.Thread(
+        target=_drop_loop,
+        args=(g["queue"], g["stop"], g["wake-event"], g["wake"][0], drop_dir, dict(known or {})),
+        name="atlas-drop-folder",
+        daemon=True,
+    )
+    g["thread"].start()
+
+
+def stop_drop_thread():
+    """Signal the drop-folder thread to stop and join it."""
+    thread = g["thread"]
+    if thread is None:
+        return
+    g["stop"].set()
+    g["wake-event"].set()
+    try:
+        os.write(g["wake"][1], b"x")
+    except BlockingIOError:
+        pass
+    thread.join()
+    for wake_fd in g["wake"]:
+        os.close(wake_fd)
+    g["thread"] = None
+    g["stop"] = None
+    g["wake"] = None
+    g["wake-event"] = None
+    g["backend"] = None
+
+
+# ============================================================
+# TK THREAD
+# ============================================================
+
+def _ingest_dropped(path, name):
+    """Ingest one dropped file.  Returns "ingested", "unchanged" or "failed".
+
+    The file is read and parsed once; its stat is taken after the read
+    so the recorded signature never predates the content ingested.
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+        st = path.stat()
+    except (OSError, UnicodeDecodeError) as exc:
+        return _drop_failed(path, name, f"cannot read file: {exc}")
+    sig = (st.st_mtime_ns, st.st_size)
+    try:
+        card = json.loads(text)
+    except json.JSONDecodeError as exc:
+        return _drop_failed(path, name, f"invalid JSON: {exc}")
+    if isinstance(card, dict) and isinstance(card.get("inbox"), str):
+        key = reg.canonical_inbox_key(card["inbox"])
+        if reg.loaded_component_id_cards.get(key) == card:
+            _index_file(name, key, sig)
+            return "unchanged"
+
+    mem.push(card)
+    ok, result = reg.ingest_card(keep_entity=True)
+    if not ok:
+        mem.drop()
+        return _drop_failed(path, name, result)
+
+    reg.persist_card()
+    eid = reg.find_entity_by_inbox(result)
+    if eid is None:
+        eid = ecs.allocate_entity()
+    reg.attach_card(eid, mem.pop())   # same eid: placement and wires stay
+
+    prev_key = idx_drop_file_to_key.get(name)
+    if prev_key is not None and prev_key != result and prev_key in reg.loaded_component_id_cards:
+        reg.remove_card(prev_key)
+    _index_file(name, result, sig)
+    return "ingested"
+
+
+def _drop_failed(path, name, reason):
+    log.log("drop", f"Drop folder import failed: {reason}", "w")
+    log.attach_context({"filepath": str(path)})
+    if idx_drop_file_sig.pop(name, None) is not None:
+        g["index-dirty"] = True
+    return "failed"
+
+
+def _index_file(name, key, sig):
+    if idx_drop_file_to_key.get(name) != key or idx_drop_file_sig.get(name) != sig:
+        idx_drop_file_to_key[name] = key
+        idx_drop_file_sig[name] = sig
+        g["index-dirty"] = True
+
+
+def _remove_dropped(name):
+    """Remove the card last ingested from name.  Returns True if removed."""
+    key = idx_drop_file_to_key.pop(name, None)
+    idx_drop_file_sig.pop(name, None)
+    if key is None:
+        return False
+    g["index-dirty"] = True
+    if key not in reg.loaded_component_id_cards:
+        return False
+    reg.remove_card(key)
+    return True
+
+
+def apply_drop_batch(batch, listing=None):
+    """
+    Apply one batch of drop-folder deltas to the registry and ECS.
+
+    batch: {name: UPSERT | DELETE}.  listing, if given, is the full set of
+    present names; previously ingested names missing from it are removed.
+    Returns (ingested, removed, failed) counts.
+    """
+    drop_dir = g["drop-dir"]
+    ingested = 0
+    removed = 0
+    failed = 0
+    for name, op in sorted(batch.items()):
+        if op == DELETE:
+            removed += _remove_dropped(name)
+            continue
+        outcome = _ingest_dropped(drop_dir / name, name)
+        if outcome == "ingested":
+            ingested += 1
+        elif outcome == "failed":
+            failed += 1
+    if listing is not None:
+        for name in sorted(set(idx_drop_file_to_key) - listing):
+            removed += _remove_dropped(name)
+    if g["index-dirty"]:
+        save_drop_index()
+    return (ingested, removed, failed)
+
+
+def save_drop_index():
+    """Queue the per-file index for writing to paths.drop_index_file()."""
+    files = {}
+    for name, key in idx_drop_file_to_key.items():
+        sig = idx_drop_file_sig.get(name)
+        files[name] = [key] + (list(sig) if sig is not None else [None, None])
+    data = {"drop-dir": str(g["drop-dir"]), "files": files}
+    persist_queue.enqueue_write(paths.drop_index_file(), json.dumps(data, indent=2).encode("utf-8"))
+    g["index-dirty"] = False
+
+
+def load_drop_index(drop_dir):
+    """
+    Restore the per-file index saved for drop_dir.
+
+    Entries whose card is no longer loaded are dropped, so those files
+    are ingested again.  Returns {name: (mtime_ns, size)} to diff the
+    folder against.
+    """
+    persist_queue.flush_persist_queue()
+    try:
+        data = json.loads(paths.drop_index_file().read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("drop-dir") != str(drop_dir):
+        return {}
+    known = {}
+    for name, (key, mtime_ns, size) in data.get("files", {}).items():
+        if key not in reg.loaded_component_id_cards:
+            continue
+        idx_drop_file_to_key[name] = key
+        if mtime_ns is not None:
+            idx_drop_file_sig[name] = (mtime_ns, size)
+            known[name] = (mtime_ns, size)
+    return known
+
+
+def process_drop_events():
+    """Drain queued batches and apply them.  Returns summed counts."""
+    totals = [0, 0, 0]
+    q = g["queue"]
+    if q is None:
+        return tuple(totals)
+    while True:
+        try:
+            batch, listing = q.get_nowait()
+        except queue.Empty:
+            break
+        for i, count in enumerate(apply_drop_batch(batch, listing)):
+            totals[i] += count
+    return tuple(totals)
+
+
+def start_drop_folder(drop_dir=None):
+    """Start the drop folder from config; no-op if none is configured."""
+    if drop_dir is None:
+        drop_dir = app.ctx.get("path.import.dropfolder")
+    if drop_dir is None:
+        return
+    drop_dir = Path(drop_dir)
+    drop_dir.mkdir(parents=True, exist_ok=True)
+    log.log("drop", f"Watching drop folder: {drop_dir}")
+    start_drop_thread(drop_dir, load_drop_index(drop_dir))
+    _tick()
+
+
+def _tick():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if root is None or g["thread"] is None:
+        g["after-id"] = None
+        return
+    ingested, removed, failed = process_drop_events()
+    if ingested or removed:
+        from patchboard_atlas import tree_projection as tp
+        from patchboard_atlas import rendering
+        from patchboard_atlas import folder_watch
+        tp.rebuild_tree()
+        rendering.sync_all()
+        folder_watch.refresh_watch_set()
+    if ingested or removed or failed:
+        color = gui_scaffold.RED if failed else gui_scaffold.GREEN
+        gui_scaffold.set_status(
+            f"Drop folder: {ingested} imported, {removed} removed, {failed} failed.", color)
+    g["after-id"] = root.after(DRAIN_MS, _tick)
+
+
+def reset_drop_folder():
+    """Stop the drop-folder thread and forget per-file state."""
+    from patchboard_atlas import gui_scaffold
+
+    after_id = g["after-id"]
+    g["after-id"] = None
+    root = gui_scaffold.widgets.get("root")
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+    stop_drop_thread()
+    g["queue"] = None
+    g["drop-dir"] = None
+    g["index-dirty"] = False
+    idx_drop_file_to_key.clear()
+    idx_drop_file_sig.clear()
@@ -3,18 +3,377 @@ ECS identity layer for Patchboard Atlas.
 
 Module-level state for entity identity, card references, and spatial placement.
 Spatial placement is optional; entities may exist without it.
+
+Wires are keyed by wire_id = (source_inbox, source_channel, dest_channel,
+dest_inbox), using canonical inbox keys.  The idx_wires_* adjacency
+indices are maintained by add_wire/remove_wire so that endpoint lookups
+cost O(degree) rather than O(all wires).
+
+cmp_spatial is columnar: x and y live in array('q') columns indexed by a
+dense slot, with an eid -> slot map and a free-list so removed slots are
+reused.  It behaves as a dict[int -> spatial_record]; records read from
+it are live views onto the columns (copy with dict() to keep a snapshot
+past removal).  Bulk passes should use cmp_spatial.iter_xy().
+
+cmp_entities, cmp_card_ref and cmp_spatial each carry a .version that
+is bumped whenever their key membership changes (not when a value is
+replaced).  query() caches its sorted eid tuples against those versions,
+so repeated frames reuse the same tuple until an entity is added,
+removed, placed, or unplaced.
+
+The same tables also feed a change journal: entity added/removed and
+component set/cleared events.  Consumers subscribe() by name and
+drain_journal() to get only what changed since their last drain.
+Nothing is recorded while there are no subscribers.
 """
 
+from array import array
+from collections.abc import MutableMapping
+
+from patchboard_atlas import paths
+
+
+SPATIAL_COLUMNS = ("x", "y")
+
+
+class TrackedSet(set):
+    """set of eids that bumps .version and journals membership changes."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+    def add(self, eid):
+        if eid not in self:
+            super().add(eid)
+            self.version += 1
+            _journal(ENTITY_ADDED, eid, None)
+
+    def discard(self, eid):
+        if eid in self:
+            super().discard(eid)
+            self.version += 1
+            _journal(ENTITY_REMOVED, eid, None)
+
+    def remove(self, eid):
+        if eid not in self:
+            raise KeyError(eid)
+        self.discard(eid)
+
+    def pop(self):
+        eid = super().pop()
+        self.version += 1
+        _journal(ENTITY_REMOVED, eid, None)
+        return eid
+
+    def clear(self):
+        for eid in list(self):
+            _journal(ENTITY_REMOVED, eid, None)
+        super().clear()
+        self.version += 1
+
+    def update(self, *others):
+        for other in others:
+            for eid in other:
+                self.add(eid)
+
+    def difference_update(self, *others):
+        for other in others:
+            for eid in list(other):
+                self.discard(eid)
+
+    def intersection_update(self, *others):
+        keep = set(self).intersection(*others)
+        for eid in list(self):
+            if eid not in keep:
+                self.discard(eid)
+
+    def symmetric_difference_update(self, other):
+        for eid in set(other):
+            if eid in self:
+                self.discard(eid)
+            else:
+                self.add(eid)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+
+class TrackedDict(dict):
+    """
+    eid -> component dict that journals every set/clear.
+
+    .version is bumped only when key membership changes.
+    """
+
+    def __init__(self, component):
+        super().__init__()
+        self.component = component
+        self.version = 0
+
+    def __setitem__(self, eid, value):
+        if eid not in self:
+            self.version += 1
+        super().__setitem__(eid, value)
+        _journal(COMPONENT_SET, eid, self.component)
+
+    def __delitem__(self, eid):
+        super().__delitem__(eid)
+        self.version += 1
+        _journal(COMPONENT_CLEARED, eid, self.component)
+
+    def pop(self, eid, *default):
+        if eid not in self:
+            return super().pop(eid, *default)
+        value = super().pop(eid)
+        self.version += 1
+        _journal(COMPONENT_CLEARED, eid, self.component)
+        return value
+
+    def popitem(self):
+        eid, value = super().popitem()
+        self.version += 1
+        _journal(COMPONENT_CLEARED, eid, self.component)
+        return (eid, value)
+
+    def setdefault(self, eid, default=None):
+        if eid not in self:
+            self[eid] = default
+        return self[eid]
+
+    def update(self, *args, **kwargs):
+        for eid, value in dict(*args, **kwargs).items():
+            self[eid] = value
+
+    def clear(self):
+        for eid in list(self):
+            _journal(COMPONENT_CLEARED, eid, self.component)
+        super().clear()
+        self.version += 1
+
+
+class SpatialRow(MutableMapping):
+    """Live view of one entity's spatial record in a SpatialTable."""
+
+    __slots__ = ("_table", "_eid")
+
+    def __init__(self, table, eid):
+        self._table = table
+        self._eid = eid
+
+    def _slot(self):
+        slot = self._table.idx_slot.get(self._eid)
+        if slot is None:
+            raise KeyError(f"entity {self._eid} has no spatial record")
+        return slot
+
+    def __getitem__(self, key):
+        slot = self._slot()
+        column = self._table.columns.get(key)
+        if column is not None:
+            return column[slot]
+        extra = self._table.extras.get(slot)
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+
+    def __setitem__(self, key, value):
+        slot = self._slot()
+        column = self._table.columns.get(key)
+        if column is not None:
+            column[slot] = value
+        else:
+            self._table.extras.setdefault(slot, {})[key] = value
+        _journal(COMPONENT_SET, self._eid, "spatial")
+
+    def __delitem__(self, key):
+        if key in self._table.columns:
+            raise KeyError(f"spatial column '{key}' cannot be deleted")
+        slot = self._slot()
+        extra = self._table.extras.get(slot, {})
+        del extra[key]
+        if not extra:
+            self._table.extras.pop(slot, None)
+        _journal(COMPONENT_SET, self._eid, "spatial")
+
+    def __iter__(self):
+        slot = self._slot()
+        yield from SPATIAL_COLUMNS
+        yield from self._table.extras.get(slot, ())
+
+    def __len__(self):
+        return len(SPATIAL_COLUMNS) + len(self._table.extras.get(self._slot(), ()))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class SpatialTable(MutableMapping):
+    """
+    dict[int -> spatial_record] stored as array('q') columns.
+
+    Slot s holds entity slot_eid[s] (0 = free); idx_slot maps eid -> slot.
+    Keys other than the SPATIAL_COLUMNS go to a sparse per-slot extras dict.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.idx_slot = {}
+        self.clear()
+
+    def clear(self):
+        for eid in self.idx_slot:
+            _journal(COMPONENT_CLEARED, eid, "spatial")
+        self.version += 1
+        self.columns = {name: array("q") for name in SPATIAL_COLUMNS}
+        self.slot_eid = array("q")
+        self.idx_slot = {}
+        self.free_slots = []
+        self.extras = {}
+
+    def __getitem__(self, eid):
+        if eid not in self.idx_slot:
+            raise KeyError(eid)
+        return SpatialRow(self, eid)
+
+    def get(self, eid, default=None):
+        if eid not in self.idx_slot:
+            return default
+        return SpatialRow(self, eid)
+
+    def __contains__(self, eid):
+        return eid in self.idx_slot
+
+    def __setitem__(self, eid, record):
+        values = array("q", [record[name] for name in SPATIAL_COLUMNS])  # validate before touching slots
+        extra = {k: v for k, v in record.items() if k not in self.columns}
+        slot = self.idx_slot.get(eid)
+        if slot is None:
+            if self.free_slots:
+                slot = self.free_slots.pop()
+                self.slot_eid[slot] = eid
+            else:
+                slot = len(self.slot_eid)
+                self.slot_eid.append(eid)
+                for column in self.columns.values():
+                    column.append(0)
+            self.idx_slot[eid] = slot
+            self.version += 1
+        for name, value in zip(SPATIAL_COLUMNS, values):
+            self.columns[name][slot] = value
+        if extra:
+            self.extras[slot] = extra
+        else:
+            self.extras.pop(slot, None)
+        _journal(COMPONENT_SET, eid, "spatial")
+
+    def __delitem__(self, eid):
+        slot = self.idx_slot.pop(eid)
+        self.slot_eid[slot] = 0
+        self.extras.pop(slot, None)
+        self.free_slots.append(slot)
+        self.version += 1
+        _journal(COMPONENT_CLEARED, eid, "spatial")
+
+    def __iter__(self):
+        return iter(self.idx_slot)
+
+    def __len__(self):
+        return len(self.idx_slot)
+
+    def __repr__(self):
+        return repr({eid: dict(self[eid]) for eid in self.idx_slot})
+
+    def set_xy(self, eid, x, y):
+        """Place or move eid to (x, y), keeping any extras."""
+        slot = self.idx_slot.get(eid)
+        if slot is None:
+            self[eid] = {"x": x, "y": y}
+            return
+        self.columns["x"][slot] = x
+        self.columns["y"][slot] = y
+        _journal(COMPONENT_SET, eid, "spatial")
+
+    def shift(self, eids, dx, dy):
+        """Move every placed eid in eids by (dx, dy) in one pass.  Returns the eids moved."""
+        moved = [eid for eid in eids if eid in self.idx_slot]
+        xs = self.columns["x"]
+        ys = self.columns["y"]
+        for eid in moved:
+            slot = self.idx_slot[eid]
+            xs[slot] += dx
+            ys[slot] += dy
+        for eid in moved:
+            _journal(COMPONENT_SET, eid, "spatial")
+        return moved
+
+    def iter_xy(self):
+        """Yield (eid, x, y) for every placed entity, in slot order."""
+        for eid, x, y in zip(self.slot_eid, self.columns["x"], self.columns["y"]):
+            if eid:
+                yield (eid, x, y)
+
+    def nbytes(self):
+        """Bytes held by the column arrays (excludes idx_slot and extras)."""
+        total = self.slot_eid.itemsize * len(self.slot_eid)
+        for column in self.columns.values():
+            total += column.itemsize * len(column)
+        return total
+
+
+ENTITY_ADDED = "entity-added"
+ENTITY_REMOVED = "entity-removed"
+COMPONENT_SET = "component-set"
+COMPONENT_CLEARED = "component-cleared"
+
+JOURNAL_MAX = 100_000  # events kept for lagging subscribers before they overflow
+JOURNAL_TRIM = 1024  # consumed events tolerated at the head before trimming
 
 g = {
     "next_entity_id": 1,
+    "journal-seq": 0,  # seq of the next journal event
 }
 
-cmp_entities = set()
+g_journal = []  # [(seq, kind, eid, component)], oldest first
+
+g_subscribers = {}  # name -> {"cursor": next seq to read, "overflowed": bool}
+
+cmp_entities = TrackedSet()
+
+cmp_card_ref = TrackedDict("card_ref")
+
+cmp_spatial = SpatialTable()
 
-cmp_card_ref = {}
+cmp_wires = {}
 
-cmp_spatial = {}
+cmp_wire_style = {}
+
+idx_wires_out = {}  # (source_inbox, source_channel) -> set[wire_id]
+
+idx_wires_in = {}  # (dest_inbox, dest_channel) -> set[wire_id]
+
+idx_wires_by_inbox = {}  # inbox -> set[wire_id] touching it at either end
+
+QUERY_TABLES = {
+    "entities": cmp_entities,
+    "card_ref": cmp_card_ref,
+    "spatial": cmp_spatial,
+}
+
+g_query_cache = {}  # names tuple -> (versions tuple, sorted eid tuple)
 
 
 def allocate_entity():
@@ -34,11 +393,27 @@ def remove_entity(eid):
     """
     Remove an entity from all ECS tables.
 
-    Removes from cmp_entities, cmp_card_ref, and cmp_spatial (if present).
+    Removes from cmp_entities, cmp_card_ref, and cmp_spatial (if present),
+    and removes every wire touching the entity's card inbox.
     """
-    cmp_entities.discard(eid)
-    cmp_card_ref.pop(eid, None)
+    for wire_id in wires_touching_entity(eid):
+        remove_wire(wire_id)
     cmp_spatial.pop(eid, None)
+    cmp_card_ref.pop(eid, None)
+    cmp_entities.discard(eid)
+
+
+def remove_entities(eids):
+    """remove_entity() for each eid; wires go first, so shared wires are removed once."""
+    eids = [eid for eid in eids if eid in cmp_entities]
+    wire_ids = set()
+    for eid in eids:
+        wire_ids |= wires_touching_entity(eid)
+    for wire_id in wire_ids:
+        remove_wire(wire_id)
+    for eid in eids:
+        remove_entity(eid)
+    return eids
 
 
 def reset_ecs():
@@ -47,3 +422,182 @@ def reset_ecs():
     cmp_entities.clear()
     cmp_card_ref.clear()
     cmp_spatial.clear()
+    g_query_cache.clear()
+    g_journal.clear()
+    g_subscribers.clear()
+    g["journal-seq"] = 0
+    clear_wires()
+
+
+# ============================================================
+# CHANGE JOURNAL
+# ============================================================
+
+def _journal(kind, eid, component):
+    """Record one change; free when nobody is subscribed."""
+    if not g_subscribers:
+        return
+    g_journal.append((g["journal-seq"], kind, eid, component))
+    g["journal-seq"] += 1
+    if len(g_journal) > JOURNAL_MAX:
+        _trim_journal(g["journal-seq"] - JOURNAL_MAX // 2)
+
+
+def _trim_journal(force_from=None):
+    """Drop events every subscriber has read (and, if forced, older ones)."""
+    if not g_journal:
+        return
+    base = g_journal[0][0]
+    keep_from = min((sub["cursor"] for sub in g_subscribers.values()), default=g["journal-seq"])
+    if force_from is not None and force_from > keep_from:
+        keep_from = force_from
+        for sub in g_subscribers.values():
+            if sub["cursor"] < keep_from:
+                sub["overflowed"] = True
+                sub["cursor"] = keep_from
+    elif keep_from - base < JOURNAL_TRIM and keep_from < g["journal-seq"]:
+        return
+    del g_journal[:keep_from - base]
+
+
+def subscribe(name):
+    """
+    Register a journal consumer (no-op if already subscribed).
+
+    The first drain_journal() reports an overflow, so the consumer
+    builds its initial state from the tables themselves.
+    """
+    if name not in g_subscribers:
+        g_subscribers[name] = {"cursor": g["journal-seq"], "overflowed": True}
+
+
+def unsubscribe(name):
+    """Remove a journal consumer."""
+    g_subscribers.pop(name, None)
+    _trim_journal()
+
+
+def drain_journal(name):
+    """
+    Return (overflowed, events) recorded since name's last drain.
+
+    events: [(seq, kind, eid, component)] in order; component is
+    "card_ref" / "spatial" for component events, None for entity events.
+    overflowed=True means events were lost (or this is the first drain):
+    rebuild from the tables, and events is empty.
+    """
+    sub = g_subscribers[name]
+    if sub["overflowed"]:
+        sub["overflowed"] = False
+        sub["cursor"] = g["journal-seq"]
+        _trim_journal()
+        return (True, [])
+    base = g_journal[0][0] if g_journal else g["journal-seq"]
+    events = g_journal[sub["cursor"] - base:]
+    sub["cursor"] = g["journal-seq"]
+    _trim_journal()
+    return (False, events)
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def query(*names):
+    """
+    Return the sorted tuple of eids present in every named table.
+
+    names: any of "entities", "card_ref", "spatial".
+    e.g. query("entities", "spatial") -> placed entities in eid order.
+    The result is cached until one of the tables changes membership;
+    callers must not mutate the tables while iterating it.
+    """
+    key = tuple(names)
+    tables = [QUERY_TABLES[name] for name in key]
+    versions = tuple(table.version for table in tables)
+    cached = g_query_cache.get(key)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    tables.sort(key=len)
+    smallest, rest = tables[0], tables[1:]
+    result = tuple(sorted(eid for eid in smallest if all(eid in t for t in rest)))
+    g_query_cache[key] = (versions, result)
+    return result
+
+
+# ============================================================
+# WIRES
+# ============================================================
+
+def add_wire(wire_id):
+    """
+    Insert a wire record for wire_id and index both endpoints.
+
+    Returns the wire record.  If the wire already exists, the existing
+    record is returned unchanged.
+    """
+    record = cmp_wires.get(wire_id)
+    if record is not None:
+        return record
+    source_inbox, source_channel, dest_channel, dest_inbox = wire_id
+    record = {"wire_id": wire_id}
+    cmp_wires[wire_id] = record
+    idx_wires_out.setdefault((source_inbox, source_channel), set()).add(wire_id)
+    idx_wires_in.setdefault((dest_inbox, dest_channel), set()).add(wire_id)
+    idx_wires_by_inbox.setdefault(source_inbox, set()).add(wire_id)
+    idx_wires_by_inbox.setdefault(dest_inbox, set()).add(wire_id)
+    return record
+
+
+def remove_wire(wire_id):
+    """Remove a wire and its style override, and unindex both endpoints."""
+    if cmp_wires.pop(wire_id, None) is None:
+        return
+    cmp_wire_style.pop(wire_id, None)
+    source_inbox, source_channel, dest_channel, dest_inbox = wire_id
+    _unindex(idx_wires_out, (source_inbox, source_channel), wire_id)
+    _unindex(idx_wires_in, (dest_inbox, dest_channel), wire_id)
+    _unindex(idx_wires_by_inbox, source_inbox, wire_id)
+    _unindex(idx_wires_by_inbox, dest_inbox, wire_id)
+
+
+def wires_from(source_inbox, source_channel):
+    """Return the set of wire_ids leaving (source_inbox, source_channel)."""
+    return set(idx_wires_out.get((source_inbox, source_channel), ()))
+
+
+def wires_to(dest_inbox, dest_channel):
+    """Return the set of wire_ids arriving at (dest_inbox, dest_channel)."""
+    return set(idx_wires_in.get((dest_inbox, dest_channel), ()))
+
+
+def wires_touching_inbox(inbox_key):
+    """Return the set of wire_ids with either endpoint at inbox_key."""
+    return set(idx_wires_by_inbox.get(inbox_key, ()))
+
+
+def wires_touching_entity(eid):
+    """Return the set of wire_ids touching eid's card inbox (empty if no card)."""
+    card = cmp_card_ref.get(eid)
+    if card is None or not idx_wires_by_inbox or "inbox" not in card:
+        return set()
+    return wires_touching_inbox(paths.canonical_inbox_key(card["inbox"]))
+
+
+def clear_wires():
+    """Remove all wires, style overrides, and wire indices."""
+    cmp_wires.clear()
+    cmp_wire_style.clear()
+    idx_wires_out.clear()
+    idx_wires_in.clear()
+    idx_wires_by_inbox.clear()
+
+
+def _unindex(index, key, wire_id):
+    bucket = index.get(key)
+    if bucket is None:
+        return
+    bucket.discard(wire_id)
+    if not bucket:
+        del index[key]
@@ -0,0 +1,286 @@
+"""
+FileTalk message writer for Patchboard Atlas.
+
+Atlas never mutates router state directly; it asks the router to link
+or unlink routes by dropping FileTalk messages into the router's INBOX
+(config key "path.router.inbox").
+
+Requests are queued from the Tk thread onto a bounded queue and written
+by a background thread.  Everything the writer finds queued is written
+as one batch: route edits are coalesced per route (last request wins)
+and combined into a single message per channel, so a bulk rewiring of
+hundreds of routes costs at most one message file per channel.
+
+Each message file is written atomically: temp file in the same folder,
+flush + fsync, then os.replace into its final name.  The directory is
+fsynced once per batch so the renames themselves are durable.
+
+The writer thread only counts failures in g; report_write_errors() logs
+them from the Tk thread (router observer tick, and on stop).
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+import lionscliapp as app
+
+from patchboard_atlas import log
+
+
+LINK = "link"
+UNLINK = "unlink"
+CHANNELS = (UNLINK, LINK)  # write order within a batch
+
+QUEUE_MAX = 1000
+BATCH_MAX = 1000  # queued requests drained into one batch
+LINGER_S = 0.02  # wait this long after the first request for more
+
+_STOP = object()
+
+g = {
+    "inbox-dir": None,
+    "queue": None,
+    "thread": None,
+    "seq": 0,
+    "written": 0,       # message files written
+    "errors": 0,
+    "reported-errors": 0,  # g["errors"] already logged by report_write_errors()
+    "last-error": None,
+    "rejected": 0,      # requests refused because the queue was full
+}
+
+
+# ============================================================
+# MESSAGE CONSTRUCTION
+# ============================================================
+
+def route_record(source_folder, source_channel, destination_channel, destination_folder):
+    """Build a route record in the routes.json record format."""
+    return {
+        "source-folder": source_folder,
+        "source-channel": source_channel,
+        "destination-folder": destination_folder,
+        "destination-channel": destination_channel,
+    }
+
+
+def coalesce_requests(requests):
+    """
+    Collapse [(channel, route), ...] into {channel: [route, ...]}.
+
+    A later request for the same route replaces an earlier one, so
+    link-then-unlink of one route in a batch sends only the unlink.
+    """
+    latest = {}
+    for channel, route in requests:
+        key = (
+            route["source-folder"],
+            route["source-channel"],
+            route["destination-channel"],
+            route["destination-folder"],
+        )
+        latest.pop(key, None)  # re-insert so dict order follows the last request
+        latest[key] = (channel, route)
+    grouped = {}
+    for channel, route in latest.values():
+        grouped.setdefault(channel, []).append(route)
+    return grouped
+
+
+def build_message(channel, routes):
+    """Return the message body for a channel carrying routes."""
+    return {
+        "channel": channel,
+        "sender": "patchboard-atlas",
+        "created": datetime.now(timezone.utc).isoformat(),
+        "routes": routes,
+    }
+
+
+def _message_name(channel):
+    g["seq"] += 1
+    return f"{time.time_ns() // 1_000_000:013d}-{os.getpid()}-{g['seq']:06d}-{channel}.json"
+
+
+# ============================================================
+# ATOMIC WRITE
+# ============================================================
+
+def _fsync_dir(dirpath):
+    """fsync a directory so renames into it are durable (no-op where unsupported)."""
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(dirpath, name, data):
+    """Write bytes to dirpath/name via temp file + fsync + os.replace."""
+    tmp_path = os.path.join(dirpath, f".{name}.tmp")
+    final_path = os.path.join(dirpath, name)
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def write_batch(inbox_dir, requests):
+    """
+    Write one batch of [(channel, route), ...] into inbox_dir.
+
+    One message per channel; one directory fsync for the whole batch.
+    Returns the list of written file paths.
+    """
+    grouped = coalesce_requests(requests)
+    written = []
+    for channel in CHANNELS:
+        routes = grouped.get(channel)
+        if not routes:
+            continue
+        data = json.dumps(build_message(channel, routes), indent=2).encode("utf-8")
+        written.append(write_atomic(inbox_dir, _message_name(channel), data))
+    if written:
+        _fsync_dir(inbox_dir)
+    return written
+
+
+# ============================================================
+# WRITER THREAD
+# ============================================================
+
+def _writer_loop(q, inbox_dir):
+    running = True
+    while running:
+        items = [q.get()]
+        if items[0] is not _STOP:
+            time.sleep(LINGER_S)
+        while len(items) < BATCH_MAX:
+            try:
+                items.append(q.get_nowait())
+            except queue.Empty:
+                break
+
+        requests = []
+        for item in items:
+            if item is _STOP:
+                running = False
+            else:
+                requests.extend(item)
+
+        try:
+            if requests:
+                g["written"] += len(write_batch(inbox_dir, requests))
+        except Exception as exc:
+            g["last-error"] = repr(exc)
+            g["errors"] += 1
+        finally:
+            for _ in items:
+                q.task_done()
+
+
+def start_filetalk_writer(inbox_dir=None):
+    """Start the writer thread for inbox_dir (default: path.router.inbox).
+
+    Returns False if no router inbox is configured.
+    """
+    if g["thread"] is not None:
+        return True
+    if inbox_dir is None:
+        inbox_dir = app.ctx.get("path.router.inbox")
+    if inbox_dir is None:
+        return False
+    g["inbox-dir"] = str(inbox_dir)
+    g["queue"] = queue.Queue(maxsize=QUEUE_MAX)
+    g["thread"] = threading.Thread(
+        target=_writer_loop,
+        args=(g["queue"], g["inbox-dir"]),
+        name="atlas-filetalk-writer",
+        daemon=True,
+    )
+    g["thread"].start()
+    return True
+
+
+def request_routes(channel, routes):
+    """
+    Queue a link/unlink request for routes.  Never blocks.
+
+    All routes passed in one call are written in the same batch.
+    Returns False if the writer is not running or the queue is full.
+    """
+    if channel not in CHANNELS:
+        raise ValueError(f"request_routes: unknown channel '{channel}'")
+    q = g["queue"]
+    if q is None:
+        return False
+    try:
+        q.put_nowait([(channel, route) for route in routes])
+    except queue.Full:
+        g["rejected"] += 1
+        return False
+    return True
+
+
+def request_wires(channel, wire_ids):
+    """Queue a link/unlink request for cmp_wires-style wire_ids."""
+    from patchboard_atlas import router_projection as rp
+
+    return request_routes(channel, [rp.wire_to_route(wire_id) for wire_id in wire_ids])
+
+
+def flush_filetalk_writer():
+    """Block until every queued request has been written."""
+    q = g["queue"]
+    if q is not None:
+        q.join()
+
+
+def report_write_errors():
+    """Log write failures counted since the last call.  Tk thread only.
+
+    Returns the number of newly reported failures.
+    """
+    errors = g["errors"]
+    new = errors - g["reported-errors"]
+    if new <= 0:
+        return 0
+    g["reported-errors"] = errors
+    log.log("router", f"FileTalk write failed ({new} batch(es)): {g['last-error']}", "e")
+    log.attach_context({"inbox": g["inbox-dir"]})
+    return new
+
+
+def stop_filetalk_writer():
+    """Write everything queued, then stop the writer thread."""
+    thread = g["thread"]
+    if thread is None:
+        return
+    g["queue"].put(_STOP)
+    thread.join()
+    g["queue"] = None
+    g["thread"] = None
+    report_write_errors()
+
+
+def reset_filetalk_writer():
+    """Stop the writer and clear counters."""
+    stop_filetalk_writer()
+    g["inbox-dir"] = None
+    g["seq"] = 0
+    g["written"] = 0
+    g["errors"] = 0
+    g["reported-errors"] = 0
+    g["last-error"] = None
+    g["rejected"] = 0
@@ -0,0 +1,329 @@
+"""
+Folder watcher for Patchboard Atlas.
+
+Keeps every registered card's inbox/outbox presence up to date after
+startup.  A background thread watches the *parent* directories of the
+watched folders (so one watch covers many sibling components) and only
+re-scans parents that reported activity:
+
+  inotify  -- Linux (see inotify.py); parent events mark that parent dirty
+  poll     -- fallback for other platforms and for parents inotify cannot
+              watch; batched os.scandir of parents on an adaptive interval
+
+Presence changes are coalesced per cycle and handed to the Tk thread
+through a queue.  process_folder_events() applies them: a vanished
+folder culls its card (the same rule validate_or_cull_persisted_cards
+applies at startup), an appearing folder is logged.
+"""
+
+import os
+import queue
+import threading
+
+from patchboard_atlas import log
+from patchboard_atlas import paths
+from patchboard_atlas import inotify
+
+
+DRAIN_MS = 200
+POLL_MIN_S = 0.5
+POLL_MAX_S = 8.0
+POLL_BATCH = 64  # parent directories scanned per poll cycle
+
+PARENT_MASK = (inotify.IN_CREATE | inotify.IN_DELETE
+               | inotify.IN_MOVED_FROM | inotify.IN_MOVED_TO
+               | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF
+               | inotify.IN_ONLYDIR)
+
+g = {
+    "lock": threading.Lock(),
+    "paths": frozenset(),  # canonical folder paths to watch
+    "generation": 0,       # bumped whenever "paths" is replaced
+    "queue": None,
+    "thread": None,
+    "stop": None,
+    "wake": None,          # (read_fd, write_fd) pipe interrupting select
+    "wake-event": None,    # interrupts the polling wait
+    "backend": None,       # "inotify" | "poll", set by the thread
+    "folder-keys": {},     # canonical folder -> set of registry keys (Tk thread)
+    "after-id": None,
+}
+
+
+# ============================================================
+# PURE HELPERS
+# ============================================================
+
+def group_by_parent(paths):
+    """Return {parent: {child_name: path}} for a set of canonical paths."""
+    parents = {}
+    for path in paths:
+        parent, name = os.path.split(path)
+        parents.setdefault(parent, {})[name] = path
+    return parents
+
+
+def scan_parent(parent, children):
+    """
+    Return {path: exists} for each watched child of parent.
+
+    One os.scandir of the parent answers presence for every watched
+    sibling at once.
+    """
+    try:
+        with os.scandir(parent) as it:
+            present = set(os.path.normcase(entry.name) for entry in it if entry.is_dir())
+    except OSError:
+        present = set()
+    return {path: name in present for name, path in children.items()}
+
+
+def merge_events(batches):
+    """Coalesce event batches: the last reported state per path wins."""
+    merged = {}
+    for batch in batches:
+        merged.update(batch)
+    return merged
+
+
+# ============================================================
+# WATCH THREAD
+# ============================================================
+
+def _watch_loop(q, stop, wake_event, wake_fd):
+    """Background thread: track presence of g["paths"], report changes."""
+    fd = inotify.init()
+    g["backend"] = "inotify" if fd is not None else "poll"
+
+    generation = -1
+    parents = {}       # parent -> {name: path}
+    present = {}       # path -> bool, last reported
+    wd_parent = {}     # inotify wd -> parent
+    parent_wd = {}     # parent -> inotify wd
+    polled = []        # parents without an inotify watch
+    poll_cursor = 0
+    interval = POLL_MIN_S
+
+    try:
+        while not stop.is_set():
+            changes = {}
+
+            # --- resync watch set ---
+            with g["lock"]:
+                watched = g["paths"]
+                current = g["generation"]
+            if current != generation:
+                generation = current
+                parents = group_by_parent(watched)
+                for parent in list(parent_wd):
+                    if parent not in parents:
+                        wd = parent_wd.pop(parent)
+                        wd_parent.pop(wd, None)
+                        inotify.rm_watch(fd, wd)
+                polled = []
+                for parent, children in parents.items():
+                    if fd is not None and parent not in parent_wd:
+                        wd = inotify.add_watch(fd, parent, PARENT_MASK)
+                        if wd >= 0:
+                            parent_wd[parent] = wd
+                            wd_parent[wd] = parent
+                    if parent not in parent_wd:
+                        polled.append(parent)
+                    for path, exists in scan_parent(parent, children).items():
+                        if path not in present:
+                            present[path] = exists
+                for path in list(present):
+                    if path not in watched:
+                        del present[path]
+                poll_cursor = 0
+
+            # --- wait for events / poll interval ---
+            dirty = set()
+            if fd is not None and parent_wd:
+                events = inotify.read_events(fd, wake_fd, interval if polled else POLL_MAX_S)
+                for wd, mask, _name in events:
+                    if mask & inotify.IN_Q_OVERFLOW:
+                        dirty.update(parents)
+                    parent = wd_parent.get(wd)
+                    if parent is not None:
+                        dirty.add(parent)
+            else:
+                wake_event.wait(interval)
+                wake_event.clear()
+
+            if polled:
+                batch = polled[poll_cursor:poll_cursor + POLL_BATCH]
+                poll_cursor = (poll_cursor + POLL_BATCH) % len(polled)
+                dirty.update(batch)
+
+            # --- verify dirty parents only ---
+            for parent in dirty:
+                children = parents.get(parent)
+                if children is None:
+                    continue
+                if parent in parent_wd and not os.path.isdir(parent):
+                    # parent vanished: its watch is gone, fall back to polling
+                    wd = parent_wd.pop(parent)
+                    wd_parent.pop(wd, None)
+                    polled.append(parent)
+                for path, exists in scan_parent(parent, children).items():
+                    if present.get(path) != exists:
+                        present[path] = exists
+                        changes[path] = exists
+
+            if changes:
+                q.put(changes)
+                interval = POLL_MIN_S
+            elif polled:
+                interval = min(interval * 2, POLL_MAX_S)
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _wake():
+    """Interrupt the watcher's current wait so it re-reads g state."""
+    if g["wake-event"] is not None:
+        g["wake-event"].set()
+    if g["wake"] is not None:
+        try:
+            os.write(g["wake"][1], b"x")
+        except BlockingIOError:
+            pass  # pipe already full: the watcher is going to wake anyway
+
+
+def set_watch_paths(folders):
+    """Replace the watched folder set (thread-safe)."""
+    with g["lock"]:
+        g["paths"] = frozenset(paths.canonical_folder(p) for p in folders)
+        g["generation"] += 1
+    _wake()
+
+
+def start_watch_thread(folders):
+    """Start the background watcher over folders.  No-op if running."""
+    set_watch_paths(folders)
+    if g["thread"] is not None:
+        return
+    g["queue"] = queue.Queue()
+    g["stop"] = threading.Event()
+    g["wake-event"] = threading.Event()
+    g["wake"] = os.pipe()
+    os.set_blocking(g["wake"][1], False)
+    g["thread"] = threading.Thread(
+        target=_watch_loop,
+        args=(g["queue"], g["stop"], g["wake-event"], g["wake"][0]),
+        name="atlas-folder-watch",
+        daemon=True,
+    )
+    g["thread"].start()
+
+
+def stop_watch_thread():
+    """Signal the watcher to stop and join it."""
+    thread = g["thread"]
+    if thread is None:
+        return
+    g["stop"].set()
+    _wake()
+    thread.join()
+    for wake_fd in g["wake"]:
+        os.close(wake_fd)
+    g["thread"] = None
+    g["stop"] = None
+    g["wake"] = None
+    g["wake-event"] = None
+    g["backend"] = None
+
+
+def drain_events():
+    """Return coalesced {path: exists} reported since the last drain."""
+    q = g["queue"]
+    if q is None:
+        return {}
+    batches = []
+    while True:
+        try:
+            batches.append(q.get_nowait())
+        except queue.Empty:
+            break
+    return merge_events(batches)
+
+
+# ============================================================
+# TK THREAD
+# ============================================================
+
+def refresh_watch_set():
+    """Recompute watched folders from loaded_component_id_cards."""
+    from patchboard_atlas import component_registry as reg
+
+    folder_keys = {}
+    for key, card in reg.loaded_component_id_cards.items():
+        for folder in (card["inbox"], card["outbox"]):
+            folder_keys.setdefault(paths.canonical_folder(folder), set()).add(key)
+    g["folder-keys"] = folder_keys
+    set_watch_paths(folder_keys)
+
+
+def process_folder_events():
+    """Apply drained folder events: cull cards whose folders vanished.
+
+    Returns the list of culled registry keys.
+    """
+    from patchboard_atlas import component_registry as reg
+
+    events = drain_events()
+    if not events:
+        return []
+
+    culled = []
+    for path, exists in sorted(events.items()):
+        if exists:
+            log.log("watch", f"Folder appeared: {path}")
+            continue
+        for key in sorted(g["folder-keys"].get(path, ())):
+            if key in reg.loaded_component_id_cards:
+                reg.cull_card(key, "watch")
+                culled.append(key)
+
+    if culled:
+        refresh_watch_set()
+    return culled
+
+
+def start_folder_watch():
+    """Watch all registered cards' folders and begin draining on the Tk loop."""
+    refresh_watch_set()
+    start_watch_thread(g["folder-keys"])
+    _tick()
+
+
+def _tick():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if root is None or g["thread"] is None:
+        g["after-id"] = None
+        return
+    if process_folder_events():
+        from patchboard_atlas import tree_projection as tp
+        from patchboard_atlas import rendering
+        tp.rebuild_tree()
+        rendering.sync_all()
+    g["after-id"] = root.after(DRAIN_MS, _tick)
+
+
+def reset_folder_watch():
+    """Stop the watcher and forget all watch state."""
+    from patchboard_atlas import gui_scaffold
+
+    after_id = g["after-id"]
+    g["after-id"] = None
+    root = gui_scaffold.widgets.get("root")
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+    stop_watch_thread()
+    set_watch_paths(())
+    g["queue"] = None
+    g["folder-keys"] = {}
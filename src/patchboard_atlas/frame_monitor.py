@@ -0,0 +1,263 @@
+"""
+Frame timing and Tk event-loop latency monitor for Patchboard Atlas.
+
+Render-path timings and loop latency, each kept as a fixed-bucket
+histogram plus a ring of recent samples for last / p95:
+
+  sync      wall time of each rendering.sync_all() (full rebuild)
+  reproject wall time of each rendering.reproject_all() (camera only)
+  incremental
+            wall time of each rendering.sync_entity() / sync_entities()
+            (record_sync(elapsed, path) for all three)
+  latency   a probe re-arms itself with root.after(PROBE_MS); when it
+            fires, (now - scheduled time) is how long the Tk loop was
+            busy elsewhere -- the lag an operator feels.
+
+While enabled, the status bar's frame label is refreshed every
+READOUT_MS with last / p95 sync, p95 reproject and incremental,
+canvas item count (len(RENDER), which
+flush keeps 1:1 with canvas items) and last / p95 loop latency.
+
+Console command:
+
+  frames on | off | reset | show | dump
+"""
+
+import json
+import time
+from collections import deque
+
+from patchboard_atlas import log
+
+
+# ============================================================
+# CONSTANTS
+# ============================================================
+
+PROBE_MS = 50
+READOUT_MS = 500
+SYNC_SAMPLES = 120
+LATENCY_SAMPLES = 200
+
+# histogram upper bounds (ms); the final bucket catches everything above
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+g = {
+    "enabled": False,
+    "probe-id": None,
+    "probe-due": 0.0,     # perf_counter() the probe was scheduled for
+    "readout-id": None,
+}
+
+SYNC_PATHS = ("sync", "reproject", "incremental")
+
+g_samples = {name: deque(maxlen=SYNC_SAMPLES) for name in SYNC_PATHS}   # seconds
+g_samples["latency"] = deque(maxlen=LATENCY_SAMPLES)
+
+g_hist = {name: [0] * (len(BUCKETS_MS) + 1) for name in g_samples}
+
+
+# ============================================================
+# RECORDING
+# ============================================================
+
+def bucket_index(ms):
+    """Index of the histogram bucket holding a duration of ms milliseconds."""
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS)
+
+
+def record_sync(elapsed, path="sync"):
+    """Record one render duration (seconds) for path, one of SYNC_PATHS."""
+    g_samples[path].append(elapsed)
+    g_hist[path][bucket_index(elapsed * 1000)] += 1
+
+
+def record_latency(lag):
+    """Record one event-loop probe lag (seconds)."""
+    g_samples["latency"].append(lag)
+    g_hist["latency"][bucket_index(lag * 1000)] += 1
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of samples (0.0 if empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[rank]
+
+
+def clear_frame_stats():
+    for samples in g_samples.values():
+        samples.clear()
+    for counts in g_hist.values():
+        counts[:] = [0] * len(counts)
+
+
+# ============================================================
+# PROBE / READOUT (Tk thread)
+# ============================================================
+
+def _schedule_probe(root):
+    g["probe-due"] = time.perf_counter() + PROBE_MS / 1000
+    g["probe-id"] = root.after(PROBE_MS, _probe)
+
+
+def _probe():
+    from patchboard_atlas import gui_scaffold
+
+    record_latency(max(0.0, time.perf_counter() - g["probe-due"]))
+    root = gui_scaffold.widgets.get("root")
+    if not g["enabled"] or root is None:
+        g["probe-id"] = None
+        return
+    _schedule_probe(root)
+
+
+def frame_readout():
+    """One-line summary for the status bar."""
+    from patchboard_atlas import rendering
+
+    sync = g_samples["sync"]
+    latency = g_samples["latency"]
+    last_sync = sync[-1] if sync else 0.0
+    last_lag = latency[-1] if latency else 0.0
+    return (f"sync {last_sync * 1000:.1f}ms p95 {percentile(sync, 0.95) * 1000:.1f}ms"
+            f" | reproj p95 {percentile(g_samples['reproject'], 0.95) * 1000:.1f}ms"
+            f" | incr p95 {percentile(g_samples['incremental'], 0.95) * 1000:.1f}ms"
+            f" | items {len(rendering.RENDER)}"
+            f" | loop {last_lag * 1000:.1f}ms p95 {percentile(latency, 0.95) * 1000:.1f}ms")
+
+
+def _readout():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if not g["enabled"] or root is None:
+        g["readout-id"] = None
+        return
+    gui_scaffold.set_frame_readout(frame_readout())
+    g["readout-id"] = root.after(READOUT_MS, _readout)
+
+
+def start_frame_monitor():
+    """Begin probing and refreshing the readout, if enabled and a root exists."""
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if not g["enabled"] or root is None:
+        return
+    if g["probe-id"] is None:
+        _schedule_probe(root)
+    if g["readout-id"] is None:
+        g["readout-id"] = root.after(READOUT_MS, _readout)
+
+
+def stop_frame_monitor():
+    """Cancel the probe and readout, and blank the readout."""
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    for key in ("probe-id", "readout-id"):
+        after_id = g[key]
+        g[key] = None
+        if after_id is not None and root is not None:
+            root.after_cancel(after_id)
+    if gui_scaffold.widgets.get("frame-label") is not None:
+        gui_scaffold.set_frame_readout("")
+
+
+def enable_frame_monitor(enabled=True):
+    g["enabled"] = enabled
+    if enabled:
+        start_frame_monitor()
+    else:
+        stop_frame_monitor()
+
+
+# ============================================================
+# REPORTING
+# ============================================================
+
+def _bucket_labels():
+    labels = [f"<={bound}ms" for bound in BUCKETS_MS]
+    labels.append(f">{BUCKETS_MS[-1]}ms")
+    return labels
+
+
+def frame_snapshot():
+    """JSON-ready dict of every histogram and its summary figures."""
+    labels = _bucket_labels()
+    snapshot = {"buckets": labels}
+    for name, samples in g_samples.items():
+        snapshot[name] = {
+            "last-ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+            "p95-ms": round(percentile(samples, 0.95) * 1000, 3),
+            "max-ms": round(max(samples) * 1000, 3) if samples else 0.0,
+            "histogram": dict(zip(labels, g_hist[name])),
+        }
+    return snapshot
+
+
+def format_histograms():
+    """Console lines: one row per non-empty bucket of each histogram."""
+    labels = _bucket_labels()
+    lines = []
+    for name, counts in g_hist.items():
+        total = sum(counts)
+        lines.append(f"{name}: {total} samples")
+        for label, n in zip(labels, counts):
+            if n:
+                lines.append(f"  {label:>9} {n:>7} {'#' * max(1, n * 40 // total)}")
+    return lines
+
+
+def dump_histograms(path=None):
+    """Write frame_snapshot() as JSON (default paths.profile_dir()/frames.json)."""
+    from patchboard_atlas import paths
+    from patchboard_atlas import persist_queue
+
+    if path is None:
+        out_dir = paths.profile_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / "frames.json"
+    persist_queue.write_atomic(path, json.dumps(frame_snapshot(), indent=2).encode("utf-8"))
+    return path
+
+
+def handle_console_command(text):
+    """Run a "frames ..." console command.  Returns False if text is not one."""
+    words = text.split()
+    if not words or words[0] != "frames":
+        return False
+    action = words[1] if len(words) > 1 else "show"
+    if action == "on":
+        enable_frame_monitor(True)
+        log.log("profile", "Frame monitor on")
+    elif action == "off":
+        enable_frame_monitor(False)
+        log.log("profile", "Frame monitor off")
+    elif action == "reset":
+        clear_frame_stats()
+        log.log("profile", "Frame stats cleared")
+    elif action == "show":
+        log.log("profile", frame_readout())
+        for line in format_histograms():
+            log.log("profile", line)
+    elif action == "dump":
+        log.log("profile", f"Frame histograms written: {dump_histograms()}")
+    else:
+        log.log("console", f"Unknown frames action: {action}", "w")
+    return True
+
+
+def reset_frame_monitor():
+    """Cancel timers, disable, and clear all samples."""
+    stop_frame_monitor()
+    g["enabled"] = False
+    g["probe-due"] = 0.0
+    clear_frame_stats()
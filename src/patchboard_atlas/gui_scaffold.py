@@ -58,6 +58,8 @@ widgets = {
     # --- menu bar ---
     "menu-bar": None,
     "file-menu": None,
+    "edit-menu": None,
+    "layout-menu": None,
 
     # --- left tree pane ---
     "tree-pane": None,
@@ -135,7 +137,34 @@ def create_gui(root):
     file_menu.add_command(label="Exit", underline=1, command=cmd_exit)
     widgets["file-menu"] = file_menu
 
+    edit_menu = tk.Menu(menu_bar, tearoff=0)
+    edit_menu.add_command(label="Select All Placed", underline=0, accelerator="Ctrl+A",
+                          command=cmd_select_all_placed)
+    edit_menu.add_command(label="Clear Selection", underline=0, accelerator="Esc",
+                          command=cmd_clear_selection)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Unplace Selected", underline=0, accelerator="Del",
+                          command=cmd_unplace_selected)
+    edit_menu.add_command(label="Remove Selected", underline=0, accelerator="Shift+Del",
+                          command=cmd_remove_selected)
+    widgets["edit-menu"] = edit_menu
+
+    layout_menu = tk.Menu(menu_bar, tearoff=0)
+    layout_menu.add_command(label="Grid Pack Unplaced", underline=0,
+                            command=lambda: cmd_auto_layout("grid", "unplaced"))
+    layout_menu.add_command(label="Layered Unplaced", underline=0,
+                            command=lambda: cmd_auto_layout("layered", "unplaced"))
+    layout_menu.add_command(label="Force Layout Unplaced", underline=0,
+                            command=lambda: cmd_auto_layout("force", "unplaced"))
+    layout_menu.add_command(label="Force Layout All", underline=12,
+                            command=lambda: cmd_auto_layout("force", "all"))
+    layout_menu.add_separator()
+    layout_menu.add_command(label="Cancel Layout", underline=0, command=cmd_cancel_layout)
+    widgets["layout-menu"] = layout_menu
+
     menu_bar.add_cascade(label="File", menu=file_menu)
+    menu_bar.add_cascade(label="Edit", menu=edit_menu)
+    menu_bar.add_cascade(label="Layout", menu=layout_menu)
     main_window.configure(menu=menu_bar)
 
     main_window.columnconfigure(0, weight=1)
@@ -193,6 +222,14 @@ def create_gui(root):
     inspector_label.grid(row=0, column=0, sticky="nw", padx=8, pady=8)
     widgets["inspector-label"] = inspector_label
 
+    from patchboard_atlas import minimap
+    minimap_canvas = tk.Canvas(inspector_pane, width=minimap.MINIMAP_W, height=minimap.MINIMAP_H,
+                               background=minimap.BACKGROUND, highlightthickness=1,
+                               highlightbackground=colors["button-bg"], cursor="crosshair")
+    minimap_canvas.grid(row=1, column=0, sticky="sw", padx=4, pady=8)
+    inspector_pane.rowconfigure(0, weight=1)
+    widgets["minimap"] = minimap_canvas
+
     panes.add(tree_pane, weight=0)
     panes.add(canvas_pane, weight=1)
     panes.add(inspector_pane, weight=0)
@@ -216,6 +253,19 @@ def create_gui(root):
     status_label.grid(row=0, column=0, sticky="ew")
     widgets["status-label"] = status_label
 
+    sv["frame-text"] = tk.StringVar(value="")
+    frame_label = tk.Label(
+        status_frame,
+        textvariable=sv["frame-text"],
+        bg=colors["bg"],
+        fg=colors[status_colors[BLUE]],
+        anchor="e",
+        padx=8,
+        pady=4,
+    )
+    frame_label.grid(row=0, column=1, sticky="e")
+    widgets["frame-label"] = frame_label
+
     # --- Button bar ---
     button_frame = ttk.Frame(main_frame, style="ButtonBar.TFrame")
     button_frame.grid(row=2, column=0, sticky="ew")
@@ -278,6 +328,9 @@ def open_console_window():
     input_entry.grid(row=1, column=0, sticky="ew", padx=8, pady=(0, 8))
     widgets["console-input"] = input_entry
 
+    from patchboard_atlas import console_feed
+    console_feed.start_console_feed()
+
 
 def set_status(message, color):
     """
@@ -291,12 +344,22 @@ def set_status(message, color):
         status_label.configure(fg=colors[key])
 
 
+def set_frame_readout(text):
+    """
+    Update the frame timing readout at the right of the status bar.
+    """
+    sv["frame-text"].set(text)
+
+
 def cmd_import_component_id_card_file():
     """File > Import Card... menu command."""
     from patchboard_atlas import mem
+    from patchboard_atlas import log
+    from patchboard_atlas import profiling as prof
     from patchboard_atlas import ecs_world as ecs
     from patchboard_atlas import component_registry as reg
     from patchboard_atlas import tree_projection as tp
+    from patchboard_atlas import folder_watch
 
     filepath = filedialog.askopenfilename(
         title="Import Component ID Card",
@@ -305,37 +368,87 @@ def cmd_import_component_id_card_file():
     if not filepath:
         return
 
-    ok, result = reg.ingest_card_from_file(filepath)
-    if not ok:
-        set_status(result, RED)
-        return
-
-    reg.persist_card()
-    eid = ecs.allocate_entity()
-    ecs.cmp_card_ref[eid] = mem.pop()
-    tp.rebuild_tree()
+    with prof.span("import"):
+        ok, result = reg.ingest_card_from_file(filepath)
+        if not ok:
+            log.log("import", f"Import failed: {result}", "e")
+            log.attach_context({"filepath": filepath})
+            set_status(result, RED)
+            return
+
+        reg.persist_card()
+        eid = ecs.allocate_entity()
+        reg.attach_card(eid, mem.pop())
+        tp.rebuild_tree()
+        folder_watch.refresh_watch_set()
     set_status(f"Imported: {filepath}", GREEN)
 
 
 def cmd_import_component_id_card_folder():
     """File > Import Card Folder... menu command."""
-    from patchboard_atlas import mem
-    from patchboard_atlas import ecs_world as ecs
+    from patchboard_atlas import log
+    from patchboard_atlas import profiling as prof
     from patchboard_atlas import component_registry as reg
     from patchboard_atlas import tree_projection as tp
+    from patchboard_atlas import folder_watch
 
     dirpath = filedialog.askdirectory(title="Import Component ID Card Folder")
     if not dirpath:
         return
 
-    ok_count, fail_count = reg.ingest_cards_from_folder(dirpath)
-    tp.rebuild_tree()
+    with prof.span("import"):
+        ok_count, fail_count = reg.ingest_cards_from_folder(dirpath)
+        tp.rebuild_tree()
+        folder_watch.refresh_watch_set()
     if fail_count == 0:
         set_status(f"Imported {ok_count} card(s).", GREEN)
     else:
+        log.log("import", f"Folder import: {fail_count} card(s) failed", "w")
+        log.attach_context({"dirpath": dirpath, "ok": ok_count, "failed": fail_count})
         set_status(f"Imported {ok_count}, failed {fail_count}.", RED)
 
 
+def cmd_select_all_placed():
+    """Edit > Select All Placed menu command."""
+    from patchboard_atlas import selection
+    selection.select_all_placed()
+
+
+def cmd_clear_selection():
+    """Edit > Clear Selection menu command."""
+    from patchboard_atlas import selection
+    selection.clear_selection()
+
+
+def cmd_unplace_selected():
+    """Edit > Unplace Selected menu command."""
+    from patchboard_atlas import selection
+    selection.unplace_selected()
+
+
+def cmd_remove_selected():
+    """Edit > Remove Selected menu command."""
+    from patchboard_atlas import selection
+    selection.remove_selected()
+
+
+def cmd_auto_layout(mode, scope):
+    """Layout menu commands: start an auto-layout."""
+    from patchboard_atlas import layout
+    count = layout.start_layout(mode, scope)
+    if count:
+        set_status(f"Laying out {count} component(s)...", BLUE)
+    else:
+        set_status("Nothing to lay out (or a layout is already running).", FOREGROUND)
+
+
+def cmd_cancel_layout():
+    """Layout > Cancel Layout menu command."""
+    from patchboard_atlas import layout
+    if layout.cancel_layout():
+        set_status("Layout cancelled.", FOREGROUND)
+
+
 def cmd_exit():
     """File > Exit menu command."""
     root = widgets.get("root")
@@ -0,0 +1,230 @@
+"""
+Hit-testing for Patchboard Atlas.
+
+Answers "what is under this point?" from world state, without asking
+the canvas.  Event coordinates are unprojected through coord_machine
+and looked up in a uniform grid over world space (CELL world units per
+side) holding each placed entity's perimeter box.  The grid is kept
+current from the ECS change journal ("hit-test" subscription), so a
+moved or unplaced entity costs one re-index, not a rebuild.
+
+hit_test() returns (eid, part) or None, where part is:
+
+  "perimeter"             inside the component body
+  ("in", channel)         within the anchor radius of an in-channel anchor
+  ("out", channel)        within the anchor radius of an out-channel anchor
+
+Anchors win over bodies; among overlapping entities the highest eid
+(the most recently created) wins.  The anchor radius is ANCHOR_PX
+canvas pixels, converted to world units at the current zoom.
+
+The <Motion> handler drives hover highlighting and the inspector.  It
+does nothing beyond the lookup unless the hit actually changes.
+"""
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+
+
+CELL = 256        # grid cell size, world units
+ANCHOR_PX = 6     # anchor hit radius, canvas pixels
+
+idx_cells = {}        # (cx, cy) -> set[eid]
+idx_entity_box = {}   # eid -> (x0, y0, x1, y1) perimeter, world units
+
+g = {
+    "hover": None,    # last hit reported by the motion handler
+}
+
+
+# ============================================================
+# INDEX
+# ============================================================
+
+def _cells_for_box(x0, y0, x1, y1):
+    return [(cx, cy)
+            for cx in range(x0 // CELL, x1 // CELL + 1)
+            for cy in range(y0 // CELL, y1 // CELL + 1)]
+
+
+def _unindex_entity(eid):
+    box = idx_entity_box.pop(eid, None)
+    if box is None:
+        return
+    for cell in _cells_for_box(*box):
+        members = idx_cells.get(cell)
+        if members is not None:
+            members.discard(eid)
+            if not members:
+                del idx_cells[cell]
+
+
+def _index_entity(eid, x, y):
+    from patchboard_atlas.rendering import COMPONENT_W, COMPONENT_H
+
+    half_w = COMPONENT_W // 2
+    half_h = COMPONENT_H // 2
+    box = (x - half_w, y - half_h, x + half_w, y + half_h)
+    idx_entity_box[eid] = box
+    for cell in _cells_for_box(*box):
+        idx_cells.setdefault(cell, set()).add(eid)
+
+
+def _reindex_entity(eid):
+    _unindex_entity(eid)
+    spatial = ecs.cmp_spatial.get(eid)
+    if spatial is not None and eid in ecs.cmp_entities:
+        _index_entity(eid, spatial["x"], spatial["y"])
+
+
+def sync_hit_index():
+    """Apply ECS journal changes to the grid (full rebuild on overflow)."""
+    ecs.subscribe("hit-test")
+    overflowed, events = ecs.drain_journal("hit-test")
+    if overflowed:
+        idx_cells.clear()
+        idx_entity_box.clear()
+        for eid, x, y in ecs.cmp_spatial.iter_xy():
+            if eid in ecs.cmp_entities:
+                _index_entity(eid, x, y)
+        return
+    touched = set()
+    for _seq, _kind, eid, component in events:
+        if component in (None, "spatial"):
+            touched.add(eid)
+    for eid in touched:
+        _reindex_entity(eid)
+
+
+def entities_in_box(x0, y0, x1, y1):
+    """Return the set of eids whose perimeter intersects the world box."""
+    sync_hit_index()
+    found = set()
+    for cell in _cells_for_box(x0, y0, x1, y1):
+        for eid in idx_cells.get(cell, ()):
+            bx0, by0, bx1, by1 = idx_entity_box[eid]
+            if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                found.add(eid)
+    return found
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def anchor_radius():
+    """ANCHOR_PX converted to world units at the current zoom (at least 1)."""
+    zn = cm.g_cam["zoom-num"]
+    zd = cm.g_cam["zoom-den"]
+    return max(1, -(-ANCHOR_PX * zd // zn))
+
+
+def _hit_anchor(eid, wx, wy, radius):
+    from patchboard_atlas import rendering
+
+    record = rendering.channel_anchors(eid)
+    if record is None:
+        return None
+    r2 = radius * radius
+    for direction in ("in", "out"):
+        for channel, (ax, ay) in record[direction].items():
+            if (ax - wx) ** 2 + (ay - wy) ** 2 <= r2:
+                return (direction, channel)
+    return None
+
+
+def hit_test(wx, wy, radius=None):
+    """Return (eid, part) for world point (wx, wy), or None."""
+    if radius is None:
+        radius = anchor_radius()
+    candidates = sorted(entities_in_box(wx - radius, wy - radius, wx + radius, wy + radius),
+                        reverse=True)
+    for eid in candidates:
+        part = _hit_anchor(eid, wx, wy, radius)
+        if part is not None:
+            return (eid, part)
+    for eid in candidates:
+        x0, y0, x1, y1 = idx_entity_box[eid]
+        if x0 <= wx <= x1 and y0 <= wy <= y1:
+            return (eid, "perimeter")
+    return None
+
+
+def canvas_to_world(px, py):
+    """Unproject canvas pixel (px, py) to world (wx, wy)."""
+    cm.g_event["x"] = px
+    cm.g_event["y"] = py
+    cm.load_pt("event")
+    cm.project_to("w")
+    return cm.get_xy()
+
+
+def event_to_world(event):
+    """Unproject a canvas event's pixel position to world (wx, wy)."""
+    return canvas_to_world(event.x, event.y)
+
+
+def hit_test_event(event):
+    """hit_test() at a canvas event's position."""
+    return hit_test(*event_to_world(event))
+
+
+# ============================================================
+# HOVER / INSPECTOR
+# ============================================================
+
+def describe_hit(hit):
+    """Inspector text for a hit (or for nothing)."""
+    if hit is None:
+        return "Inspector"
+    eid, part = hit
+    card = ecs.cmp_card_ref.get(eid)
+    lines = [f"Entity {eid}"]
+    if card is not None:
+        lines.append(card.get("title", ""))
+        lines.append(f"inbox: {card.get('inbox', '')}")
+    if part != "perimeter":
+        direction, channel = part
+        lines.append(f"{direction} channel: {channel}")
+    return "\n".join(lines)
+
+
+def set_hover(hit):
+    """Update hover highlight and inspector if the hit changed."""
+    from patchboard_atlas import rendering
+    from patchboard_atlas import gui_scaffold
+
+    if hit == g["hover"]:
+        return
+    g["hover"] = hit
+    rendering.set_hover_entity(hit[0] if hit is not None else None)
+    label = gui_scaffold.widgets.get("inspector-label")
+    if label is not None:
+        label.configure(text=describe_hit(hit))
+
+
+def on_canvas_motion(event):
+    set_hover(hit_test_event(event))
+
+
+def on_canvas_leave(event):
+    set_hover(None)
+
+
+def bind_hit_test_events():
+    """Attach hover bindings to the canvas."""
+    from patchboard_atlas import gui_scaffold
+
+    canvas = gui_scaffold.widgets.get("canvas")
+    if canvas is None:
+        return
+    canvas.bind("<Motion>", on_canvas_motion)
+    canvas.bind("<Leave>", on_canvas_leave)
+
+
+def reset_hit_test():
+    """Forget the index, the journal subscription, and the hover state."""
+    ecs.unsubscribe("hit-test")
+    idx_cells.clear()
+    idx_entity_box.clear()
+    g["hover"] = None
@@ -0,0 +1,102 @@
+"""
+Minimal Linux inotify binding for Patchboard Atlas (ctypes, no deps).
+
+init() returns None where inotify is unavailable; callers fall back to
+polling.  Used by folder_watch and drop_folder.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+
+
+# linux/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+g = {
+    "libc": None,
+    "loaded": False,
+}
+
+
+def _libc():
+    if g["loaded"]:
+        return g["libc"]
+    g["loaded"] = True
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    g["libc"] = libc
+    return libc
+
+
+def init():
+    """Return a non-blocking inotify fd, or None if unavailable."""
+    libc = _libc()
+    if libc is None:
+        return None
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    return fd
+
+
+def add_watch(fd, path, mask):
+    """Watch path; return the watch descriptor, or -1 on failure."""
+    return _libc().inotify_add_watch(fd, os.fsencode(path), mask)
+
+
+def rm_watch(fd, wd):
+    """Stop watching wd."""
+    _libc().inotify_rm_watch(fd, wd)
+
+
+def read_events(fd, wake_fd, timeout):
+    """
+    Wait up to timeout seconds and return [(wd, mask, name), ...].
+
+    wake_fd becoming readable ends the wait early (it is drained).
+    name is "" for events on the watched path itself.
+    """
+    ready, _, _ = select.select([fd, wake_fd], [], [], timeout)
+    if wake_fd in ready:
+        os.read(wake_fd, 4096)
+    events = []
+    if fd not in ready:
+        return events
+    while True:
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            break
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            start = offset + _EVENT_HEADER.size
+            name = data[start:start + name_len].rstrip(b"\0")
+            events.append((wd, mask, os.fsdecode(name)))
+            offset = start + name_len
+    return events
@@ -0,0 +1,510 @@
+"""
+Automatic layout for Patchboard Atlas.
+
+Computes cmp_spatial positions for unplaced entities (scope "unplaced")
+or for every entity (scope "all").  Modes:
+
+  grid       pack into a near-square grid, below anything already placed
+  layered    wired components in left-to-right layers by longest path
+             (cycles broken greedily), ordered within a layer by the
+             barycenter of their predecessors; unwired ones grid-packed
+             below
+  force      Fruchterman-Reingold seeded from the layered layout, with
+             repulsion limited to neighbouring cells of a uniform grid
+             (O(n) per iteration instead of O(n^2)); wires attract.
+             With scope "unplaced", already-placed entities take part
+             as fixed nodes, so new components settle near what they
+             are wired to.
+
+Wiring comes from cmp_wires, with endpoints resolved to entities by
+inbox key.  The arithmetic is pure Python over flat lists (the project
+has no NumPy dependency); grid repulsion keeps 10k+ nodes tractable.
+
+start_layout() snapshots the world on the Tk thread and computes on a
+background thread.  Intermediate positions are parked in a single
+hand-off slot (newer replaces older), and a Tk tick applies the latest
+one as a preview -- one batched cmp_spatial pass and one
+rendering.sync_entities() -- so the layout visibly settles while it
+runs.  cancel_layout() stops the worker and puts every affected entity
+back where it was (unplaced ones are unplaced again).
+"""
+
+import math
+import threading
+
+from patchboard_atlas import log
+from patchboard_atlas import ecs_world as ecs
+
+
+MODES = ("grid", "layered", "force")
+SCOPES = ("unplaced", "all")
+
+GRID_DX = 160      # world units between grid columns
+GRID_DY = 100      # world units between grid rows
+LAYER_DX = 240     # world units between layers
+ROW_DY = 100       # world units between rows within a layer
+BLOCK_GAP = 200    # gap between a new block and what is already placed
+
+FORCE_K = 180                 # ideal edge length, world units
+FORCE_ITERATIONS = 60
+PREVIEW_EVERY = 5             # iterations between preview snapshots
+
+PREVIEW_MS = 100
+
+g = {
+    "lock": threading.Lock(),
+    "thread": None,
+    "stop": None,
+    "slot": None,         # {"positions", "iteration", "total", "done"}; guarded by "lock"
+    "eids": (),           # entities being laid out, index-aligned with positions
+    "original": {},       # eid -> (x, y) or None, for cancel_layout()
+    "mode": None,
+    "after-id": None,
+}
+
+
+# ============================================================
+# GRAPH
+# ============================================================
+
+def wire_edges(eids):
+    """Return [(i, j)] index pairs for wires whose endpoints are both in eids."""
+    from patchboard_atlas import component_registry as reg
+
+    index = {eid: i for i, eid in enumerate(eids)}
+    edges = set()
+    for source_inbox, _sch, _dch, dest_inbox in ecs.cmp_wires:
+        i = index.get(reg.find_entity_by_inbox(source_inbox))
+        j = index.get(reg.find_entity_by_inbox(dest_inbox))
+        if i is not None and j is not None and i != j:
+            edges.add((i, j))
+    return sorted(edges)
+
+
+def placed_bounds(exclude=()):
+    """(x0, y0, x1, y1) of placed entity centers not in exclude, or None."""
+    exclude = set(exclude)
+    bounds = None
+    for eid, x, y in ecs.cmp_spatial.iter_xy():
+        if eid in exclude:
+            continue
+        if bounds is None:
+            bounds = [x, y, x, y]
+        else:
+            bounds[0] = min(bounds[0], x)
+            bounds[1] = min(bounds[1], y)
+            bounds[2] = max(bounds[2], x)
+            bounds[3] = max(bounds[3], y)
+    return tuple(bounds) if bounds is not None else None
+
+
+def block_origin(exclude=()):
+    """Top-left for a new block: below the placed entities, or at (0, 0)."""
+    bounds = placed_bounds(exclude)
+    if bounds is None:
+        return (0, 0)
+    return (bounds[0], bounds[3] + BLOCK_GAP)
+
+
+# ============================================================
+# GRID / LAYERED (pure)
+# ============================================================
+
+def grid_positions(n, origin=(0, 0)):
+    """n positions packed row-major into ceil(sqrt(n)) columns."""
+    if n == 0:
+        return []
+    cols = math.ceil(math.sqrt(n))
+    ox, oy = origin
+    return [(ox + (i % cols) * GRID_DX, oy + (i // cols) * GRID_DY) for i in range(n)]
+
+
+def assign_layers(n, edges):
+    """Longest-path layer per node; cycles are broken at the least-blocked node."""
+    preds = [[] for _ in range(n)]
+    succs = [[] for _ in range(n)]
+    for i, j in edges:
+        preds[j].append(i)
+        succs[i].append(j)
+    indegree = [len(p) for p in preds]
+    layer = [0] * n
+    done = [False] * n
+    ready = [i for i in range(n) if indegree[i] == 0]
+    remaining = n
+    while remaining:
+        if not ready:
+            # cycle: release the unfinished node with fewest unfinished predecessors
+            ready = [min((i for i in range(n) if not done[i]), key=lambda i: (indegree[i], i))]
+        next_ready = []
+        for i in ready:
+            if done[i]:
+                continue
+            done[i] = True
+            remaining -= 1
+            layer[i] = max((layer[p] + 1 for p in preds[i] if done[p]), default=0)
+            for j in succs[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0 and not done[j]:
+                    next_ready.append(j)
+        ready = next_ready
+    return layer
+
+
+def layered_positions(n, edges, origin=(0, 0)):
+    """
+    Positions for a layered layout: wired nodes in layers left to right,
+    unwired nodes grid-packed below them.
+    """
+    wired_set = {i for edge in edges for i in edge}
+    wired = sorted(wired_set)
+    loose = [i for i in range(n) if i not in wired_set]
+    positions = [None] * n
+    ox, oy = origin
+
+    height = 0
+    if wired:
+        local = {node: k for k, node in enumerate(wired)}
+        local_edges = [(local[i], local[j]) for i, j in edges]
+        layers = assign_layers(len(wired), local_edges)
+        preds = [[] for _ in wired]
+        for i, j in local_edges:
+            preds[j].append(i)
+
+        by_layer = {}
+        for k, layer in enumerate(layers):
+            by_layer.setdefault(layer, []).append(k)
+        row = [0] * len(wired)
+        for layer in sorted(by_layer):
+            members = by_layer[layer]
+            if layer:
+                def barycenter(k):
+                    placed = [row[p] for p in preds[k] if layers[p] < layer]
+                    return (sum(placed) / len(placed), k) if placed else (float("inf"), k)
+                members.sort(key=barycenter)
+            for r, k in enumerate(members):
+                row[k] = r
+                positions[wired[k]] = (ox + layer * LAYER_DX, oy + r * ROW_DY)
+            height = max(height, len(members))
+
+    if loose:
+        loose_origin = (ox, oy + (height * ROW_DY + BLOCK_GAP if wired else 0))
+        for node, point in zip(loose, grid_positions(len(loose), loose_origin)):
+            positions[node] = point
+    return positions
+
+
+# ============================================================
+# FORCE (pure)
+# ============================================================
+
+def force_positions(xs, ys, edges, fixed=None, iterations=FORCE_ITERATIONS,
+                    on_progress=None, should_stop=None):
+    """
+    Fruchterman-Reingold with grid-limited repulsion.
+
+    xs, ys: initial coordinates (lists of floats, updated in place).
+    fixed: optional list of bools; fixed nodes repel/attract but never move.
+    on_progress(iteration, xs, ys) is called every PREVIEW_EVERY iterations.
+    should_stop() returning True ends the run early.
+    Returns (xs, ys).
+    """
+    n = len(xs)
+    if n < 2:
+        return xs, ys
+    if fixed is None:
+        fixed = [False] * n
+    k = float(FORCE_K)
+    k2 = k * k
+    cell = 2 * k
+    width = max(max(xs) - min(xs), max(ys) - min(ys), k * math.sqrt(n))
+    t0 = width / 10
+
+    for iteration in range(iterations):
+        if should_stop is not None and should_stop():
+            break
+        dx = [0.0] * n
+        dy = [0.0] * n
+
+        # repulsion: only pairs in the same or adjacent grid cells
+        grid = {}
+        for i in range(n):
+            grid.setdefault((int(xs[i] // cell), int(ys[i] // cell)), []).append(i)
+        for (cx, cy), members in grid.items():
+            neighbours = []
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    neighbours.extend(grid.get((cx + ox, cy + oy), ()))
+            for i in members:
+                xi = xs[i]
+                yi = ys[i]
+                fx = 0.0
+                fy = 0.0
+                for j in neighbours:
+                    if i == j:
+                        continue
+                    ddx = xi - xs[j]
+                    ddy = yi - ys[j]
+                    d2 = ddx * ddx + ddy * ddy
+                    if d2 == 0.0:
+                        ddx = (i - j) * 0.01  # coincident: nudge apart deterministically
+                        ddy = 0.01
+                        d2 = ddx * ddx + ddy * ddy
+                    if d2 < cell * cell:
+                        f = k2 / d2
+                        fx += ddx * f
+                        fy += ddy * f
+                dx[i] += fx
+                dy[i] += fy
+
+        # attraction along wires
+        for i, j in edges:
+            ddx = xs[i] - xs[j]
+            ddy = ys[i] - ys[j]
+            d = math.sqrt(ddx * ddx + ddy * ddy) or 0.01
+            f = d / k
+            dx[i] -= ddx * f
+            dy[i] -= ddy * f
+            dx[j] += ddx * f
+            dy[j] += ddy * f
+
+        # move, limited by temperature
+        t = t0 * (1 - iteration / iterations)
+        for i in range(n):
+            if fixed[i]:
+                continue
+            d = math.sqrt(dx[i] * dx[i] + dy[i] * dy[i])
+            if d > 0:
+                step = min(d, t) / d
+                xs[i] += dx[i] * step
+                ys[i] += dy[i] * step
+
+        if on_progress is not None and (iteration + 1) % PREVIEW_EVERY == 0:
+            on_progress(iteration + 1, xs, ys)
+    return xs, ys
+
+
+def compute_layout(mode, n, edges, fixed_points=None, origin=(0, 0),
+                   on_progress=None, should_stop=None):
+    """
+    Positions for nodes 0..n-1 as [(x, y)] integers.
+
+    fixed_points: {index: (x, y)} for nodes that keep their place
+    (force mode only; the other modes ignore them and lay out the rest).
+    """
+    fixed_points = fixed_points or {}
+    free = [i for i in range(n) if i not in fixed_points]
+    free_index = {node: k for k, node in enumerate(free)}
+    free_edges = [(free_index[i], free_index[j]) for i, j in edges
+                  if i in free_index and j in free_index]
+
+    if mode == "grid":
+        seeds = grid_positions(len(free), origin)
+    elif mode in ("layered", "force"):
+        seeds = layered_positions(len(free), free_edges, origin)
+    else:
+        raise ValueError(f"compute_layout: unknown mode '{mode}'")
+
+    positions = [None] * n
+    for node, point in fixed_points.items():
+        positions[node] = point
+    for node, point in zip(free, seeds):
+        positions[node] = point
+    if mode != "force":
+        return positions
+
+    xs = [float(x) for x, _y in positions]
+    ys = [float(y) for _x, y in positions]
+    fixed = [i in fixed_points for i in range(n)]
+
+    def progress(iteration, xs, ys):
+        if on_progress is not None:
+            on_progress(iteration, [(round(x), round(y)) for x, y in zip(xs, ys)])
+
+    force_positions(xs, ys, edges, fixed, on_progress=progress, should_stop=should_stop)
+    return [(round(x), round(y)) for x, y in zip(xs, ys)]
+
+
+# ============================================================
+# WORKER THREAD
+# ============================================================
+
+def _park(positions, iteration, total, done):
+    with g["lock"]:
+        g["slot"] = {"positions": positions, "iteration": iteration,
+                     "total": total, "done": done}
+
+
+def _layout_worker(stop, mode, n, edges, fixed_points, origin):
+    total = FORCE_ITERATIONS if mode == "force" else 1
+    try:
+        positions = compute_layout(
+            mode, n, edges, fixed_points, origin,
+            on_progress=lambda iteration, positions: _park(positions, iteration, total, False),
+            should_stop=stop.is_set,
+        )
+    except Exception as exc:  # surface on the Tk thread instead of dying silently
+        _park(None, 0, total, repr(exc))
+        return
+    if not stop.is_set():
+        _park(positions, total, total, True)
+
+
+def start_layout(mode="force", scope="unplaced"):
+    """
+    Lay out entities on a background thread with progressive preview.
+
+    Returns the number of entities being laid out (0 if there is nothing
+    to do or a layout is already running).
+    """
+    if mode not in MODES:
+        raise ValueError(f"start_layout: unknown mode '{mode}'")
+    if scope not in SCOPES:
+        raise ValueError(f"start_layout: unknown scope '{scope}'")
+    if g["thread"] is not None:
+        return 0
+
+    if scope == "all":
+        targets = list(ecs.query("entities"))
+        anchors = []
+    else:
+        targets = [eid for eid in ecs.query("entities") if eid not in ecs.cmp_spatial]
+        anchors = list(ecs.query("entities", "spatial")) if mode == "force" else []
+    if not targets:
+        return 0
+
+    eids = tuple(targets + anchors)
+    edges = wire_edges(eids)
+    fixed_points = {}
+    for i, eid in enumerate(anchors, start=len(targets)):
+        spatial = ecs.cmp_spatial[eid]
+        fixed_points[i] = (spatial["x"], spatial["y"])
+    origin = block_origin(exclude=targets) if scope == "unplaced" else (0, 0)
+
+    g["eids"] = eids
+    g["original"] = {}
+    for eid in targets:
+        spatial = ecs.cmp_spatial.get(eid)
+        g["original"][eid] = (spatial["x"], spatial["y"]) if spatial is not None else None
+    g["mode"] = mode
+    with g["lock"]:
+        g["slot"] = None
+    g["stop"] = threading.Event()
+    g["thread"] = threading.Thread(
+        target=_layout_worker,
+        args=(g["stop"], mode, len(eids), edges, fixed_points, origin),
+        name="atlas-layout",
+        daemon=True,
+    )
+    g["thread"].start()
+    log.log("layout", f"Auto-layout ({mode}) started for {len(targets)} component(s)")
+    _tick()
+    return len(targets)
+
+
+# ============================================================
+# TK THREAD
+# ============================================================
+
+def apply_positions(positions):
+    """Write positions for the moving entities in one pass, then one sync."""
+    from patchboard_atlas import rendering
+
+    moved = []
+    for eid, (x, y) in zip(g["eids"], positions):
+        if eid in g["original"] and eid in ecs.cmp_entities:
+            ecs.cmp_spatial.set_xy(eid, x, y)
+            moved.append(eid)
+    if moved:
+        rendering.sync_entities(moved)
+    return moved
+
+
+def apply_layout_state():
+    """
+    Apply the latest parked positions, if any.
+
+    Returns None (nothing new), "preview", "done", or "failed".
+    """
+    with g["lock"]:
+        slot = g["slot"]
+        g["slot"] = None
+    if slot is None:
+        return None
+    if isinstance(slot["done"], str):
+        log.log("layout", f"Auto-layout failed: {slot['done']}", "e")
+        _join_worker()
+        return "failed"
+    apply_positions(slot["positions"])
+    if slot["done"]:
+        _join_worker()
+        log.log("layout", f"Auto-layout ({g['mode']}) finished: {len(g['original'])} component(s)")
+        return "done"
+    return "preview"
+
+
+def _join_worker():
+    thread = g["thread"]
+    if thread is not None:
+        thread.join()
+    g["thread"] = None
+    g["stop"] = None
+
+
+def _tick():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if root is None:
+        g["after-id"] = None
+        return
+    state = apply_layout_state()
+    if state == "done":
+        gui_scaffold.set_status(f"Laid out {len(g['original'])} component(s).", gui_scaffold.GREEN)
+    elif state == "failed":
+        gui_scaffold.set_status("Auto-layout failed; see console.", gui_scaffold.RED)
+    if g["thread"] is None:
+        g["after-id"] = None
+        return
+    g["after-id"] = root.after(PREVIEW_MS, _tick)
+
+
+def cancel_layout(restore=True):
+    """Stop a running layout; with restore, put affected entities back."""
+    from patchboard_atlas import rendering
+
+    if g["thread"] is None:
+        return False
+    g["stop"].set()
+    _join_worker()
+    with g["lock"]:
+        g["slot"] = None
+    if restore:
+        touched = []
+        for eid, point in g["original"].items():
+            if eid not in ecs.cmp_entities:
+                continue
+            if point is None:
+                ecs.cmp_spatial.pop(eid, None)
+            else:
+                ecs.cmp_spatial.set_xy(eid, *point)
+            touched.append(eid)
+        if touched:
+            rendering.sync_entities(touched)
+    return True
+
+
+def reset_layout():
+    """Stop any layout (without restoring) and forget its state."""
+    from patchboard_atlas import gui_scaffold
+
+    after_id = g["after-id"]
+    g["after-id"] = None
+    root = gui_scaffold.widgets.get("root")
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+    cancel_layout(restore=False)
+    with g["lock"]:
+        g["slot"] = None
+    g["eids"] = ()
+    g["original"] = {}
+    g["mode"] = None
@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 
 g_log = []
 
+g_listeners = []
+
 _level_flags = {
     "i": "info",
     "w": "warning",
@@ -18,7 +20,7 @@ _level_flags = {
 
 def log(category, message, flags="i"):
     """
-    Append a log record to g_log.
+    Append a log record to g_log, then hand it to each g_listeners callable.
 
     flags: "i" info, "w" warning, "e" error (mutually exclusive).
     """
@@ -30,6 +32,8 @@ def log(category, message, flags="i"):
         "message": message,
     }
     g_log.append(record)
+    for listener in g_listeners:
+        listener(record)
 
 
 def attach_context(context_obj):
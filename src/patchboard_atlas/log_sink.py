@@ -0,0 +1,185 @@
+"""
+Persistent log sink for Patchboard Atlas.
+
+Mirrors g_log records into rotated JSON-lines files under paths.log_dir().
+log.log() only enqueues; a background writer thread does all disk I/O.
+
+The newest record is held back for up to HOLD_S so that a following
+log.attach_context() is captured; the writer releases it once it has
+waited that long, so the last record before a crash still reaches disk.
+log.log() may be called from any thread: the hand-off is lock-guarded
+and records are copied when enqueued.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+from patchboard_atlas import log
+from patchboard_atlas import paths
+
+
+LOG_FILENAME = "atlas-log.jsonl"
+MAX_BYTES = 1_000_000
+BACKUP_COUNT = 5
+QUEUE_MAX = 10_000
+BATCH_MAX = 256
+HOLD_S = 0.2    # how long the newest record waits for attach_context()
+
+_STOP = object()
+
+g = {
+    "queue": None,
+    "thread": None,
+    "log-dir": None,
+    "pending": None,      # (record, monotonic time it arrived), held back
+    "lock": threading.Lock(),
+    "dropped": 0,
+    "write-errors": 0,
+}
+
+
+def start_log_sink(log_dir=None):
+    """Start the background writer and subscribe to log.log().
+
+    log_dir defaults to paths.log_dir(); it is resolved here, on the
+    caller's thread, because the writer must not touch lionscliapp state.
+    No-op if the sink is already running.
+    """
+    if g["thread"] is not None:
+        return
+    if log_dir is None:
+        log_dir = paths.log_dir()
+    g["log-dir"] = log_dir
+    g["queue"] = queue.Queue(maxsize=QUEUE_MAX)
+    g["pending"] = None
+    g["dropped"] = 0
+    g["write-errors"] = 0
+    g["thread"] = threading.Thread(
+        target=_writer_loop,
+        args=(g["queue"], log_dir),
+        name="atlas-log-sink",
+        daemon=True,
+    )
+    g["thread"].start()
+    log.g_listeners.append(on_log_record)
+
+
+def on_log_record(record):
+    """log.g_listeners hook: enqueue the previous record, hold this one.
+
+    The newest record is held back so that a following
+    log.attach_context() lands before the writer serializes it.
+    """
+    with g["lock"]:
+        prev = g["pending"]
+        g["pending"] = (record, time.monotonic())
+        if prev is not None:
+            _enqueue(dict(prev[0]))
+
+
+def flush_log_sink():
+    """Enqueue the held-back record and block until the writer drains."""
+    q = g["queue"]
+    if q is None:
+        return
+    _release_pending()
+    q.join()
+
+
+def stop_log_sink():
+    """Unsubscribe, write out everything queued, and join the writer."""
+    thread = g["thread"]
+    if thread is None:
+        return
+    if on_log_record in log.g_listeners:
+        log.g_listeners.remove(on_log_record)
+    _release_pending()
+    g["queue"].put(_STOP)
+    thread.join()
+    g["queue"] = None
+    g["thread"] = None
+
+
+def current_log_path():
+    """Return the path of the live (unrotated) log file, or None if stopped."""
+    if g["log-dir"] is None:
+        return None
+    return g["log-dir"] / LOG_FILENAME
+
+
+# ============================================================
+# INTERNALS
+# ============================================================
+
+def _release_pending(min_age=0.0):
+    """Enqueue the held record if it has been held at least min_age seconds."""
+    with g["lock"]:
+        pending = g["pending"]
+        if pending is None or time.monotonic() - pending[1] < min_age:
+            return
+        g["pending"] = None
+        _enqueue(dict(pending[0]))
+
+
+def _enqueue(record):
+    """Never block the caller: count and drop if the queue is full."""
+    try:
+        g["queue"].put_nowait(record)
+    except queue.Full:
+        g["dropped"] += 1
+
+
+def _writer_loop(q, log_dir):
+    """Background thread: drain the queue in batches and append to disk."""
+    log_path = log_dir / LOG_FILENAME
+    size = None
+    running = True
+    while running:
+        try:
+            batch = [q.get(timeout=HOLD_S)]
+        except queue.Empty:
+            _release_pending(HOLD_S)
+            continue
+        while len(batch) < BATCH_MAX:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+
+        lines = []
+        for record in batch:
+            if record is _STOP:
+                running = False
+                continue
+            lines.append(json.dumps(record, default=str) + "\n")
+
+        if lines:
+            try:
+                if size is None:
+                    log_dir.mkdir(parents=True, exist_ok=True)
+                    size = log_path.stat().st_size if log_path.exists() else 0
+                data = "".join(lines).encode("utf-8")
+                if size > 0 and size + len(data) > MAX_BYTES:
+                    _rotate(log_path)
+                    size = 0
+                with open(log_path, "ab") as fh:
+                    fh.write(data)
+                size += len(data)
+            except OSError:
+                g["write-errors"] += 1
+                size = None
+
+        for _ in batch:
+            q.task_done()
+
+
+def _rotate(log_path):
+    """Shift log -> log.1 -> log.2 ..., discarding beyond BACKUP_COUNT."""
+    for i in range(BACKUP_COUNT - 1, 0, -1):
+        src = log_path.with_name(f"{log_path.name}.{i}")
+        if src.exists():
+            os.replace(src, log_path.with_name(f"{log_path.name}.{i + 1}"))
+    os.replace(log_path, log_path.with_name(f"{log_path.name}.1"))
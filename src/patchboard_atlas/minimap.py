@@ -0,0 +1,300 @@
+"""
+Minimap overview pane for Patchboard Atlas.
+
+The minimap is a fixed GRID_W x GRID_H density grid over a world extent,
+drawn as GRID_W * GRID_H canvas rectangles plus one viewport rectangle,
+so its draw cost does not depend on the entity count.
+
+  density   g_counts[cell] = placed entities whose center falls in the
+            cell.  The "minimap" ECS journal subscription drives
+            incremental updates: g_cell_of remembers each entity's cell,
+            so a move is one decrement and one increment, and only
+            changed cells are recolored.  An entity landing outside the
+            extent (or a journal overflow) triggers one full rebuild
+            with a refitted extent.
+  extent    g["origin"] plus g["cell-world"] (world units per cell, a
+            power of two >= MIN_CELL_WORLD, leaving headroom so moves
+            rarely force a refit).
+  shading   RAMP[bit_length(count)] -- a fixed log scale, so recoloring
+            one cell never requires recoloring the others.
+  viewport  g_cam / g_view projected into minimap pixels.
+
+Clicking or dragging on the minimap centers the camera on that point
+(one reproject_all() per idle cycle).  A REFRESH_MS tick on the Tk loop
+drains the journal and redraws what changed.
+"""
+
+import tkinter as tk
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+
+
+# ============================================================
+# CONSTANTS
+# ============================================================
+
+GRID_W = 48
+GRID_H = 32
+CELL_PX = 5
+MINIMAP_W = GRID_W * CELL_PX
+MINIMAP_H = GRID_H * CELL_PX
+
+MIN_CELL_WORLD = 64
+FIT_MARGIN_CELLS = 4     # cells of headroom around the placed bounds on refit
+
+REFRESH_MS = 250
+
+BACKGROUND = "#2a2a2a"
+RAMP = ("#2a2a2a", "#23405a", "#2b5a80", "#3575a6", "#4488cc", "#66a6dd", "#99c8ee", "#cce4f7")
+VIEWPORT_OUTLINE = "#ffcc44"
+
+
+g = {
+    "origin": (0, 0),               # world (x, y) of cell (0, 0)'s top-left
+    "cell-world": MIN_CELL_WORLD,   # world units per cell side
+    "canvas": None,
+    "items": [],                    # canvas ids, one per cell, row-major
+    "view-item": None,
+    "drawn-view": None,             # viewport rect last drawn (px)
+    "pointer": None,                # pending jump target (minimap px)
+    "frame-id": None,
+    "after-id": None,
+}
+
+g_counts = [0] * (GRID_W * GRID_H)
+
+g_cell_of = {}   # eid -> cell index
+
+g_dirty = set()  # cell indices needing a recolor
+
+
+# ============================================================
+# DENSITY GRID
+# ============================================================
+
+def fit_extent(bounds):
+    """Set origin / cell-world so bounds (x0, y0, x1, y1, or None) fit with headroom."""
+    if bounds is None:
+        bounds = (0, 0, 0, 0)
+    x0, y0, x1, y1 = bounds
+    cell = MIN_CELL_WORLD
+    while (cell * (GRID_W - FIT_MARGIN_CELLS) < x1 - x0 + 1
+           or cell * (GRID_H - FIT_MARGIN_CELLS) < y1 - y0 + 1):
+        cell *= 2
+    ox = ((x0 + x1) // 2 - cell * GRID_W // 2) // cell * cell
+    oy = ((y0 + y1) // 2 - cell * GRID_H // 2) // cell * cell
+    g["origin"] = (ox, oy)
+    g["cell-world"] = cell
+
+
+def cell_index(x, y):
+    """Row-major cell index for world (x, y), or None outside the extent."""
+    ox, oy = g["origin"]
+    cell = g["cell-world"]
+    cx = (x - ox) // cell
+    cy = (y - oy) // cell
+    if 0 <= cx < GRID_W and 0 <= cy < GRID_H:
+        return cy * GRID_W + cx
+    return None
+
+
+def rebuild_density():
+    """Refit the extent to the placed entities and recount every cell."""
+    placed = [(eid, x, y) for eid, x, y in ecs.cmp_spatial.iter_xy() if eid in ecs.cmp_entities]
+    bounds = None
+    if placed:
+        xs = [x for _eid, x, _y in placed]
+        ys = [y for _eid, _x, y in placed]
+        bounds = (min(xs), min(ys), max(xs), max(ys))
+    fit_extent(bounds)
+    g_counts[:] = [0] * (GRID_W * GRID_H)
+    g_cell_of.clear()
+    for eid, x, y in placed:
+        index = cell_index(x, y)
+        g_counts[index] += 1
+        g_cell_of[eid] = index
+    g_dirty.update(range(GRID_W * GRID_H))
+
+
+def sync_density():
+    """Apply ECS journal changes to the grid (full rebuild on overflow or refit)."""
+    ecs.subscribe("minimap")
+    overflowed, events = ecs.drain_journal("minimap")
+    if overflowed:
+        rebuild_density()
+        return
+    touched = set()
+    for _seq, _kind, eid, component in events:
+        if component in (None, "spatial"):
+            touched.add(eid)
+    for eid in touched:
+        old = g_cell_of.pop(eid, None)
+        if old is not None:
+            g_counts[old] -= 1
+            g_dirty.add(old)
+        spatial = ecs.cmp_spatial.get(eid)
+        if spatial is None or eid not in ecs.cmp_entities:
+            continue
+        index = cell_index(spatial["x"], spatial["y"])
+        if index is None:
+            rebuild_density()
+            return
+        g_counts[index] += 1
+        g_cell_of[eid] = index
+        g_dirty.add(index)
+
+
+def cell_color(count):
+    """Fixed log-scale shade for a cell holding count entities."""
+    return RAMP[min(len(RAMP) - 1, count.bit_length())]
+
+
+# ============================================================
+# VIEWPORT / CAMERA
+# ============================================================
+
+def world_to_minimap(x, y):
+    """World point -> minimap pixel (floats, unclipped)."""
+    ox, oy = g["origin"]
+    scale = CELL_PX / g["cell-world"]
+    return ((x - ox) * scale, (y - oy) * scale)
+
+
+def minimap_to_world(px, py):
+    """Minimap pixel -> world point (rounded to integers)."""
+    ox, oy = g["origin"]
+    cell = g["cell-world"]
+    return (ox + round(px * cell / CELL_PX), oy + round(py * cell / CELL_PX))
+
+
+def viewport_rect():
+    """Minimap-pixel (x0, y0, x1, y1) of the area the main canvas shows."""
+    zn = cm.g_cam["zoom-num"]
+    zd = cm.g_cam["zoom-den"]
+    half_w = cm.g_view["canvas-view-w"] * zd / (2 * zn)
+    half_h = cm.g_view["canvas-view-h"] * zd / (2 * zn)
+    x0, y0 = world_to_minimap(cm.g_cam["x"] - half_w, cm.g_cam["y"] - half_h)
+    x1, y1 = world_to_minimap(cm.g_cam["x"] + half_w, cm.g_cam["y"] + half_h)
+    return (round(x0), round(y0), round(x1), round(y1))
+
+
+def jump_to(px, py):
+    """Center the camera on the world point under minimap pixel (px, py)."""
+    from patchboard_atlas import rendering
+
+    cm.g_cam["x"], cm.g_cam["y"] = minimap_to_world(px, py)
+    rendering.reproject_all()
+    if g["canvas"] is not None and g["view-item"] is not None:
+        draw_viewport(g["canvas"])
+
+
+# ============================================================
+# DRAWING
+# ============================================================
+
+def _create_items(canvas):
+    items = []
+    for cy in range(GRID_H):
+        for cx in range(GRID_W):
+            x0 = cx * CELL_PX
+            y0 = cy * CELL_PX
+            items.append(canvas.create_rectangle(x0, y0, x0 + CELL_PX, y0 + CELL_PX,
+                                                 width=0, fill=BACKGROUND))
+    g["items"] = items
+    g["view-item"] = canvas.create_rectangle(0, 0, 0, 0, outline=VIEWPORT_OUTLINE, width=1)
+    g["drawn-view"] = None
+    g_dirty.update(range(GRID_W * GRID_H))
+
+
+def draw_viewport(canvas):
+    rect = viewport_rect()
+    if rect != g["drawn-view"]:
+        canvas.coords(g["view-item"], *rect)
+        g["drawn-view"] = rect
+
+
+def draw_minimap(canvas):
+    """Recolor dirty cells and move the viewport rectangle if the camera moved."""
+    if not g["items"]:
+        _create_items(canvas)
+    items = g["items"]
+    for index in g_dirty:
+        canvas.itemconfigure(items[index], fill=cell_color(g_counts[index]))
+    g_dirty.clear()
+    draw_viewport(canvas)
+
+
+# ============================================================
+# EVENTS / TK THREAD
+# ============================================================
+
+def on_minimap_press(event):
+    """<Button-1> / <B1-Motion>: jump the camera, coalesced to one per idle cycle."""
+    g["pointer"] = (event.x, event.y)
+    if g["frame-id"] is None:
+        g["frame-id"] = event.widget.after_idle(_jump_frame)
+
+
+def _jump_frame():
+    g["frame-id"] = None
+    pointer = g["pointer"]
+    g["pointer"] = None
+    if pointer is not None:
+        jump_to(*pointer)
+
+
+def _tick():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    canvas = g["canvas"]
+    if root is None or canvas is None:
+        g["after-id"] = None
+        return
+    sync_density()
+    draw_minimap(canvas)
+    g["after-id"] = root.after(REFRESH_MS, _tick)
+
+
+def start_minimap():
+    """Bind the minimap canvas and begin the refresh tick."""
+    from patchboard_atlas import gui_scaffold
+
+    canvas = gui_scaffold.widgets.get("minimap")
+    if canvas is None:
+        return
+    g["canvas"] = canvas
+    canvas.bind("<Button-1>", on_minimap_press)
+    canvas.bind("<B1-Motion>", on_minimap_press)
+    _tick()
+
+
+def reset_minimap():
+    """Cancel the tick and any pending jump, and forget the grid."""
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    after_id = g["after-id"]
+    g["after-id"] = None
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+    canvas = g["canvas"]
+    frame_id = g["frame-id"]
+    g["frame-id"] = None
+    if frame_id is not None and canvas is not None:
+        try:
+            canvas.after_cancel(frame_id)
+        except tk.TclError:
+            pass
+    g["canvas"] = None
+    g["items"] = []
+    g["view-item"] = None
+    g["drawn-view"] = None
+    g["pointer"] = None
+    g["origin"] = (0, 0)
+    g["cell-world"] = MIN_CELL_WORLD
+    g_counts[:] = [0] * (GRID_W * GRID_H)
+    g_cell_of.clear()
+    g_dirty.clear()
+    ecs.unsubscribe("minimap")
@@ -0,0 +1,245 @@
+"""
+Pan and zoom interaction for Patchboard Atlas.
+
+Gestures:
+
+  middle-drag          pan
+  wheel                zoom about the pointer, through ZOOM_LEVELS
+  Shift+wheel          scroll vertically
+  Ctrl+wheel           scroll horizontally
+
+Mid-gesture feedback never reprojects the world.  Canvas items are
+shifted with canvas.move() / canvas.scale() on the kind|component and
+kind|wire tags (one C-level call per tag, regardless of item count), and
+motion events are coalesced so at most one move is applied per idle
+cycle.  g_cam is kept current in exact integer world units as the
+gesture proceeds, so anything that syncs mid-gesture projects with the
+right camera.  When the gesture ends (button release, or the wheel going
+quiet for SETTLE_MS) one rendering.reproject_all() snaps every item to
+its exact projected position.
+"""
+
+import tkinter as tk
+
+from patchboard_atlas import coord_machine as cm
+
+
+MOVE_TAGS = ("kind|component", "kind|wire")
+
+ZOOM_LEVELS = ((1, 4), (1, 3), (1, 2), (2, 3), (1, 1), (3, 2), (2, 1), (3, 1), (4, 1))
+
+SETTLE_MS = 150
+SCROLL_PX = 40
+
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+g = {
+    "pan-active": False,
+    "pan-origin": (0, 0),     # pointer position at gesture start (canvas px)
+    "pan-pointer": (0, 0),    # latest pointer position (canvas px)
+    "pan-applied": (0, 0),    # pixel offset already applied to canvas items
+    "pan-start-cam": (0, 0),  # g_cam x/y at gesture start
+    "frame-id": None,         # after_idle id of the pending pan frame
+    "settle-id": None,        # after id ending a wheel gesture
+    "canvas": None,
+}
+
+
+# ============================================================
+# CAMERA MATH
+# ============================================================
+
+def _div_round(n, d):
+    """Round n / d to the nearest integer (halves up), d > 0."""
+    return (2 * n + d) // (2 * d)
+
+
+def pan_camera(start_x, start_y, dx_px, dy_px):
+    """Return the camera (x, y) after dragging the view by (dx_px, dy_px) pixels."""
+    zn = cm.g_cam["zoom-num"]
+    zd = cm.g_cam["zoom-den"]
+    return (start_x - _div_round(dx_px * zd, zn),
+            start_y - _div_round(dy_px * zd, zn))
+
+
+def zoom_camera_about(px, py, zoom_num, zoom_den):
+    """
+    Set zoom to zoom_num/zoom_den keeping the world point under canvas
+    pixel (px, py) fixed.  Updates g_cam in place.
+    """
+    zn = cm.g_cam["zoom-num"]
+    zd = cm.g_cam["zoom-den"]
+    ox = px - cm.g_view["canvas-view-w"] // 2
+    oy = py - cm.g_view["canvas-view-h"] // 2
+    # world point under the pointer, as an exact fraction over zn * zoom_num
+    # cam' = cam + o * zd / zn - o * zoom_den / zoom_num
+    denom = zn * zoom_num
+    cm.g_cam["x"] += _div_round(ox * (zd * zoom_num - zoom_den * zn), denom)
+    cm.g_cam["y"] += _div_round(oy * (zd * zoom_num - zoom_den * zn), denom)
+    cm.set_zoom(zoom_num, zoom_den)
+
+
+def zoom_level_index():
+    """Index of the ZOOM_LEVELS entry nearest the current zoom."""
+    current = cm.g_cam["zoom-num"] / cm.g_cam["zoom-den"]
+    return min(range(len(ZOOM_LEVELS)),
+               key=lambda i: abs(ZOOM_LEVELS[i][0] / ZOOM_LEVELS[i][1] - current))
+
+
+# ============================================================
+# CANVAS FEEDBACK
+# ============================================================
+
+def _move_items(canvas, dx, dy):
+    if dx or dy:
+        for tag in MOVE_TAGS:
+            canvas.move(tag, dx, dy)
+
+
+def _end_gesture():
+    """Reproject everything once with the committed camera."""
+    from patchboard_atlas import rendering
+    rendering.reproject_all()
+
+
+def _schedule_settle(canvas):
+    if g["settle-id"] is not None:
+        canvas.after_cancel(g["settle-id"])
+    g["settle-id"] = canvas.after(SETTLE_MS, _settle)
+
+
+def _settle():
+    g["settle-id"] = None
+    _end_gesture()
+
+
+# ============================================================
+# PAN (DRAG)
+# ============================================================
+
+def on_pan_press(event):
+    g["canvas"] = event.widget
+    g["pan-active"] = True
+    g["pan-origin"] = (event.x, event.y)
+    g["pan-pointer"] = (event.x, event.y)
+    g["pan-applied"] = (0, 0)
+    g["pan-start-cam"] = (cm.g_cam["x"], cm.g_cam["y"])
+
+
+def on_pan_motion(event):
+    if not g["pan-active"]:
+        return
+    g["pan-pointer"] = (event.x, event.y)
+    if g["frame-id"] is None:
+        g["frame-id"] = event.widget.after_idle(_pan_frame)
+
+
+def _pan_frame():
+    """Apply the pointer movement accumulated since the last frame."""
+    g["frame-id"] = None
+    canvas = g["canvas"]
+    if canvas is None or not g["pan-active"]:
+        return
+    total_dx = g["pan-pointer"][0] - g["pan-origin"][0]
+    total_dy = g["pan-pointer"][1] - g["pan-origin"][1]
+    applied_dx, applied_dy = g["pan-applied"]
+    _move_items(canvas, total_dx - applied_dx, total_dy - applied_dy)
+    g["pan-applied"] = (total_dx, total_dy)
+    cm.g_cam["x"], cm.g_cam["y"] = pan_camera(*g["pan-start-cam"], total_dx, total_dy)
+
+
+def on_pan_release(event):
+    if not g["pan-active"]:
+        return
+    g["pan-pointer"] = (event.x, event.y)
+    if g["frame-id"] is not None:
+        event.widget.after_cancel(g["frame-id"])
+    _pan_frame()
+    g["pan-active"] = False
+    _end_gesture()
+
+
+# ============================================================
+# WHEEL (ZOOM / SCROLL)
+# ============================================================
+
+def _wheel_steps(event):
+    """+1 per notch away from the user (zoom in / scroll up), -1 toward."""
+    num = getattr(event, "num", None)
+    if num == 4:
+        return 1
+    if num == 5:
+        return -1
+    delta = getattr(event, "delta", 0)
+    if delta > 0:
+        return 1
+    if delta < 0:
+        return -1
+    return 0
+
+
+def on_wheel(event):
+    steps = _wheel_steps(event)
+    if not steps:
+        return
+    canvas = event.widget
+    g["canvas"] = canvas
+    if g["pan-active"]:
+        return  # one gesture at a time
+
+    if event.state & (SHIFT_MASK | CONTROL_MASK):
+        dx_px = steps * SCROLL_PX if event.state & CONTROL_MASK else 0
+        dy_px = steps * SCROLL_PX if not event.state & CONTROL_MASK else 0
+        _move_items(canvas, dx_px, dy_px)
+        cm.g_cam["x"], cm.g_cam["y"] = pan_camera(cm.g_cam["x"], cm.g_cam["y"], dx_px, dy_px)
+        _schedule_settle(canvas)
+        return
+
+    index = max(0, min(len(ZOOM_LEVELS) - 1, zoom_level_index() + steps))
+    zoom_num, zoom_den = ZOOM_LEVELS[index]
+    old = cm.g_cam["zoom-num"] / cm.g_cam["zoom-den"]
+    if (zoom_num, zoom_den) == (cm.g_cam["zoom-num"], cm.g_cam["zoom-den"]):
+        return
+    factor = (zoom_num / zoom_den) / old
+    for tag in MOVE_TAGS:
+        canvas.scale(tag, event.x, event.y, factor, factor)
+    zoom_camera_about(event.x, event.y, zoom_num, zoom_den)
+    _schedule_settle(canvas)
+
+
+# ============================================================
+# BINDINGS
+# ============================================================
+
+def bind_navigation_events():
+    """Attach pan/zoom bindings to the canvas."""
+    from patchboard_atlas import gui_scaffold
+
+    canvas = gui_scaffold.widgets.get("canvas")
+    if canvas is None:
+        return
+    canvas.bind("<ButtonPress-2>", on_pan_press)
+    canvas.bind("<B2-Motion>", on_pan_motion)
+    canvas.bind("<ButtonRelease-2>", on_pan_release)
+    canvas.bind("<MouseWheel>", on_wheel)
+    canvas.bind("<Button-4>", on_wheel)
+    canvas.bind("<Button-5>", on_wheel)
+
+
+def reset_navigation():
+    """Cancel pending gesture callbacks and forget gesture state."""
+    canvas = g["canvas"]
+    for key in ("frame-id", "settle-id"):
+        if g[key] is not None and canvas is not None:
+            try:
+                canvas.after_cancel(g[key])
+            except tk.TclError:
+                pass  # canvas already destroyed
+        g[key] = None
+    g["pan-active"] = False
+    g["pan-origin"] = (0, 0)
+    g["pan-pointer"] = (0, 0)
+    g["pan-applied"] = (0, 0)
+    g["pan-start-cam"] = (0, 0)
+    g["canvas"] = None
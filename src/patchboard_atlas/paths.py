@@ -1,12 +1,24 @@
 """
 Centralized path calculations for Patchboard Atlas.
 
-All paths derived from the lionscliapp execution root.
+All paths derived from the lionscliapp execution root, plus the folder
+normalization shared by the registry, the ECS wire indices, the folder
+watcher and the router projection.
 """
 
+import os
+
 import lionscliapp as app
 
 
+def canonical_folder(path):
+    """Normalize a folder path to a canonical key."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+canonical_inbox_key = canonical_folder  # inbox keys are canonical inbox folders
+
+
 def project_dir():
     """Return the .patchboard-atlas project directory."""
     return app.execroot.get_execroot() / ".patchboard-atlas"
@@ -15,3 +27,23 @@ def project_dir():
 def component_id_cards_dir():
     """Return the persistence directory for Component ID Cards."""
     return project_dir() / "component-id-cards"
+
+
+def workspace_file():
+    """Return the workspace snapshot file (entities, layout, camera)."""
+    return project_dir() / "workspace.snapshot"
+
+
+def drop_index_file():
+    """Return the drop folder's file index (name -> card key and stat)."""
+    return project_dir() / "drop-index.json"
+
+
+def profile_dir():
+    """Return the directory for profiling exports and cProfile captures."""
+    return project_dir() / "profiles"
+
+
+def log_dir():
+    """Return the directory holding persistent JSON-lines log files."""
+    return project_dir() / "logs"
@@ -0,0 +1,191 @@
+"""
+Write-behind persistence queue for Patchboard Atlas.
+
+Callers on the Tk thread hand over finished bytes (or a delete) for a
+path and return immediately; a background thread does the I/O.
+
+  - Coalescing: only the latest operation per path is kept, so a card
+    rewritten ten times before the writer gets to it is written once.
+  - Atomicity: writes go to a temp file in the same folder, are fsynced,
+    then os.replace()d over the target; a crash leaves either the old
+    or the new file, never a torn one.  Each batch ends with one fsync
+    per touched directory so the renames are durable too.
+  - Ordering: per path, the last operation enqueued is the one on disk
+    after a flush; a delete after a write removes the file, a write
+    after a delete recreates it.  Batches are applied in the order
+    their paths were first enqueued.
+
+flush_persist_queue() blocks until everything enqueued so far is on
+disk.  It is called before persisted cards are read back, on shutdown,
+and by reset().
+"""
+
+import os
+import threading
+
+WRITE = "write"
+DELETE = "delete"
+
+g = {
+    "cond": threading.Condition(),
+    "pending": {},      # path -> (op, data); guarded by "cond"
+    "busy": False,      # writer is applying a batch; guarded by "cond"
+    "stop": False,
+    "thread": None,
+    "writes": 0,        # files written
+    "deletes": 0,       # files removed
+    "coalesced": 0,     # operations superseded before being applied
+    "failures": [],     # [(path, message)] since the last flush
+}
+
+
+# ============================================================
+# FILE OPERATIONS
+# ============================================================
+
+def write_atomic(path, data):
+    """Write bytes to path via temp file + fsync + os.replace."""
+    dirpath, name = os.path.split(path)
+    tmp_path = os.path.join(dirpath, f".{name}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+def _fsync_dir(dirpath):
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def apply_batch(batch):
+    """Apply {path: (op, data)} in order.  Returns [(path, message)] failures."""
+    failures = []
+    dirs = set()
+    for path, (op, data) in batch.items():
+        try:
+            if op == WRITE:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_atomic(path, data)
+                g["writes"] += 1
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                g["deletes"] += 1
+            dirs.add(os.path.dirname(path))
+        except OSError as exc:
+            failures.append((path, str(exc)))
+    for dirpath in dirs:
+        _fsync_dir(dirpath)
+    return failures
+
+
+# ============================================================
+# WRITER THREAD
+# ============================================================
+
+def _writer_loop():
+    cond = g["cond"]
+    while True:
+        with cond:
+            while not g["pending"] and not g["stop"]:
+                cond.wait()
+            if not g["pending"]:
+                return  # stopping and drained
+            batch = g["pending"]
+            g["pending"] = {}
+            g["busy"] = True
+        failures = []
+        try:
+            failures = apply_batch(batch)
+        except Exception as exc:
+            failures = [(path, f"persist batch failed: {exc!r}") for path in batch]
+        finally:
+            with cond:
+                g["failures"].extend(failures)
+                g["busy"] = False
+                cond.notify_all()
+
+
+def _ensure_thread():
+    if g["thread"] is not None:
+        return
+    g["stop"] = False
+    g["thread"] = threading.Thread(target=_writer_loop, name="atlas-persist", daemon=True)
+    g["thread"].start()
+
+
+def _enqueue(path, op, data):
+    path = os.fspath(path)
+    with g["cond"]:
+        _ensure_thread()
+        if path in g["pending"]:
+            g["coalesced"] += 1
+        g["pending"][path] = (op, data)
+        g["cond"].notify_all()
+
+
+def enqueue_write(path, data):
+    """Queue bytes to be written atomically to path.  Never blocks on I/O."""
+    _enqueue(path, WRITE, data)
+
+
+def enqueue_delete(path):
+    """Queue removal of path (after any earlier queued write to it)."""
+    _enqueue(path, DELETE, None)
+
+
+def pending_count():
+    """Number of paths with an operation not yet applied."""
+    with g["cond"]:
+        return len(g["pending"]) + (1 if g["busy"] else 0)
+
+
+def flush_persist_queue():
+    """
+    Block until every operation enqueued so far is on disk.
+
+    Returns [(path, message)] for operations that failed since the
+    last flush.
+    """
+    with g["cond"]:
+        while g["pending"] or g["busy"]:
+            if g["thread"] is None:
+                break
+            g["cond"].wait()
+        failures = g["failures"]
+        g["failures"] = []
+    return failures
+
+
+def stop_persist_queue():
+    """Flush, then stop the writer thread."""
+    thread = g["thread"]
+    if thread is None:
+        return
+    with g["cond"]:
+        g["stop"] = True
+        g["cond"].notify_all()
+    thread.join()
+    g["thread"] = None
+    g["stop"] = False
+
+
+def reset_persist_queue():
+    """Flush and stop the writer, then clear counters."""
+    stop_persist_queue()
+    g["writes"] = 0
+    g["deletes"] = 0
+    g["coalesced"] = 0
+    g["failures"] = []
@@ -0,0 +1,251 @@
+"""
+Profiling hooks for Patchboard Atlas.
+
+Three opt-in instruments, all off by default:
+
+  spans      @timed("name") on a pipeline stage (or "with span(name):"
+             around a block) accumulates call count, total, max and
+             last wall time (perf_counter) per name.
+             Stages: load, validate, cull, tree-rebuild, intent-rebuild,
+             flush, viewport, import.
+  counters   count("name", n) adds to a named counter: canvas items
+             created / updated / deleted, wires skipped for unplaced
+             endpoints.  Hot loops count locally and call count() once.
+  capture    start_capture() runs cProfile on the Tk thread until
+             stop_capture(), which writes a .prof file (pstats format)
+             under paths.profile_dir().
+
+When disabled, a @timed wrapper costs one call and one dict lookup and
+count() returns immediately, so the hooks can stay in place.
+
+Results are printed to the Console window (as "profile" log records) by
+the "prof" console command, and exported as JSON by export_json().
+
+  prof on | off | reset | show | export | capture | stop
+"""
+
+import cProfile
+import functools
+import json
+import time
+from datetime import datetime, timezone
+
+from patchboard_atlas import log
+
+
+g = {
+    "enabled": False,
+    "profiler": None,    # cProfile.Profile while capturing
+}
+
+g_spans = {}      # name -> {"count", "total-s", "max-s", "last-s"}
+
+g_counters = {}   # name -> int
+
+
+# ============================================================
+# SPANS / COUNTERS
+# ============================================================
+
+def _record(name, elapsed):
+    span = g_spans.get(name)
+    if span is None:
+        span = {"count": 0, "total-s": 0.0, "max-s": 0.0, "last-s": 0.0}
+        g_spans[name] = span
+    span["count"] += 1
+    span["total-s"] += elapsed
+    span["last-s"] = elapsed
+    if elapsed > span["max-s"]:
+        span["max-s"] = elapsed
+
+
+def timed(name):
+    """Decorator: record the wrapped function's wall time under name when enabled."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not g["enabled"]:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager recording the block's wall time under name when enabled."""
+    if not g["enabled"]:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name, n=1):
+    """Add n to counter name (no-op when disabled)."""
+    if not g["enabled"]:
+        return
+    g_counters[name] = g_counters.get(name, 0) + n
+
+
+def enable_profiling(enabled=True):
+    g["enabled"] = enabled
+
+
+def clear_profile():
+    """Zero every span and counter."""
+    g_spans.clear()
+    g_counters.clear()
+
+
+# ============================================================
+# CAPTURE (cProfile)
+# ============================================================
+
+def start_capture():
+    """Begin a cProfile capture on the calling (Tk) thread.  Returns False if running."""
+    if g["profiler"] is not None:
+        return False
+    profiler = cProfile.Profile()
+    g["profiler"] = profiler
+    profiler.enable()
+    return True
+
+
+def stop_capture():
+    """End the capture and write it under paths.profile_dir().  Returns the path, or None."""
+    from patchboard_atlas import paths
+
+    profiler = g["profiler"]
+    if profiler is None:
+        return None
+    profiler.disable()
+    g["profiler"] = None
+    out_dir = paths.profile_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = out_dir / f"capture-{stamp}.prof"
+    profiler.dump_stats(str(path))
+    log.log("profile", f"cProfile capture written: {path}")
+    return path
+
+
+# ============================================================
+# REPORTING
+# ============================================================
+
+def profile_snapshot():
+    """JSON-ready dict of spans (times in ms) and counters."""
+    spans = {}
+    for name, span in sorted(g_spans.items()):
+        spans[name] = {
+            "count": span["count"],
+            "total-ms": round(span["total-s"] * 1000, 3),
+            "mean-ms": round(span["total-s"] * 1000 / span["count"], 3),
+            "max-ms": round(span["max-s"] * 1000, 3),
+            "last-ms": round(span["last-s"] * 1000, 3),
+        }
+    return {
+        "enabled": g["enabled"],
+        "created": datetime.now(timezone.utc).isoformat(),
+        "spans": spans,
+        "counters": dict(sorted(g_counters.items())),
+    }
+
+
+def format_profile():
+    """Console lines summarizing spans and counters."""
+    snapshot = profile_snapshot()
+    lines = []
+    for name, span in snapshot["spans"].items():
+        lines.append(f"{name:<15} n={span['count']:<6} total={span['total-ms']:.1f}ms "
+                     f"mean={span['mean-ms']:.2f}ms max={span['max-ms']:.2f}ms "
+                     f"last={span['last-ms']:.2f}ms")
+    for name, value in snapshot["counters"].items():
+        lines.append(f"{name:<15} {value}")
+    if not lines:
+        lines.append("no profile data" + ("" if g["enabled"] else " (profiling is off; 'prof on')"))
+    return lines
+
+
+def export_json(path=None):
+    """Write profile_snapshot() as JSON (default paths.profile_dir()/profile.json)."""
+    from patchboard_atlas import paths
+    from patchboard_atlas import persist_queue
+
+    if path is None:
+        out_dir = paths.profile_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / "profile.json"
+    persist_queue.write_atomic(path, json.dumps(profile_snapshot(), indent=2).encode("utf-8"))
+    return path
+
+
+def handle_console_command(text):
+    """Run a "prof ..." console command.  Returns False if text is not one."""
+    words = text.split()
+    if not words or words[0] != "prof":
+        return False
+    action = words[1] if len(words) > 1 else "show"
+    if action == "on":
+        enable_profiling(True)
+        log.log("profile", "Profiling on")
+    elif action == "off":
+        enable_profiling(False)
+        log.log("profile", "Profiling off")
+    elif action == "reset":
+        clear_profile()
+        log.log("profile", "Profile cleared")
+    elif action == "show":
+        for line in format_profile():
+            log.log("profile", line)
+    elif action == "export":
+        log.log("profile", f"Profile exported: {export_json()}")
+    elif action == "capture":
+        if start_capture():
+            log.log("profile", "cProfile capture started ('prof stop' to write it)")
+    elif action == "stop":
+        if stop_capture() is None:
+            log.log("profile", "No cProfile capture running", "w")
+    else:
+        log.log("console", f"Unknown prof action: {action}", "w")
+    return True
+
+
+def reset_profiling():
+    """Stop any capture (discarding it), disable, and clear."""
+    profiler = g["profiler"]
+    if profiler is not None:
+        profiler.disable()
+    g["profiler"] = None
+    g["enabled"] = False
+    clear_profile()
@@ -5,10 +5,19 @@ Three-layer architecture:
   World (ECS)  ->  Render Intent (RENDER)  ->  Canvas Substrate (Tk)
 
 sync_all() is the entry point: rebuild intent, then flush to canvas.
+sync_entity() is the incremental path: re-emit one entity and its
+incident wires, then reconcile only their canvas items; sync_wires()
+does the same for a batch of added / removed wires.
 """
 
+import time
+
+from patchboard_atlas import paths
 from patchboard_atlas import ecs_world as ecs
 from patchboard_atlas import gui_scaffold
+from patchboard_atlas import frame_monitor
+from patchboard_atlas import text_metrics
+from patchboard_atlas import profiling as prof
 from patchboard_atlas import coord_machine as cm
 
 
@@ -20,8 +29,17 @@ COMPONENT_W = 120
 COMPONENT_H = 60
 
 PERIMETER_OUTLINE = "#4488cc"
+HOVER_OUTLINE = "#88ccff"
+SELECTED_OUTLINE = "#ffcc44"
+BAND_OUTLINE = "#ffcc44"
 PERIMETER_FILL = "#223344"
 TITLE_FILL = "#ccddee"
+TITLE_FONT = ("Consolas", 10)
+TITLE_PAD = 8  # horizontal room left inside the perimeter, total
+
+WIRE_FILL = "#88aa44"
+WIRE_WIDTH = 2
+WIRE_ROUTING = "straight"  # "straight" | "orthogonal"
 
 
 # ============================================================
@@ -30,13 +48,65 @@ TITLE_FILL = "#ccddee"
 
 RENDER = {}
 
+RENDER_OWNED = {}  # owner -> set[ek]; owner is ek[:2], e.g. ("entity", eid)
+
+idx_placed_inbox = {}  # canonical inbox key -> eid, placed entities only
+
+g_anchor_cache = {}  # eid -> anchor record, see channel_anchors()
+
+g_wire_tags = {}  # wire_id -> "wire|<n>", only for wires with render intent or canvas items
+
+g = {
+    "wire-tag-seq": 0,  # last <n> handed out by wire_tag(); never reused
+}
+
+g_highlight = {
+    "hover": None,      # eid under the pointer, see set_hover_entity()
+    "selected": set(),  # selected eids, see set_selection()
+}
+
+
+def declare(ek, desc):
+    """Declare a render element under its owner."""
+    RENDER[ek] = desc
+    RENDER_OWNED.setdefault(ek[:2], set()).add(ek)
+
+
+def retract(owner):
+    """Remove every render element declared under owner."""
+    for ek in RENDER_OWNED.pop(owner, ()):
+        RENDER.pop(ek, None)
+
+
+def clear_render_intent():
+    """Empty RENDER and its owner index."""
+    RENDER.clear()
+    RENDER_OWNED.clear()
+    idx_placed_inbox.clear()
+
+
+def reset_rendering():
+    """Reset render intent and all rendering caches."""
+    clear_render_intent()
+    g_anchor_cache.clear()
+    g_wire_tags.clear()
+    g["wire-tag-seq"] = 0
+    g_highlight["hover"] = None
+    g_highlight["selected"] = set()
+
 
 # ============================================================
 # ELEMENT KEY HELPERS
 # ============================================================
 
 def ek_to_tag(ek):
-    """Serialize an element_key tuple into a canvas tag string."""
+    """Serialize an element_key tuple into a canvas tag string.
+
+    Wire ids contain folder paths, which are not safe inside canvas tags,
+    so wire keys are serialized through their short wire_tag().
+    """
+    if ek[0] == "wire":
+        return "ek|" + wire_tag(ek[1]) + "|" + "|".join(str(part) for part in ek[2:])
     return "ek|" + "|".join(str(part) for part in ek)
 
 
@@ -45,76 +115,272 @@ def entity_tag(eid):
     return f"entity|{eid}"
 
 
+def wire_tag(wire_id):
+    """Grouping tag for all canvas items belonging to a wire."""
+    tag = g_wire_tags.get(wire_id)
+    if tag is None:
+        g["wire-tag-seq"] += 1
+        tag = f"wire|{g['wire-tag-seq']}"
+        g_wire_tags[wire_id] = tag
+    return tag
+
+
+def _release_wire_tags(wire_ids):
+    """Forget the tags of wires that declare nothing; call after their items are deleted."""
+    for wire_id in wire_ids:
+        if ("wire", wire_id) not in RENDER_OWNED:
+            g_wire_tags.pop(wire_id, None)
+
+
+def owner_tag(owner):
+    """Grouping tag for an owner key (("entity", eid), ("wire", wire_id) or ("overlay", name))."""
+    if owner[0] == "wire":
+        return wire_tag(owner[1])
+    if owner[0] == "overlay":
+        return f"overlay|{owner[1]}"
+    return entity_tag(owner[1])
+
+
+# ============================================================
+# CHANNEL ANCHORS
+# ============================================================
+
+def _layout_anchors(x, names, sy):
+    """Distribute channel anchors evenly down one vertical edge."""
+    top = sy - COMPONENT_H // 2
+    count = len(names)
+    return {
+        name: (x, top + ((i + 1) * COMPONENT_H) // (count + 1))
+        for i, name in enumerate(names)
+    }
+
+
+def channel_anchors(eid):
+    """
+    Return the cached anchor record for a placed entity with a card.
+
+    Record: {"card", "inbox-key", "x", "y", "in-names", "out-names",
+    "in": {channel: (wx, wy)}, "out": {channel: (wx, wy)}}.
+    In-channels sit on the left edge, out-channels on the right edge.
+    The record is recomputed only when the entity's cmp_spatial position,
+    card object, or channel lists differ from what was cached.
+    Returns None if the entity is unplaced or has no card.
+    """
+    spatial = ecs.cmp_spatial.get(eid)
+    card = ecs.cmp_card_ref.get(eid)
+    if spatial is None or card is None:
+        return None
+    sx = spatial["x"]
+    sy = spatial["y"]
+    ch_in = card["channels"]["in"]
+    ch_out = card["channels"]["out"]
+
+    cached = g_anchor_cache.get(eid)
+    if (cached is not None
+            and cached["x"] == sx and cached["y"] == sy
+            and cached["card"] is card
+            and cached["in-names"] == ch_in
+            and cached["out-names"] == ch_out):
+        return cached
+
+    half_w = COMPONENT_W // 2
+    record = {
+        "card": card,
+        "inbox-key": paths.canonical_inbox_key(card["inbox"]),
+        "x": sx,
+        "y": sy,
+        "in-names": list(ch_in),
+        "out-names": list(ch_out),
+        "in": _layout_anchors(sx - half_w, ch_in, sy),
+        "out": _layout_anchors(sx + half_w, ch_out, sy),
+    }
+    g_anchor_cache[eid] = record
+    return record
+
+
+def channel_anchor(eid, direction, channel):
+    """
+    Return the world-space anchor for a channel, or None if unplaced.
+
+    direction: "in" | "out".  Channels not on the card anchor at the
+    middle of the corresponding edge.
+    """
+    record = channel_anchors(eid)
+    if record is None:
+        return None
+    point = record[direction].get(channel)
+    if point is None:
+        half_w = COMPONENT_W // 2
+        edge_x = record["x"] - half_w if direction == "in" else record["x"] + half_w
+        point = (edge_x, record["y"])
+    return point
+
+
 # ============================================================
 # RULES
 # ============================================================
 
+def perimeter_outline(eid):
+    """Outline color for an entity: hover, then selection, then the default."""
+    if g_highlight["hover"] == eid:
+        return HOVER_OUTLINE
+    if eid in g_highlight["selected"]:
+        return SELECTED_OUTLINE
+    return PERIMETER_OUTLINE
+
+
 def rule_perimeter(eid, sx, sy):
     """Emit a perimeter rectangle for a placed entity."""
     half_w = COMPONENT_W // 2
     half_h = COMPONENT_H // 2
     ek = ("entity", eid, "perimeter")
-    RENDER[ek] = {
+    declare(ek, {
         "type": "rectangle",
         "x0": sx - half_w,
         "y0": sy - half_h,
         "x1": sx + half_w,
         "y1": sy + half_h,
-        "outline": PERIMETER_OUTLINE,
+        "outline": perimeter_outline(eid),
         "fill": PERIMETER_FILL,
         "width": 2,
         "tags": (ek_to_tag(ek), entity_tag(eid), "kind|component"),
-    }
+    })
 
 
 def rule_title(eid, sx, sy):
-    """Emit a title label for a placed entity."""
+    """Emit a title label for a placed entity, ellipsized to fit COMPONENT_W."""
     card = ecs.cmp_card_ref.get(eid)
     if card is None:
         return
     ek = ("entity", eid, "title")
-    RENDER[ek] = {
+    declare(ek, {
         "type": "text",
         "x": sx,
         "y": sy,
-        "text": card.get("title", ""),
+        "text": text_metrics.fit_text(TITLE_FONT, card.get("title", ""), COMPONENT_W - TITLE_PAD),
         "fill": TITLE_FILL,
-        "font": ("Consolas", 10),
+        "font": TITLE_FONT,
         "tags": (ek_to_tag(ek), entity_tag(eid), "kind|component"),
-    }
+    })
 
 
 RULES = [rule_perimeter, rule_title]
 
 
+def rule_wire_body(wire_id, src_pt, dst_pt):
+    """Emit the body polyline of a wire between two anchor points."""
+    style = ecs.cmp_wire_style.get(wire_id, {})
+    x0, y0 = src_pt
+    x1, y1 = dst_pt
+    routing = style.get("routing_mode", WIRE_ROUTING)
+    if routing == "straight":
+        coords = [x0, y0, x1, y1]
+    elif routing == "orthogonal":
+        mx = (x0 + x1) // 2
+        coords = [x0, y0, mx, y0, mx, y1, x1, y1]
+    else:
+        raise ValueError(f"rule_wire_body: unknown routing_mode '{routing}'")
+    ek = ("wire", wire_id, "body")
+    declare(ek, {
+        "type": "line",
+        "coords": coords,
+        "fill": style.get("color", WIRE_FILL),
+        "width": style.get("width", WIRE_WIDTH),
+        "tags": (ek_to_tag(ek), wire_tag(wire_id), "kind|wire"),
+    })
+
+
+WIRE_RULES = [rule_wire_body]
+
+
 # ============================================================
 # REBUILD RENDER INTENT
 # ============================================================
 
+def emit_entity(eid):
+    """Run RULES for one placed entity and index its inbox."""
+    spatial = ecs.cmp_spatial[eid]
+    sx = spatial["x"]
+    sy = spatial["y"]
+    for rule in RULES:
+        rule(eid, sx, sy)
+    anchors = channel_anchors(eid)
+    if anchors is not None:
+        idx_placed_inbox[anchors["inbox-key"]] = eid
+
+
+def emit_wire(wire_id):
+    """Run WIRE_RULES for one wire if both endpoint entities are placed.
+
+    Returns False if the wire was skipped (an endpoint is unplaced).
+    """
+    source_inbox, source_channel, dest_channel, dest_inbox = wire_id
+    src_eid = idx_placed_inbox.get(source_inbox)
+    dst_eid = idx_placed_inbox.get(dest_inbox)
+    if src_eid is None or dst_eid is None:
+        return False
+    src_pt = channel_anchor(src_eid, "out", source_channel)
+    dst_pt = channel_anchor(dst_eid, "in", dest_channel)
+    for rule in WIRE_RULES:
+        rule(wire_id, src_pt, dst_pt)
+    return True
+
+
+@prof.timed("intent-rebuild")
 def rebuild_render_intent():
     """Clear RENDER and recompute from world state."""
-    RENDER.clear()
-    for eid in sorted(ecs.cmp_entities):
-        spatial = ecs.cmp_spatial.get(eid)
-        if spatial is None:
-            continue
-        sx = spatial["x"]
-        sy = spatial["y"]
-        for rule in RULES:
-            rule(eid, sx, sy)
+    clear_render_intent()
+    for eid in ecs.query("entities", "spatial"):
+        emit_entity(eid)
+    skipped = 0
+    for wire_id in ecs.cmp_wires:
+        if not emit_wire(wire_id):
+            skipped += 1
+    prof.count("wires-skipped", skipped)
+
+
+def update_entity_intent(eid):
+    """
+    Re-emit render intent for one entity and its incident wires.
+
+    Covers placement, move, and unplacement of an existing entity.
+    Returns the list of affected owners for flush_owners().
+    Entity removal should go through sync_all(), since the removed
+    entity's wires are already gone from the indices.
+    """
+    retract(("entity", eid))
+    cached = g_anchor_cache.get(eid)
+    if cached is not None and idx_placed_inbox.get(cached["inbox-key"]) == eid:
+        del idx_placed_inbox[cached["inbox-key"]]
+    if eid in ecs.cmp_entities and eid in ecs.cmp_spatial:
+        emit_entity(eid)
+    else:
+        g_anchor_cache.pop(eid, None)
+
+    owners = [("entity", eid)]
+    for wire_id in ecs.wires_touching_entity(eid):
+        owner = ("wire", wire_id)
+        retract(owner)
+        emit_wire(wire_id)
+        owners.append(owner)
+    return owners
 
 
 # ============================================================
 # FLUSH TO CANVAS
 # ============================================================
 
-def _collect_existing_ek_tags(canvas):
-    """Return set of ek|... tags currently on the canvas."""
+KIND_TAGS = ("kind|component", "kind|wire", "kind|overlay")
+
+
+def _collect_existing_ek_tags(canvas, group_tags=KIND_TAGS):
+    """Return set of ek|... tags on canvas items carrying any of group_tags."""
     found = set()
-    for item_id in canvas.find_withtag("kind|component"):
-        for tag in canvas.gettags(item_id):
-            if tag.startswith("ek|"):
-                found.add(tag)
+    for group_tag in group_tags:
+        for item_id in canvas.find_withtag(group_tag):
+            for tag in canvas.gettags(item_id):
+                if tag.startswith("ek|"):
+                    found.add(tag)
     return found
 
 
@@ -124,6 +390,9 @@ def _create_element(canvas, desc):
         item_id = canvas.create_rectangle(0, 0, 0, 0, tags=desc["tags"])
     elif desc["type"] == "text":
         item_id = canvas.create_text(0, 0, text="", tags=desc["tags"])
+    elif desc["type"] == "line":
+        item_id = canvas.create_line(0, 0, 0, 0, tags=desc["tags"])
+        canvas.tag_lower(item_id)
     else:
         raise ValueError(f"_create_element: unknown type '{desc['type']}'")
     return item_id
@@ -158,30 +427,96 @@ def _update_element(canvas, item_id, desc):
                              fill=desc["fill"],
                              font=desc["font"])
 
+    elif desc["type"] == "line":
+        coords = desc["coords"]
+        projected = []
+        for i in range(0, len(coords), 2):
+            cm.set_xy(coords[i], coords[i + 1])
+            cm.g_coord["coord-type"] = "w"
+            cm.project_to("c")
+            projected.extend(cm.get_xy())
 
+        canvas.coords(item_id, *projected)
+        canvas.itemconfigure(item_id,
+                             fill=desc["fill"],
+                             width=desc["width"])
+
+
+def _reconcile_element(canvas, ek, desc):
+    """Create the canvas item for ek if missing, then shape it from desc.
+
+    Returns True if the item was created.
+    """
+    items = canvas.find_withtag(ek_to_tag(ek))
+    if not items:
+        item_id = _create_element(canvas, desc)
+    else:
+        item_id = items[0]
+    _update_element(canvas, item_id, desc)
+    return not items
+
+
+@prof.timed("flush")
 def flush_to_canvas():
     """Reconcile RENDER intent against canvas items."""
     canvas = gui_scaffold.widgets.get("canvas")
     if canvas is None:
+        _release_wire_tags(list(g_wire_tags))
         return
 
     declared_tags = set(ek_to_tag(ek) for ek in RENDER)
     existing_tags = _collect_existing_ek_tags(canvas)
 
     # create or update declared elements
+    created = 0
     for ek, desc in RENDER.items():
-        ek_tag = ek_to_tag(ek)
-        items = canvas.find_withtag(ek_tag)
-        if not items:
-            item_id = _create_element(canvas, desc)
-        else:
-            item_id = items[0]
-        _update_element(canvas, item_id, desc)
+        created += _reconcile_element(canvas, ek, desc)
 
     # delete elements no longer declared
+    deleted = 0
     for old_tag in existing_tags - declared_tags:
         for item_id in canvas.find_withtag(old_tag):
             canvas.delete(item_id)
+            deleted += 1
+    _release_wire_tags(list(g_wire_tags))
+
+    prof.count("items-created", created)
+    prof.count("items-updated", len(RENDER) - created)
+    prof.count("items-deleted", deleted)
+
+
+@prof.timed("flush")
+def flush_owners(owners):
+    """Reconcile only the canvas items of the given owners against RENDER."""
+    wire_ids = [owner[1] for owner in owners if owner[0] == "wire"]
+    canvas = gui_scaffold.widgets.get("canvas")
+    if canvas is None:
+        _release_wire_tags(wire_ids)
+        return
+
+    created = 0
+    updated = 0
+    deleted = 0
+    for owner in owners:
+        eks = RENDER_OWNED.get(owner, ())
+        declared_tags = set(ek_to_tag(ek) for ek in eks)
+        existing_tags = _collect_existing_ek_tags(canvas, (owner_tag(owner),))
+
+        for ek in eks:
+            if _reconcile_element(canvas, ek, RENDER[ek]):
+                created += 1
+            else:
+                updated += 1
+
+        for old_tag in existing_tags - declared_tags:
+            for item_id in canvas.find_withtag(old_tag):
+                canvas.delete(item_id)
+                deleted += 1
+    _release_wire_tags(wire_ids)
+
+    prof.count("items-created", created)
+    prof.count("items-updated", updated)
+    prof.count("items-deleted", deleted)
 
 
 # ============================================================
@@ -190,11 +525,82 @@ def flush_to_canvas():
 
 def sync_all():
     """Main entry point: rebuild intent, then flush to canvas."""
+    start = time.perf_counter()
     _update_viewport()
     rebuild_render_intent()
     flush_to_canvas()
+    frame_monitor.record_sync(time.perf_counter() - start)
+
 
+def reproject_all():
+    """Camera-only entry point: re-project existing intent onto the canvas."""
+    start = time.perf_counter()
+    _update_viewport()
+    flush_to_canvas()
+    frame_monitor.record_sync(time.perf_counter() - start, "reproject")
+
+
+def sync_entity(eid):
+    """Incremental entry point: re-emit and re-flush one entity and its wires."""
+    start = time.perf_counter()
+    flush_owners(update_entity_intent(eid))
+    frame_monitor.record_sync(time.perf_counter() - start, "incremental")
+
+
+def sync_entities(eids):
+    """Incremental entry point for a batch: re-emit every eid, then one flush of all owners."""
+    start = time.perf_counter()
+    owners = []
+    seen = set()
+    for eid in eids:
+        for owner in update_entity_intent(eid):
+            if owner not in seen:
+                seen.add(owner)
+                owners.append(owner)
+    flush_owners(owners)
+    frame_monitor.record_sync(time.perf_counter() - start, "incremental")
+
+
+def sync_wires(added, removed):
+    """Incremental entry point for wire changes: re-emit and re-flush only those wires."""
+    start = time.perf_counter()
+    owners = []
+    seen = set()
+    for wire_id in list(removed) + list(added):
+        owner = ("wire", wire_id)
+        if owner in seen:
+            continue
+        seen.add(owner)
+        retract(owner)
+        if wire_id in ecs.cmp_wires:
+            emit_wire(wire_id)
+        owners.append(owner)
+    flush_owners(owners)
+    frame_monitor.record_sync(time.perf_counter() - start, "incremental")
+
+
+def set_selection(eids):
+    """Replace the selected set; re-syncs only entities whose highlight changed."""
+    old = g_highlight["selected"]
+    new = set(eids)
+    g_highlight["selected"] = new
+    changed = [eid for eid in sorted(old ^ new) if eid in ecs.cmp_spatial]
+    if changed:
+        sync_entities(changed)
+
+
+def set_hover_entity(eid):
+    """Highlight eid (or nothing, for None); re-syncs only the two entities involved."""
+    old = g_highlight["hover"]
+    if old == eid:
+        return
+    g_highlight["hover"] = eid
+    for changed in (old, eid):
+        if changed is not None and changed in ecs.cmp_spatial:
+            sync_entity(changed)
 
+
+@prof.timed("viewport")
 def _update_viewport():
     """Push current canvas pixel size into the coordinate machine."""
     canvas = gui_scaffold.widgets.get("canvas")
@@ -209,20 +615,23 @@ def _update_viewport():
 # ============================================================
 
 def place_selected_component(event):
-    """Canvas click handler: place the selected tree component at click position."""
+    """Canvas click handler: place the selected tree component at click position.
+
+    Returns True if an entity was placed.
+    """
     tree = gui_scaffold.widgets.get("component-tree")
     if tree is None:
-        return
+        return False
 
     selected = tree.selection()
     if not selected:
-        return
+        return False
 
     eid = int(selected[0])
 
     # already placed -- ignore
     if eid in ecs.cmp_spatial:
-        return
+        return False
 
     # ensure viewport is current before unprojecting
     _update_viewport()
@@ -236,8 +645,23 @@ def place_selected_component(event):
 
     ecs.cmp_spatial[eid] = {"x": wx, "y": wy}
 
-    sync_all()
+    sync_entity(eid)
     gui_scaffold.set_status(f"Placed entity {eid} at ({wx}, {wy})", gui_scaffold.GREEN)
+    return True
+
+
+def on_canvas_press(event):
+    """Button-1: drag a placed component under the pointer, else place the
+    tree selection, else start a rubber-band selection."""
+    from patchboard_atlas import drag_move
+    from patchboard_atlas import selection
+
+    event.widget.focus_set()
+    if drag_move.begin_drag(event):
+        return
+    if place_selected_component(event):
+        return
+    selection.begin_band(event)
 
 
 # ============================================================
@@ -246,7 +670,15 @@ def place_selected_component(event):
 
 def bind_canvas_events():
     """Attach rendering-related event bindings to the canvas."""
+    from patchboard_atlas import drag_move
+    from patchboard_atlas import selection
+
     canvas = gui_scaffold.widgets.get("canvas")
     if canvas is None:
         return
-    canvas.bind("<Button-1>", place_selected_component)
+    canvas.bind("<Button-1>", on_canvas_press)
+    canvas.bind("<B1-Motion>", drag_move.on_drag_motion)
+    canvas.bind("<B1-Motion>", selection.on_band_motion, add="+")
+    canvas.bind("<ButtonRelease-1>", drag_move.on_drag_release)
+    canvas.bind("<ButtonRelease-1>", selection.on_band_release, add="+")
+    selection.bind_selection_keys(canvas)
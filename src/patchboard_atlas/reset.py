@@ -6,18 +6,52 @@ reset call here.
 """
 
 from patchboard_atlas import mem
+from patchboard_atlas import persist_queue
 from patchboard_atlas import log
 from patchboard_atlas import ecs_world as ecs
 from patchboard_atlas import component_registry
 from patchboard_atlas import rendering
+from patchboard_atlas import navigation
+from patchboard_atlas import drag_move
+from patchboard_atlas import hit_test
+from patchboard_atlas import selection
+from patchboard_atlas import layout
 from patchboard_atlas import coord_machine as cm
+from patchboard_atlas import console_feed
+from patchboard_atlas import router_projection
+from patchboard_atlas import folder_watch
+from patchboard_atlas import drop_folder
+from patchboard_atlas import filetalk_writer
+from patchboard_atlas import router_observer
+from patchboard_atlas import workspace
+from patchboard_atlas import profiling
+from patchboard_atlas import frame_monitor
+from patchboard_atlas import text_metrics
+from patchboard_atlas import minimap
 
 
 def reset():
     """Reset all module state to initial empty condition."""
+    persist_queue.reset_persist_queue()
     mem.clear()
     log.clear_log()
     ecs.reset_ecs()
     component_registry.clear_registry()
-    rendering.RENDER.clear()
+    rendering.reset_rendering()
+    text_metrics.reset_text_metrics()
+    navigation.reset_navigation()
+    drag_move.reset_drag_move()
+    hit_test.reset_hit_test()
+    minimap.reset_minimap()
+    selection.reset_selection()
+    layout.reset_layout()
+    workspace.reset_workspace()
     cm.coord_reset_state()
+    console_feed.reset_console_feed()
+    router_observer.reset_router_observer()
+    router_projection.reset_router_projection()
+    folder_watch.reset_folder_watch()
+    drop_folder.reset_drop_folder()
+    filetalk_writer.reset_filetalk_writer()
+    profiling.reset_profiling()
+    frame_monitor.reset_frame_monitor()
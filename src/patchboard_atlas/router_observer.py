@@ -0,0 +1,367 @@
+"""
+Router observer for Patchboard Atlas.
+
+Consumes the Patchboard Router's notices from its OUTBOX (config key
+"path.router.outbox") and keeps loaded_router_routes in step with the
+published routes.json (config key "path.router.routes"; defaults to
+routes.json beside the outbox folder).
+
+A background thread drains the outbox in bounded batches (NOTICE_BATCH
+files per cycle, oldest first), consuming each notice file.  However many
+"routes-changed" notices a batch contains, it costs one
+read_routes_if_changed() call, and the parsed result is parked in a
+single hand-off slot rather than queued: if the Tk thread has not taken
+the previous result yet, the new one simply replaces it.  A router storm
+therefore produces at most one install_routes() + sync per Tk tick, no
+matter how many notices arrived.
+
+Backpressure metrics live in g["metrics"]:
+
+  backlog       -- notice files still waiting in the outbox after the last batch
+  pending       -- 1 if a parsed routes list is waiting for the Tk thread
+  notices       -- notice files consumed
+  coalesced     -- routes-changed notices absorbed by another notice's reload
+  reloads       -- routes.json reads triggered on the worker
+  applied       -- install_routes() calls on the Tk thread
+  lag-s         -- oldest notice covered by the last apply -> apply time
+  max-lag-s     -- worst lag-s seen
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import lionscliapp as app
+
+from patchboard_atlas import log
+from patchboard_atlas import inotify
+from patchboard_atlas import filetalk_writer
+from patchboard_atlas import router_projection as rp
+
+
+DRAIN_MS = 100
+POLL_S = 0.5
+NOTICE_BATCH = 256  # notice files consumed per worker cycle
+
+ROUTES_CHANGED = "routes-changed"
+
+OUTBOX_MASK = (inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO
+               | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF)
+
+g = {
+    "lock": threading.Lock(),
+    "outbox-dir": None,
+    "routes-path": None,
+    "thread": None,
+    "stop": None,
+    "wake": None,          # (read_fd, write_fd) pipe interrupting select
+    "wake-event": None,    # interrupts the polling wait
+    "backend": None,       # "inotify" | "poll", set by the thread
+    "slot": None,          # hand-off to the Tk thread, guarded by "lock"
+    "after-id": None,
+    "metrics": None,
+}
+
+
+def _new_slot():
+    return {
+        "routes": None,    # latest parsed routes list, or None
+        "since": None,     # time.time() of oldest notice not yet applied
+        "other": {},       # non-routes channel -> count
+        "malformed": 0,
+    }
+
+
+def _new_metrics():
+    return {
+        "backlog": 0,
+        "pending": 0,
+        "notices": 0,
+        "coalesced": 0,
+        "reloads": 0,
+        "applied": 0,
+        "lag-s": 0.0,
+        "max-lag-s": 0.0,
+    }
+
+
+g["slot"] = _new_slot()
+g["metrics"] = _new_metrics()
+
+
+# ============================================================
+# PURE HELPERS
+# ============================================================
+
+def is_notice_name(name):
+    """True for outbox files the observer consumes (*.json, not hidden/temp)."""
+    return name.endswith(".json") and not name.startswith(".")
+
+
+def list_notices(outbox_dir):
+    """Return [(mtime, path), ...] for notice files, oldest first."""
+    notices = []
+    try:
+        with os.scandir(outbox_dir) as it:
+            for entry in it:
+                if not is_notice_name(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                notices.append((mtime, entry.path))
+    except OSError:
+        pass
+    notices.sort()
+    return notices
+
+
+def read_notice(path):
+    """Parse and consume one notice file.  Returns its channel, or None if malformed."""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+    except OSError:
+        return None
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    try:
+        message = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(message, dict) or not isinstance(message.get("channel"), str):
+        return None
+    return message["channel"]
+
+
+def default_routes_path(outbox_dir):
+    """routes.json beside the router's outbox folder."""
+    return Path(outbox_dir).parent / "routes.json"
+
+
+# ============================================================
+# WORKER THREAD
+# ============================================================
+
+def process_notice_batch(outbox_dir, routes_path, reload_first=False):
+    """
+    Consume up to NOTICE_BATCH notices and park the result in g["slot"].
+
+    Runs on the worker thread (callable directly from tests).  Returns
+    the number of notice files still waiting in the outbox.
+    """
+    notices = list_notices(outbox_dir)
+    batch = notices[:NOTICE_BATCH]
+    backlog = len(notices) - len(batch)
+
+    routes_changed = 1 if reload_first else 0
+    other = {}
+    malformed = 0
+    for _mtime, path in batch:
+        channel = read_notice(path)
+        if channel is None:
+            malformed += 1
+        elif channel == ROUTES_CHANGED:
+            routes_changed += 1
+        else:
+            other[channel] = other.get(channel, 0) + 1
+
+    routes = None
+    if routes_changed:
+        routes = rp.read_routes_if_changed(routes_path)
+
+    oldest = batch[0][0] if batch else time.time()
+    with g["lock"]:
+        slot = g["slot"]
+        m = g["metrics"]
+        m["notices"] += len(batch)
+        m["backlog"] = backlog
+        if routes_changed:
+            m["reloads"] += 1
+            m["coalesced"] += routes_changed - 1
+        if routes is not None:
+            if slot["routes"] is not None:
+                m["coalesced"] += 1  # previous result superseded before the Tk thread took it
+            slot["routes"] = routes
+        if batch or routes is not None:
+            if slot["since"] is None or oldest < slot["since"]:
+                slot["since"] = oldest
+        for channel, count in other.items():
+            slot["other"][channel] = slot["other"].get(channel, 0) + count
+        slot["malformed"] += malformed
+        m["pending"] = 1 if slot["routes"] is not None else 0
+    return backlog
+
+
+def _observer_loop(stop, wake_event, wake_fd, outbox_dir, routes_path):
+    """Background thread: wait for outbox activity, drain notices in batches."""
+    fd = inotify.init()
+    wd = -1
+    if fd is not None:
+        wd = inotify.add_watch(fd, outbox_dir, OUTBOX_MASK)
+    g["backend"] = "inotify" if wd >= 0 else "poll"
+
+    backlog = process_notice_batch(outbox_dir, routes_path, reload_first=True)
+    try:
+        while not stop.is_set():
+            if backlog:
+                pass  # storm: keep draining without waiting
+            elif wd >= 0:
+                for _wd, mask, _name in inotify.read_events(fd, wake_fd, POLL_S):
+                    if mask & (inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF | inotify.IN_IGNORED):
+                        wd = -1  # watch lost: continue by polling
+            else:
+                wake_event.wait(POLL_S)
+                wake_event.clear()
+            if stop.is_set():
+                break
+            backlog = process_notice_batch(outbox_dir, routes_path)
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def start_observer_thread(outbox_dir, routes_path):
+    """Start observing outbox_dir on a background thread.  No-op if running."""
+    if g["thread"] is not None:
+        return
+    g["outbox-dir"] = outbox_dir
+    g["routes-path"] = routes_path
+    g["stop"] = threading.Event()
+    g["wake-event"] = threading.Event()
+    g["wake"] = os.pipe()
+    os.set_blocking(g["wake"][1], False)
+    g["thread"] = threading.Thread(
+        target=_observer_loop,
+        args=(g["stop"], g["wake-event"], g["wake"][0], outbox_dir, routes_path),
+        name="atlas-router-observer",
+        daemon=True,
+    )
+    g["thread"].start()
+
+
+def stop_observer_thread():
+    """Signal the observer thread to stop and join it."""
+    thread = g["thread"]
+    if thread is None:
+        return
+    g["stop"].set()
+    g["wake-event"].set()
+    try:
+        os.write(g["wake"][1], b"x")
+    except BlockingIOError:
+        pass
+    thread.join()
+    for wake_fd in g["wake"]:
+        os.close(wake_fd)
+    g["thread"] = None
+    g["stop"] = None
+    g["wake"] = None
+    g["wake-event"] = None
+    g["backend"] = None
+
+
+# ============================================================
+# TK THREAD
+# ============================================================
+
+def take_slot():
+    """Swap out the hand-off slot (thread-safe).  Returns the taken slot."""
+    with g["lock"]:
+        slot = g["slot"]
+        g["slot"] = _new_slot()
+        g["metrics"]["pending"] = 0
+    return slot
+
+
+def apply_router_state():
+    """
+    Apply whatever the worker has parked: install routes, log notices.
+
+    Returns (added_wire_ids, removed_wire_ids), or None if no routes
+    were waiting.
+    """
+    slot = take_slot()
+    for channel, count in sorted(slot["other"].items()):
+        log.log("router", f"Router notice '{channel}' x{count}")
+    if slot["malformed"]:
+        log.log("router", f"Discarded {slot['malformed']} malformed router notice(s)", "w")
+    if slot["since"] is not None:
+        lag = max(0.0, time.time() - slot["since"])
+        m = g["metrics"]
+        m["lag-s"] = lag
+        m["max-lag-s"] = max(m["max-lag-s"], lag)
+    if slot["routes"] is None:
+        return None
+    g["metrics"]["applied"] += 1
+    return rp.install_routes(slot["routes"])
+
+
+def start_router_observer(outbox_dir=None, routes_path=None):
+    """Start observing the router outbox from config; no-op if none is configured."""
+    if outbox_dir is None:
+        outbox_dir = app.ctx.get("path.router.outbox")
+    if outbox_dir is None:
+        return
+    if routes_path is None:
+        routes_path = app.ctx.get("path.router.routes")
+    if routes_path is None:
+        routes_path = default_routes_path(outbox_dir)
+    outbox_dir = Path(outbox_dir)
+    log.log("router", f"Observing router outbox: {outbox_dir}")
+    start_observer_thread(outbox_dir, Path(routes_path))
+    _tick()
+
+
+def _tick():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if root is None or g["thread"] is None:
+        g["after-id"] = None
+        return
+    sync_router_wires()
+    filetalk_writer.report_write_errors()
+    g["after-id"] = root.after(DRAIN_MS, _tick)
+
+
+def sync_router_wires():
+    """
+    Apply parked routes and card-driven re-projection, then re-render
+    only the wires that changed.  Returns (added_wire_ids, removed_wire_ids).
+    """
+    from patchboard_atlas import rendering
+
+    added = []
+    removed = []
+    for result in (apply_router_state(), rp.sync_route_projection()):
+        if result is not None:
+            added.extend(result[0])
+            removed.extend(result[1])
+    if added or removed:
+        rendering.sync_wires(added, removed)
+    return (added, removed)
+
+
+def reset_router_observer():
+    """Stop the observer thread and clear the hand-off slot and metrics."""
+    from patchboard_atlas import gui_scaffold
+
+    after_id = g["after-id"]
+    g["after-id"] = None
+    root = gui_scaffold.widgets.get("root")
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+    stop_observer_thread()
+    g["outbox-dir"] = None
+    g["routes-path"] = None
+    with g["lock"]:
+        g["slot"] = _new_slot()
+        g["metrics"] = _new_metrics()
@@ -0,0 +1,247 @@
+"""
+Router projection for Patchboard Atlas.
+
+Caches the Patchboard Router's published routes.json in
+loaded_router_routes and projects routes into ECS wires.
+
+The cache is replaced wholesale on every real change.  Change detection
+is layered so that unchanged republishes stay cheap: compare stat
+(mtime, size) first, then a content hash, and only then parse.  After a
+real change, the projected wire set is reconciled against cmp_wires,
+so downstream wire state is updated only where routing actually changed.
+
+A route's wire_id depends on which card owns its folders, so the
+"router-projection" ECS journal subscription watches entity and
+card_ref changes: sync_route_projection() (called from the router
+observer's tick) rebuilds idx_folder_to_entity and re-projects the
+loaded routes when a card is imported, replaced, or culled.  Wires that
+an entity removal cascaded away are restored by the same reconcile.
+"""
+
+import hashlib
+import json
+import os
+
+from patchboard_atlas import log
+from patchboard_atlas import paths
+from patchboard_atlas import ecs_world as ecs
+
+
+loaded_router_routes = []
+
+idx_folder_to_entity = {}  # canonical inbox/outbox folder -> eid
+
+idx_route_to_wire = {}  # route key -> wire_id, as last projected
+
+g = {
+    "routes-stat": None,  # (st_mtime_ns, st_size) of last read
+    "routes-hash": None,  # content digest of last parsed file
+}
+
+
+# ============================================================
+# KEYS AND INDICES
+# ============================================================
+
+def route_key(route):
+    """Identity of a route record: (src folder, src channel, dst channel, dst folder)."""
+    return (
+        paths.canonical_folder(route["source-folder"]),
+        route["source-channel"],
+        route["destination-channel"],
+        paths.canonical_folder(route["destination-folder"]),
+    )
+
+
+def rebuild_folder_index():
+    """Rebuild idx_folder_to_entity from cmp_card_ref (inbox and outbox)."""
+    idx_folder_to_entity.clear()
+    for eid, card in ecs.cmp_card_ref.items():
+        idx_folder_to_entity[paths.canonical_folder(card["inbox"])] = eid
+        idx_folder_to_entity[paths.canonical_folder(card["outbox"])] = eid
+
+
+def _inbox_key_for_folder(folder):
+    """Map a route folder to its component's inbox key (or itself if unknown)."""
+    eid = idx_folder_to_entity.get(folder)
+    if eid is None:
+        return folder
+    return paths.canonical_folder(ecs.cmp_card_ref[eid]["inbox"])
+
+
+def route_to_wire_id(key):
+    """Translate a route key into a cmp_wires wire_id."""
+    src_folder, src_channel, dst_channel, dst_folder = key
+    return (
+        _inbox_key_for_folder(src_folder),
+        src_channel,
+        dst_channel,
+        _inbox_key_for_folder(dst_folder),
+    )
+
+
+def wire_to_route(wire_id):
+    """
+    Translate a cmp_wires wire_id back into a route record.
+
+    The source folder is the source component's outbox; the destination
+    folder is the destination component's inbox.  Unknown components
+    fall back to the inbox key carried in the wire_id.
+    """
+    from patchboard_atlas import component_registry as reg
+
+    source_inbox, source_channel, dest_channel, dest_inbox = wire_id
+    source_card = reg.loaded_component_id_cards.get(source_inbox)
+    dest_card = reg.loaded_component_id_cards.get(dest_inbox)
+    return {
+        "source-folder": source_card["outbox"] if source_card is not None else source_inbox,
+        "source-channel": source_channel,
+        "destination-folder": dest_card["inbox"] if dest_card is not None else dest_inbox,
+        "destination-channel": dest_channel,
+    }
+
+
+# ============================================================
+# CHANGE DETECTION
+# ============================================================
+
+def read_routes_if_changed(routes_path):
+    """
+    Return the parsed route list if routes_path changed, else None.
+
+    Stat is compared first; if it differs, the file is read and hashed,
+    and only a differing hash triggers a JSON parse.  A missing file or
+    a parse failure returns None and leaves the previous state intact
+    (so the next call retries).  Touches no ECS state, so it may run
+    on a worker thread.
+    """
+    try:
+        st = os.stat(routes_path)
+    except OSError:
+        return None
+    stat_sig = (st.st_mtime_ns, st.st_size)
+    if stat_sig == g["routes-stat"]:
+        return None
+
+    try:
+        with open(routes_path, "rb") as fh:
+            data = fh.read()
+    except OSError:
+        return None
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if digest == g["routes-hash"]:
+        g["routes-stat"] = stat_sig
+        return None
+
+    try:
+        parsed = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if isinstance(parsed, dict):
+        parsed = parsed.get("routes", [])
+    if not isinstance(parsed, list):
+        return None
+
+    g["routes-stat"] = stat_sig
+    g["routes-hash"] = digest
+    return parsed
+
+
+# ============================================================
+# INSTALL
+# ============================================================
+
+def _cards_changed():
+    """Drain the "router-projection" journal: did entities or cards change?"""
+    ecs.subscribe("router-projection")
+    overflowed, events = ecs.drain_journal("router-projection")
+    return overflowed or any(component in (None, "card_ref")
+                             for _seq, _kind, _eid, component in events)
+
+
+def _reconcile_wires(keys):
+    """
+    Project route keys to wire_ids and make cmp_wires agree.
+
+    Wires projected last time but no longer wanted are removed; wanted
+    wires missing from cmp_wires (new, re-keyed, or cascaded away by a
+    remove_entity) are added.  Returns (added_wire_ids, removed_wire_ids).
+    """
+    projected = {key: route_to_wire_id(key) for key in keys}
+    wanted = set(projected.values())
+
+    removed = []
+    for wire_id in set(idx_route_to_wire.values()) - wanted:
+        if wire_id in ecs.cmp_wires:
+            ecs.remove_wire(wire_id)
+            removed.append(wire_id)
+
+    added = []
+    for wire_id in projected.values():
+        if wire_id not in ecs.cmp_wires:
+            ecs.add_wire(wire_id)
+            added.append(wire_id)
+
+    idx_route_to_wire.clear()
+    idx_route_to_wire.update(projected)
+    return (added, removed)
+
+
+def sync_route_projection():
+    """
+    Re-project the loaded routes if entities or cards changed.
+
+    Returns (added_wire_ids, removed_wire_ids); both empty if nothing
+    relevant changed.
+    """
+    if "router-projection" not in ecs.g_subscribers:
+        return ([], [])  # no routes installed yet
+    if not _cards_changed() or not idx_route_to_wire:
+        return ([], [])
+    rebuild_folder_index()
+    return _reconcile_wires(list(idx_route_to_wire))
+
+
+def install_routes(routes):
+    """
+    Replace loaded_router_routes wholesale and reconcile the wires.
+
+    Malformed route records are skipped with a log warning.
+    Returns (added_wire_ids, removed_wire_ids).
+    """
+    new_keys = {}
+    for route in routes:
+        try:
+            key = route_key(route)
+        except (TypeError, KeyError):
+            log.log("router", "Skipping malformed route record", "w")
+            log.attach_context({"route": route})
+            continue
+        new_keys[key] = route
+
+    loaded_router_routes[:] = list(new_keys.values())
+    if _cards_changed():
+        rebuild_folder_index()
+    return _reconcile_wires(new_keys)
+
+
+def reload_routes(routes_path):
+    """
+    Re-read routes_path if it changed and install it.
+
+    Returns (added_wire_ids, removed_wire_ids), or None if unchanged.
+    """
+    routes = read_routes_if_changed(routes_path)
+    if routes is None:
+        return None
+    return install_routes(routes)
+
+
+def reset_router_projection():
+    """Reset route cache, indices, journal subscription, and change-detection state."""
+    ecs.unsubscribe("router-projection")
+    loaded_router_routes.clear()
+    idx_folder_to_entity.clear()
+    idx_route_to_wire.clear()
+    g["routes-stat"] = None
+    g["routes-hash"] = None
@@ -0,0 +1,243 @@
+"""
+Multi-selection and bulk operations for Patchboard Atlas.
+
+Rubber band: Button-1 pressed on empty canvas (with nothing to place)
+and dragged draws a band; on release every placed entity whose
+perimeter intersects it becomes the selection (Shift adds to it).  The
+band is resolved with hit_test.entities_in_box(), a world-space range
+query, and is itself drawn through render intent as an overlay element.
+
+The selected set lives in rendering.g_highlight["selected"], so the
+selection outline is just another rule_perimeter input.
+
+Bulk operations each apply one batched ECS mutation and then one
+render sync:
+
+  bulk_move(eids, dx, dy)   cmp_spatial.shift()      + sync_entities()
+  bulk_unplace(eids)        cmp_spatial deletions     + sync_entities()
+  bulk_remove(eids)         ecs.remove_entities()     + sync_all()
+
+Dragging a selected component moves the whole selection (drag_move).
+Keys on the canvas: Delete unplaces the selection, Shift+Delete removes
+it, Ctrl+A selects every placed component, Escape clears the selection.
+"""
+
+import tkinter as tk
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import hit_test
+
+
+BAND_OWNER = ("overlay", "band")
+
+SHIFT_MASK = 0x0001
+
+g = {
+    "band-active": False,
+    "band-origin": (0, 0),    # world point at press
+    "band-pointer": (0, 0),   # canvas px of the latest pointer
+    "band-add": False,        # Shift held at press: extend the selection
+    "frame-id": None,
+    "canvas": None,
+}
+
+
+# ============================================================
+# SELECTION
+# ============================================================
+
+def selected():
+    """Sorted tuple of selected eids that still exist."""
+    from patchboard_atlas import rendering
+    return tuple(sorted(eid for eid in rendering.g_highlight["selected"]
+                        if eid in ecs.cmp_entities))
+
+
+def select(eids, add=False):
+    """Set (or, with add=True, extend) the selection."""
+    from patchboard_atlas import rendering
+
+    eids = set(eids)
+    if add:
+        eids |= rendering.g_highlight["selected"]
+    rendering.set_selection(eids)
+
+
+def clear_selection():
+    select(())
+
+
+def select_all_placed():
+    select(ecs.query("entities", "spatial"))
+
+
+# ============================================================
+# BULK OPERATIONS
+# ============================================================
+
+def bulk_move(eids, dx, dy):
+    """Move placed eids by (dx, dy) world units.  Returns the eids moved."""
+    from patchboard_atlas import rendering
+
+    moved = ecs.cmp_spatial.shift(eids, dx, dy)
+    if moved:
+        rendering.sync_entities(moved)
+    return moved
+
+
+def bulk_unplace(eids):
+    """Remove placement from eids (they stay in the tree).  Returns the eids unplaced."""
+    from patchboard_atlas import rendering
+
+    unplaced = [eid for eid in eids if eid in ecs.cmp_spatial]
+    for eid in unplaced:
+        del ecs.cmp_spatial[eid]
+    if unplaced:
+        rendering.set_selection(rendering.g_highlight["selected"] - set(unplaced))
+        rendering.sync_entities(unplaced)
+    return unplaced
+
+
+def bulk_remove(eids):
+    """
+    Remove eids from the atlas: ECS entities, their wires, and (for
+    entities with cards) registry entries and persisted card files.
+    Returns the eids removed.
+    """
+    from patchboard_atlas import rendering
+    from patchboard_atlas import component_registry as reg
+    from patchboard_atlas import tree_projection as tp
+    from patchboard_atlas import folder_watch
+
+    keys = []
+    for eid in eids:
+        card = ecs.cmp_card_ref.get(eid)
+        if card is not None:
+            keys.append(reg.canonical_inbox_key(card["inbox"]))
+    removed = ecs.remove_entities(eids)
+    for key in keys:
+        if key in reg.loaded_component_id_cards:
+            reg.remove_card(key)
+    if not removed:
+        return removed
+
+    rendering.g_highlight["selected"] -= set(removed)
+    if rendering.g_highlight["hover"] in removed:
+        rendering.g_highlight["hover"] = None
+    tp.rebuild_tree()
+    folder_watch.refresh_watch_set()
+    rendering.sync_all()
+    return removed
+
+
+def unplace_selected():
+    from patchboard_atlas import gui_scaffold
+
+    unplaced = bulk_unplace(selected())
+    gui_scaffold.set_status(f"Unplaced {len(unplaced)} component(s).", gui_scaffold.GREEN)
+
+
+def remove_selected():
+    from patchboard_atlas import gui_scaffold
+
+    removed = bulk_remove(selected())
+    gui_scaffold.set_status(f"Removed {len(removed)} component(s).", gui_scaffold.GREEN)
+
+
+# ============================================================
+# RUBBER BAND
+# ============================================================
+
+def _declare_band(x0, y0, x1, y1):
+    from patchboard_atlas import rendering
+
+    rendering.retract(BAND_OWNER)
+    ek = BAND_OWNER + ("rect",)
+    rendering.declare(ek, {
+        "type": "rectangle",
+        "x0": x0,
+        "y0": y0,
+        "x1": x1,
+        "y1": y1,
+        "outline": rendering.BAND_OUTLINE,
+        "fill": "",
+        "width": 1,
+        "tags": (rendering.ek_to_tag(ek), rendering.owner_tag(BAND_OWNER), "kind|overlay"),
+    })
+    rendering.flush_owners([BAND_OWNER])
+
+
+def _clear_band():
+    from patchboard_atlas import rendering
+
+    rendering.retract(BAND_OWNER)
+    rendering.flush_owners([BAND_OWNER])
+
+
+def begin_band(event):
+    """Start a rubber-band selection at the pointer."""
+    g["band-active"] = True
+    g["band-origin"] = hit_test.event_to_world(event)
+    g["band-pointer"] = (event.x, event.y)
+    g["band-add"] = bool(event.state & SHIFT_MASK)
+    g["canvas"] = event.widget
+
+
+def on_band_motion(event):
+    if not g["band-active"]:
+        return
+    g["band-pointer"] = (event.x, event.y)
+    if g["frame-id"] is None:
+        g["frame-id"] = event.widget.after_idle(_band_frame)
+
+
+def _band_corners():
+    x1, y1 = hit_test.canvas_to_world(*g["band-pointer"])
+    x0, y0 = g["band-origin"]
+    return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+
+def _band_frame():
+    g["frame-id"] = None
+    if g["band-active"]:
+        _declare_band(*_band_corners())
+
+
+def on_band_release(event):
+    """Finish the band: select what it covers (a click on empty space clears)."""
+    if not g["band-active"]:
+        return
+    g["band-pointer"] = (event.x, event.y)
+    if g["frame-id"] is not None:
+        event.widget.after_cancel(g["frame-id"])
+        g["frame-id"] = None
+    g["band-active"] = False
+    _clear_band()
+    select(hit_test.entities_in_box(*_band_corners()), add=g["band-add"])
+
+
+# ============================================================
+# KEYS
+# ============================================================
+
+def bind_selection_keys(canvas):
+    """Attach selection keyboard shortcuts (the canvas takes focus on click)."""
+    canvas.bind("<Delete>", lambda event: unplace_selected())
+    canvas.bind("<Shift-Delete>", lambda event: remove_selected())
+    canvas.bind("<Control-a>", lambda event: select_all_placed())
+    canvas.bind("<Escape>", lambda event: clear_selection())
+
+
+def reset_selection():
+    """Abandon any band in progress (the selected set is reset with rendering)."""
+    if g["frame-id"] is not None and g["canvas"] is not None:
+        try:
+            g["canvas"].after_cancel(g["frame-id"])
+        except tk.TclError:
+            pass  # canvas already destroyed
+    g["band-active"] = False
+    g["band-origin"] = (0, 0)
+    g["band-pointer"] = (0, 0)
+    g["band-add"] = False
+    g["frame-id"] = None
+    g["canvas"] = None
@@ -9,13 +9,35 @@ from patchboard_atlas import paths
 from patchboard_atlas import component_registry as reg
 from patchboard_atlas import tree_projection as tp
 from patchboard_atlas import rendering
+from patchboard_atlas import navigation
+from patchboard_atlas import hit_test
+from patchboard_atlas import folder_watch
+from patchboard_atlas import drop_folder
+from patchboard_atlas import filetalk_writer
+from patchboard_atlas import router_observer
+from patchboard_atlas import workspace
+from patchboard_atlas import frame_monitor
+from patchboard_atlas import minimap
 
 
 def startup_load():
-    """Load persisted cards, cull invalid ones, rebuild tree, init rendering."""
+    """Restore the workspace snapshot (or load persisted cards), cull
+    invalid cards, rebuild tree, init rendering and the minimap, start autosave,
+    start watching card folders and the drop folder, start the
+    FileTalk writer and router observer, and (if enabled) the frame
+    monitor."""
     paths.component_id_cards_dir().mkdir(parents=True, exist_ok=True)
-    reg.load_persisted_cards()
+    workspace.restore_snapshot()
     reg.validate_or_cull_persisted_cards()
     tp.rebuild_tree()
     rendering.bind_canvas_events()
+    navigation.bind_navigation_events()
+    hit_test.bind_hit_test_events()
+    minimap.start_minimap()
     rendering.sync_all()
+    workspace.start_workspace_autosave()
+    folder_watch.start_folder_watch()
+    drop_folder.start_drop_folder()
+    filetalk_writer.start_filetalk_writer()
+    router_observer.start_router_observer()
+    frame_monitor.start_frame_monitor()
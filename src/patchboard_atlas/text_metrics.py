@@ -0,0 +1,115 @@
+"""
+Text measurement cache for Patchboard Atlas.
+
+font.measure() is a Tcl round-trip; rules that size or truncate labels
+would pay it per title per rebuild.  Two LRU caches make the cost once
+per distinct string:
+
+  g_width_cache   (font, text) -> pixel width
+  g_fit_cache     (font, text, max_width) -> text, or a prefix + ELLIPSIS
+                  that fits (fit_text)
+
+With a Tk root (gui_scaffold.widgets["root"]) widths come from
+tkinter.font; without one (tests, headless export) they are estimated
+from the point size at ESTIMATE_EM per character, which suits the
+monospace title font.  reset_text_metrics() drops both caches, e.g.
+after Tk scaling changes.
+"""
+
+from collections import OrderedDict
+
+
+MAX_ENTRIES = 4096
+ELLIPSIS = "…"
+ESTIMATE_EM = 0.6   # character advance as a fraction of the font's pixel size
+
+
+g_width_cache = OrderedDict()
+
+g_fit_cache = OrderedDict()
+
+g_fonts = {}   # font spec -> tkinter.font.Font
+
+g_stats = {"hits": 0, "misses": 0}
+
+
+def _lru_get(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+        g_stats["hits"] += 1
+    return value
+
+
+def _lru_put(cache, key, value):
+    cache[key] = value
+    if len(cache) > MAX_ENTRIES:
+        cache.popitem(last=False)
+    g_stats["misses"] += 1
+
+
+def _tk_font(font):
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if root is None:
+        return None
+    tk_font = g_fonts.get(font)
+    if tk_font is None:
+        import tkinter.font as tkfont
+        tk_font = tkfont.Font(root=root, font=font)
+        g_fonts[font] = tk_font
+    return tk_font
+
+
+def estimate_width(font, text):
+    """Width estimate without Tk: len(text) * ESTIMATE_EM * pixel size."""
+    size = font[1]
+    px = -size if size < 0 else size * 4 / 3   # Tk: negative sizes are pixels
+    return round(len(text) * ESTIMATE_EM * px)
+
+
+def _measure_uncached(font, text):
+    tk_font = _tk_font(font)
+    return tk_font.measure(text) if tk_font is not None else estimate_width(font, text)
+
+
+def measure(font, text):
+    """Pixel width of text in font (a hashable Tk font spec, e.g. ("Consolas", 10))."""
+    key = (font, text)
+    width = _lru_get(g_width_cache, key)
+    if width is None:
+        width = _measure_uncached(font, text)
+        _lru_put(g_width_cache, key, width)
+    return width
+
+
+def fit_text(font, text, max_width):
+    """text if it fits in max_width pixels, else its longest prefix + ELLIPSIS that does."""
+    key = (font, text, max_width)
+    fitted = _lru_get(g_fit_cache, key)
+    if fitted is not None:
+        return fitted
+    if measure(font, text) <= max_width:
+        fitted = text
+    else:
+        lo, hi = 0, len(text) - 1    # longest prefix length known to fit / to try
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            # probes skip g_width_cache so prefixes don't evict real titles
+            if _measure_uncached(font, text[:mid] + ELLIPSIS) <= max_width:
+                lo = mid
+            else:
+                hi = mid - 1
+        fitted = text[:lo].rstrip() + ELLIPSIS
+    _lru_put(g_fit_cache, key, fitted)
+    return fitted
+
+
+def reset_text_metrics():
+    """Drop both caches and the Tk font objects."""
+    g_width_cache.clear()
+    g_fit_cache.clear()
+    g_fonts.clear()
+    g_stats["hits"] = 0
+    g_stats["misses"] = 0
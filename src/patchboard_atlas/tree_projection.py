@@ -7,6 +7,7 @@ Tree is a pure projection — fully reconstructable from ECS state.
 
 from patchboard_atlas import ecs_world as ecs
 from patchboard_atlas import gui_scaffold
+from patchboard_atlas import profiling as prof
 
 
 g = {
@@ -14,6 +15,7 @@ g = {
 }
 
 
+@prof.timed("tree-rebuild")
 def rebuild_tree():
     """Rebuild the Tree widget from current ECS state.
 
@@ -33,7 +35,7 @@ def rebuild_tree():
         tree.delete(child)
 
     # insert nodes from ECS
-    for eid in sorted(ecs.cmp_entities):
+    for eid in ecs.query("entities", "card_ref"):
         card = ecs.cmp_card_ref[eid]
         tree.insert(
             "",
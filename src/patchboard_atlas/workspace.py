@@ -0,0 +1,313 @@
+"""
+Workspace snapshot for Patchboard Atlas.
+
+Saves the whole world -- entities, card references, spatial placement,
+and the camera (g_cam) -- to one file, paths.workspace_file(), so that
+startup restores it with a single read instead of re-ingesting every
+persisted card file.
+
+File format (pickle-free, versioned):
+
+  MAGIC                      8 bytes
+  version, meta_len, n_xy    struct "<HII"
+  meta                       meta_len bytes of UTF-8 JSON
+  spatial                    n_xy * 3 little-endian int64: eid, x, y
+  digest                     16-byte blake2b of everything above
+
+meta holds next-entity-id, cam, the registry cards, the [eid, inbox key]
+entity list, and a signature of the component-id-cards folder.  On
+restore, a matching signature means the cards in the snapshot are
+current and the world is rebuilt from the snapshot alone; otherwise the
+card files are re-ingested and only the layout (spatial by inbox key,
+camera) is taken from the snapshot.
+
+Saves are debounced: a Tk tick watches the ECS change journal and the
+camera, and writes once changes have been quiet for DEBOUNCE_S (or have
+been pending for MAX_DELAY_S).  While card writes are queued the save
+waits for them to drain, but never past MAX_DELAY_S.  Writes are atomic (temp + os.replace).
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+
+from patchboard_atlas import log
+from patchboard_atlas import paths
+from patchboard_atlas import persist_queue
+from patchboard_atlas import profiling as prof
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas import component_registry as reg
+
+
+MAGIC = b"PBAWS\0\0\0"
+VERSION = 1
+HEADER = struct.Struct("<HII")
+DIGEST_SIZE = 16
+
+CHECK_MS = 250
+DEBOUNCE_S = 1.0
+MAX_DELAY_S = 5.0
+
+CAM_FIELDS = ("x", "y", "zoom-num", "zoom-den")
+
+g = {
+    "dirty-since": None,  # time.monotonic() of the first unsaved change
+    "last-change": None,  # time.monotonic() of the latest unsaved change
+    "saved-cam": None,    # camera tuple as of the last save/restore
+    "saves": 0,
+    "after-id": None,
+}
+
+
+# ============================================================
+# ENCODE / DECODE
+# ============================================================
+
+def card_dir_signature():
+    """Digest of (name, mtime_ns, size) for every persisted card file."""
+    entries = []
+    try:
+        with os.scandir(paths.component_id_cards_dir()) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    entries.sort()
+    return hashlib.blake2b(json.dumps(entries).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cam_tuple():
+    return tuple(cm.g_cam[field] for field in CAM_FIELDS)
+
+
+def encode_snapshot():
+    """Serialize the current world to snapshot bytes."""
+    entities = []
+    for eid in sorted(ecs.cmp_entities):
+        card = ecs.cmp_card_ref.get(eid)
+        key = reg.canonical_inbox_key(card["inbox"]) if card is not None else None
+        entities.append([eid, key])
+    meta = {
+        "next-entity-id": ecs.g["next_entity_id"],
+        "cam": dict(zip(CAM_FIELDS, _cam_tuple())),
+        "cards-signature": card_dir_signature(),
+        "cards": reg.loaded_component_id_cards,
+        "entities": entities,
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+
+    xy = array("q")
+    for eid, x, y in ecs.cmp_spatial.iter_xy():
+        xy.extend((eid, x, y))
+    if sys.byteorder != "little":
+        xy.byteswap()
+
+    body = MAGIC + HEADER.pack(VERSION, len(meta_bytes), len(xy) // 3) + meta_bytes + xy.tobytes()
+    return body + hashlib.blake2b(body, digest_size=DIGEST_SIZE).digest()
+
+
+def decode_snapshot(data):
+    """Return (meta, [(eid, x, y), ...]), or raise ValueError."""
+    if len(data) < len(MAGIC) + HEADER.size + DIGEST_SIZE or not data.startswith(MAGIC):
+        raise ValueError("not a workspace snapshot")
+    body, digest = data[:-DIGEST_SIZE], data[-DIGEST_SIZE:]
+    if hashlib.blake2b(body, digest_size=DIGEST_SIZE).digest() != digest:
+        raise ValueError("snapshot checksum mismatch")
+    version, meta_len, n_xy = HEADER.unpack_from(body, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    start = len(MAGIC) + HEADER.size
+    if len(body) != start + meta_len + n_xy * 24:
+        raise ValueError("snapshot length mismatch")
+    meta = json.loads(body[start:start + meta_len].decode("utf-8"))
+    xy = array("q")
+    xy.frombytes(body[start + meta_len:])
+    if sys.byteorder != "little":
+        xy.byteswap()
+    return meta, [(xy[i], xy[i + 1], xy[i + 2]) for i in range(0, len(xy), 3)]
+
+
+# ============================================================
+# SAVE
+# ============================================================
+
+def save_snapshot():
+    """Write the workspace snapshot now (after pending card writes land)."""
+    for failed_path, message in persist_queue.flush_persist_queue():
+        log.log("persist", f"Card write failed: {message}", "e")
+        log.attach_context({"filepath": failed_path})
+    path = paths.workspace_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    persist_queue.write_atomic(path, encode_snapshot())
+    g["dirty-since"] = None
+    g["last-change"] = None
+    g["saved-cam"] = _cam_tuple()
+    g["saves"] += 1
+
+
+def note_changes(now=None):
+    """Fold ECS journal events and camera moves into the dirty state."""
+    if now is None:
+        now = time.monotonic()
+    ecs.subscribe("workspace")
+    overflowed, events = ecs.drain_journal("workspace")
+    changed = bool(events) or _cam_tuple() != g["saved-cam"]
+    if overflowed and g["saved-cam"] is None:
+        changed = True  # never saved or restored: the first snapshot is due
+    if changed:
+        if g["dirty-since"] is None:
+            g["dirty-since"] = now
+        g["last-change"] = now
+    return changed
+
+
+def save_if_due(now=None):
+    """Save if changes have gone quiet or waited too long.  Returns True if saved."""
+    if now is None:
+        now = time.monotonic()
+    note_changes(now)
+    if g["dirty-since"] is None:
+        return False
+    overdue = now - g["dirty-since"] >= MAX_DELAY_S
+    if now - g["last-change"] < DEBOUNCE_S and not overdue:
+        return False
+    if persist_queue.pending_count() > 0 and not overdue:
+        return False  # save_snapshot() would block the Tk thread on the flush; retry next tick
+    save_snapshot()
+    return True
+
+
+def flush_workspace():
+    """Save immediately if anything changed since the last save (shutdown)."""
+    note_changes()
+    if g["dirty-since"] is not None:
+        save_snapshot()
+
+
+# ============================================================
+# RESTORE
+# ============================================================
+
+def _restore_cam(meta):
+    cam = meta.get("cam", {})
+    for field in CAM_FIELDS:
+        if field in cam:
+            cm.g_cam[field] = cam[field]
+
+
+def _restore_full(meta, spatial):
+    reg.loaded_component_id_cards.update(meta["cards"])
+    for eid, key in meta["entities"]:
+        ecs.cmp_entities.add(eid)
+        if key is not None:
+            ecs.cmp_card_ref[eid] = reg.loaded_component_id_cards[key]
+    ecs.g["next_entity_id"] = meta["next-entity-id"]
+    for eid, x, y in spatial:
+        ecs.cmp_spatial.set_xy(eid, x, y)
+
+
+def _restore_layout(meta, spatial):
+    reg.load_persisted_cards()
+    key_by_eid = {eid: key for eid, key in meta["entities"] if key is not None}
+    for eid, x, y in spatial:
+        key = key_by_eid.get(eid)
+        new_eid = reg.find_entity_by_inbox(key) if key is not None else None
+        if new_eid is not None:
+            ecs.cmp_spatial.set_xy(new_eid, x, y)
+
+
+@prof.timed("load")
+def restore_snapshot():
+    """
+    Rebuild the world from the snapshot, falling back to card files.
+
+    Returns "full" (world from the snapshot alone), "layout" (cards
+    re-ingested, layout from the snapshot) or "cards" (no usable
+    snapshot; plain load_persisted_cards()).
+    """
+    path = paths.workspace_file()
+    try:
+        data = path.read_bytes()
+    except OSError:
+        data = None
+
+    mode = "cards"
+    meta = None
+    if data is not None:
+        try:
+            meta, spatial = decode_snapshot(data)
+            mode = "full" if meta["cards-signature"] == card_dir_signature() else "layout"
+        except (ValueError, KeyError, struct.error, UnicodeDecodeError) as exc:
+            log.log("workspace", f"Ignoring unreadable workspace snapshot: {exc}", "w")
+            log.attach_context({"filepath": str(path)})
+
+    if mode == "full":
+        try:
+            _restore_full(meta, spatial)
+        except (KeyError, TypeError, ValueError) as exc:
+            log.log("workspace", f"Snapshot inconsistent, reloading cards: {exc}", "w")
+            ecs.reset_ecs()
+            reg.clear_registry()
+            mode = "layout"
+    if mode == "layout":
+        _restore_layout(meta, spatial)
+    elif mode == "cards":
+        reg.load_persisted_cards()
+
+    if meta is not None:
+        _restore_cam(meta)
+        g["saved-cam"] = _cam_tuple()
+    ecs.subscribe("workspace")
+    ecs.drain_journal("workspace")  # restoring is not a change
+    g["dirty-since"] = None
+    g["last-change"] = None
+    return mode
+
+
+# ============================================================
+# TK THREAD
+# ============================================================
+
+def start_workspace_autosave():
+    """Begin the debounced autosave tick on the Tk loop."""
+    _tick()
+
+
+def _tick():
+    from patchboard_atlas import gui_scaffold
+
+    root = gui_scaffold.widgets.get("root")
+    if root is None:
+        g["after-id"] = None
+        return
+    try:
+        save_if_due()
+    except OSError as exc:
+        log.log("workspace", f"Workspace save failed: {exc}", "e")
+    g["after-id"] = root.after(CHECK_MS, _tick)
+
+
+def reset_workspace():
+    """Cancel autosave and forget dirty state (does not save)."""
+    from patchboard_atlas import gui_scaffold
+
+    after_id = g["after-id"]
+    g["after-id"] = None
+    root = gui_scaffold.widgets.get("root")
+    if after_id is not None and root is not None:
+        root.after_cancel(after_id)
+    g["dirty-since"] = None
+    g["last-change"] = None
+    g["saved-cam"] = None
+    g["saves"] = 0
@@ -0,0 +1,43 @@
+"""
+Shared test helpers.
+
+Test modules import these directly:  from conftest import make_entity
+"""
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import component_registry as reg
+
+
+def make_card(name, ch_in=("in1",), ch_out=("out1",)):
+    """A valid card for the component at /<name>/inbox and /<name>/outbox."""
+    return {
+        "schema_version": 1,
+        "title": name,
+        "inbox": f"/{name}/inbox",
+        "outbox": f"/{name}/outbox",
+        "channels": {"in": list(ch_in), "out": list(ch_out)},
+    }
+
+
+def inbox_key(name):
+    """Canonical inbox key of make_card(name)."""
+    return reg.canonical_inbox_key(f"/{name}/inbox")
+
+
+def make_entity(name=None, x=None, y=None, ch_in=("in1",), ch_out=("out1",),
+                card=True, register=False):
+    """
+    Allocate an entity, placed at (x, y) unless x is None.
+
+    card      attach make_card(name, ch_in, ch_out); name defaults to f"c{eid}"
+    register  also add the card to loaded_component_id_cards
+    """
+    eid = ecs.allocate_entity()
+    if card:
+        card_obj = make_card(name if name is not None else f"c{eid}", ch_in, ch_out)
+        ecs.cmp_card_ref[eid] = card_obj
+        if register:
+            reg.loaded_component_id_cards[reg.canonical_inbox_key(card_obj["inbox"])] = card_obj
+    if x is not None:
+        ecs.cmp_spatial[eid] = {"x": x, "y": y}
+    return eid
@@ -0,0 +1,148 @@
+import json
+import struct
+import xml.etree.ElementTree as ET
+import zlib
+
+import pytest
+import lionscliapp as app
+
+from patchboard_atlas import board_export as bx
+from patchboard_atlas import paths
+from patchboard_atlas import cliapp
+from patchboard_atlas import rendering
+from patchboard_atlas import workspace
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import component_registry as reg
+from patchboard_atlas.component_registry import canonical_inbox_key
+from patchboard_atlas.reset import reset
+from conftest import make_card, make_entity
+
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    reset()
+
+
+def wire(src, dst):
+    wire_id = (canonical_inbox_key(f"/{src}/inbox"), "out1", "in1", canonical_inbox_key(f"/{dst}/inbox"))
+    ecs.add_wire(wire_id)
+    return wire_id
+
+
+def board():
+    make_entity("a", 0, 0)
+    make_entity("b<&>", 400, 100)
+    make_entity("loose")
+    wire("a", "b<&>")
+    wire("a", "loose")
+
+
+def test_world_descriptors_match_rebuild_and_wires_come_first():
+    board()
+    rendering.rebuild_render_intent()
+    expected = sorted(map(repr, rendering.RENDER.values()))
+    rendering.reset_rendering()
+
+    batches = list(bx.iter_world_descriptors(chunk=1))
+    flat = [desc for batch in batches for desc in batch]
+    assert sorted(map(repr, flat)) == expected
+    assert flat[0]["type"] == "line"
+    assert all(len(batch) <= 2 for batch in batches)  # one owner per chunk
+    assert rendering.RENDER == {}
+
+
+def test_export_svg(tmp_path):
+    board()
+    path = tmp_path / "board.svg"
+    assert bx.export_board(path) == 5
+    root = ET.parse(path).getroot()
+    x0, y0, width, height = map(int, root.get("viewBox").split())
+    assert (x0, y0) == (-rendering.COMPONENT_W // 2 - bx.MARGIN, -rendering.COMPONENT_H // 2 - bx.MARGIN)
+    assert x0 + width == 400 + rendering.COMPONENT_W // 2 + bx.MARGIN
+    assert [el.tag for el in root][1] == SVG_NS + "polyline"
+    assert "b<&>" in [el.text for el in root.iter(SVG_NS + "text")]
+    assert len(root.findall(SVG_NS + "rect")) == 3  # background + 2 components
+
+
+def test_export_png(tmp_path):
+    board()
+    path = tmp_path / "board.png"
+    assert bx.export_board(path, scale=0.5) == 5
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    width, height = struct.unpack(">II", data[16:24])
+    assert (width, height) == (300, 120)
+
+    idat = b""
+    pos = 8
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        tag = data[pos + 4:pos + 8]
+        if tag == b"IDAT":
+            idat += data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+    raw = zlib.decompress(idat)
+    assert len(raw) == height * (1 + width * 3)
+    center = (35 * (1 + width * 3)) + 1 + 50 * 3   # world (0, 0)
+    assert tuple(raw[center:center + 3]) == bx.parse_color(rendering.PERIMETER_FILL)
+
+
+def test_png_scale_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(bx, "PNG_MAX_PX", 64)
+    make_entity("a", 0, 0)
+    make_entity("b", 10000, 0)
+    path = tmp_path / "board.png"
+    bx.export_board(path, scale=1.0)
+    width, height = struct.unpack(">II", path.read_bytes()[16:24])
+    assert width == 64 and height < 64
+
+
+def test_export_rejects_bad_input(tmp_path):
+    with pytest.raises(ValueError):
+        bx.export_board(tmp_path / "board.svg")
+    make_entity("a", 0, 0)
+    with pytest.raises(ValueError):
+        bx.export_board(tmp_path / "board.pdf")
+
+
+def test_live_render_descriptors():
+    board()
+    rendering.rebuild_render_intent()
+    batches = list(bx.iter_render_descriptors())
+    assert [desc["type"] for desc in batches[0]] == ["line"]
+    assert len(rendering.RENDER) == 5
+
+
+def test_export_command_draws_router_routes(tmp_path, monkeypatch):
+    app.reset()
+    app.declare_app("test", "0.1")
+    app.declare_projectdir(".patchboard-atlas")
+    app.execroot.set_execroot(tmp_path)
+    folder = paths.component_id_cards_dir()
+    folder.mkdir(parents=True)
+    for name in ("a", "b"):
+        (folder / f"{name}.json").write_text(json.dumps(make_card(name)), encoding="utf-8")
+    reg.load_persisted_cards()
+    for name, x in (("a", 0), ("b", 400)):
+        ecs.cmp_spatial[reg.find_entity_by_inbox(canonical_inbox_key(f"/{name}/inbox"))] = {"x": x, "y": 0}
+    workspace.save_snapshot()
+    reset()
+
+    router = tmp_path / "router"
+    router.mkdir()
+    (router / "routes.json").write_text(json.dumps([{
+        "source-folder": "/a/outbox", "source-channel": "out1",
+        "destination-folder": "/b/inbox", "destination-channel": "in1",
+    }]), encoding="utf-8")
+    out = tmp_path / "board.svg"
+    monkeypatch.setitem(app.ctx, "execpath.export.out", str(out))
+    monkeypatch.setitem(app.ctx, "export.scale", 1.0)
+    monkeypatch.setitem(app.ctx, "path.router.routes", None)
+    monkeypatch.setitem(app.ctx, "path.router.outbox", str(router / "outbox"))
+    cliapp.export()
+    assert "<polyline" in out.read_text(encoding="utf-8")
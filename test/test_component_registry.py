@@ -5,6 +5,7 @@ import lionscliapp as app
 
 from patchboard_atlas import mem
 from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import persist_queue
 from patchboard_atlas import component_registry as reg
 from patchboard_atlas.reset import reset
 
@@ -206,6 +207,35 @@ def test_find_entity_by_inbox_not_found():
     assert reg.find_entity_by_inbox("C:\\nonexistent") is None
 
 
+def test_find_entity_by_inbox_follows_later_changes():
+    key = reg.canonical_inbox_key(VALID_CARD["inbox"])
+    assert reg.find_entity_by_inbox(key) is None
+
+    eid = ecs.allocate_entity()
+    ecs.cmp_card_ref[eid] = VALID_CARD
+    assert reg.find_entity_by_inbox(key) == eid
+
+    reg.attach_card(eid, VALID_CARD_B)
+    assert reg.find_entity_by_inbox(key) is None
+    assert reg.find_entity_by_inbox(reg.canonical_inbox_key(VALID_CARD_B["inbox"])) == eid
+
+    ecs.remove_entity(eid)
+    assert reg.find_entity_by_inbox(reg.canonical_inbox_key(VALID_CARD_B["inbox"])) is None
+
+
+def test_inbox_index_keeps_no_journal():
+    cards = [{**VALID_CARD, "inbox": f"/{name}/inbox", "outbox": f"/{name}/outbox"} for name in "ab"]
+    for card in cards:
+        mem.push(card)
+        reg.ingest_card()
+        reg.attach_card(ecs.allocate_entity(), mem.pop())
+    reg.remove_card(reg.canonical_inbox_key("/a/inbox"))
+    assert reg.find_entity_by_inbox(reg.canonical_inbox_key("/a/inbox")) is None
+    assert reg.find_entity_by_inbox(reg.canonical_inbox_key("/b/inbox")) is not None
+    assert ecs.g_subscribers == {}
+    assert reg.g_index["card-ref-version"] == ecs.cmp_card_ref.version
+
+
 # --- ingest_card_from_file ---
 
 def test_ingest_card_from_file_valid(tmp_path):
@@ -261,6 +291,7 @@ def test_ingest_cards_from_folder(tmp_path):
 def test_persist_card_writes_file():
     mem.push(VALID_CARD)
     reg.persist_card()
+    persist_queue.flush_persist_queue()
     persist_dir = reg.paths.component_id_cards_dir()
     files = list(persist_dir.glob("*.json"))
     assert len(files) == 1
@@ -295,6 +326,7 @@ def test_delete_persisted_card():
     mem.drop()
     key = reg.canonical_inbox_key(VALID_CARD["inbox"])
     reg.delete_persisted_card(key)
+    persist_queue.flush_persist_queue()
     persist_dir = reg.paths.component_id_cards_dir()
     assert list(persist_dir.glob("*.json")) == []
 
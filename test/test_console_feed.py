@@ -0,0 +1,138 @@
+import pytest
+
+from patchboard_atlas import log
+from patchboard_atlas import gui_scaffold
+from patchboard_atlas import console_feed as cf
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+
+
+def messages(records):
+    return [rec["message"] for rec in records]
+
+
+class FakeText:
+    """Tk Text index arithmetic over a string that always ends in "\n"."""
+
+    def __init__(self):
+        self.text = "\n"
+
+    def winfo_exists(self):
+        return True
+
+    def _offset(self, index):
+        if index.startswith("end"):
+            return len(self.text) - (int(index[4:-1]) if index != "end" else 0)
+        line, col = map(int, index.split("."))
+        offset = 0
+        for _ in range(line - 1):
+            offset = self.text.index("\n", offset) + 1
+        return offset + col
+
+    def index(self, index):
+        offset = self._offset(index)
+        line = self.text.count("\n", 0, offset) + 1
+        col = offset - (self.text.rfind("\n", 0, offset) + 1)
+        return f"{line}.{col}"
+
+    def insert(self, index, *args):
+        assert index == "end"
+        self.text = self.text[:-1] + "".join(args[0::2]) + "\n"
+
+    def delete(self, start, end):
+        a, b = self._offset(start), min(self._offset(end), len(self.text) - 1)
+        self.text = self.text[:a] + self.text[b:]
+
+    def see(self, index):
+        pass
+
+    def lines(self):
+        return [line.split("] ", 1)[1] for line in self.text.splitlines() if line]
+
+
+def test_collect_returns_only_new_records():
+    log.log("a", "one")
+    log.log("a", "two")
+    restarted, records = cf.collect_new_records()
+    assert restarted is False
+    assert messages(records) == ["one", "two"]
+
+    log.log("a", "three")
+    restarted, records = cf.collect_new_records()
+    assert messages(records) == ["three"]
+
+
+def test_collect_with_nothing_new_is_empty():
+    log.log("a", "one")
+    cf.collect_new_records()
+    assert cf.collect_new_records() == (False, [])
+
+
+def test_collect_restarts_after_clear():
+    log.log("a", "one")
+    log.log("a", "two")
+    cf.collect_new_records()
+    log.clear_log()
+    log.log("a", "fresh")
+    log.log("a", "fresh2")
+    restarted, records = cf.collect_new_records()
+    assert restarted is True
+    assert messages(records) == ["fresh", "fresh2"]
+
+
+def test_collect_caps_at_max_lines(monkeypatch):
+    monkeypatch.setattr(cf, "MAX_LINES", 3)
+    for i in range(10):
+        log.log("bulk", str(i))
+    _, records = cf.collect_new_records()
+    assert messages(records) == ["7", "8", "9"]
+
+
+@pytest.mark.parametrize("logged, kept", [(3, ["0", "1", "2"]), (5, ["2", "3", "4"])])
+def test_refresh_trims_to_exactly_max_lines(monkeypatch, logged, kept):
+    monkeypatch.setattr(cf, "MAX_LINES", 3)
+    output = FakeText()
+    monkeypatch.setitem(gui_scaffold.widgets, "console-output", output)
+    for i in range(logged):
+        log.log("bulk", str(i))
+        cf.refresh_console()
+    assert output.lines() == kept
+
+
+def test_level_filter():
+    cf.set_console_filter(levels=["warning", "error"])
+    log.log("a", "info")
+    log.log("a", "warn", "w")
+    log.log("a", "err", "e")
+    _, records = cf.collect_new_records()
+    assert messages(records) == ["warn", "err"]
+
+
+def test_category_filter():
+    cf.set_console_filter(categories=["startup"])
+    log.log("startup", "keep")
+    log.log("import", "skip")
+    _, records = cf.collect_new_records()
+    assert messages(records) == ["keep"]
+
+
+def test_format_record_includes_level_category_and_context():
+    log.log("startup", "culled", "w")
+    log.attach_context({"inbox": "/x"})
+    line = cf.format_record(log.g_log[0])
+    assert " W [startup] culled" in line
+    assert "'inbox': '/x'" in line
+    assert line.endswith("\n")
+
+
+def test_parse_filter_command():
+    assert cf.parse_filter_command("filter level=warning,error") == (["warning", "error"], None)
+    assert cf.parse_filter_command("filter category=startup") == (None, ["startup"])
+    assert cf.parse_filter_command("filter") == (None, None)
+    assert cf.parse_filter_command("hello") is None
+    with pytest.raises(ValueError):
+        cf.parse_filter_command("filter bogus=1")
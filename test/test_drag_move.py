@@ -0,0 +1,185 @@
+import pytest
+
+from patchboard_atlas import drag_move
+from patchboard_atlas import selection
+from patchboard_atlas import rendering
+from patchboard_atlas import gui_scaffold
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+class FakeCanvas:
+    """Records move/tag_raise calls and runs after_idle on demand."""
+
+    def __init__(self):
+        self.calls = []
+        self.idle = {}
+        self.next_id = 0
+
+    def move(self, tag, dx, dy):
+        self.calls.append(("move", tag, dx, dy))
+
+    def tag_raise(self, tag):
+        self.calls.append(("raise", tag))
+
+    def addtag_withtag(self, new_tag, tag):
+        self.calls.append(("addtag", new_tag, tag))
+
+    def dtag(self, tag):
+        self.calls.append(("dtag", tag))
+
+    def focus_set(self):
+        pass
+
+    def after_idle(self, fn):
+        self.next_id += 1
+        idle_id = f"idle{self.next_id}"
+        self.idle[idle_id] = fn
+        return idle_id
+
+    def after_cancel(self, idle_id):
+        self.idle.pop(idle_id, None)
+
+    def run_idle(self):
+        idle, self.idle = self.idle, {}
+        for fn in idle.values():
+            fn()
+
+
+class Event:
+    def __init__(self, widget, x=0, y=0, state=0):
+        self.widget = widget
+        self.x = x
+        self.y = y
+        self.state = state
+
+
+@pytest.fixture(autouse=True)
+def synced(monkeypatch):
+    reset()
+    cm.set_viewport(800, 600)
+    synced = []
+    monkeypatch.setattr(rendering, "sync_entity", synced.append)
+    monkeypatch.setattr(rendering, "sync_all", lambda: pytest.fail("sync_all during drag"))
+    monkeypatch.setattr(gui_scaffold, "set_status", lambda message, color: None)
+    yield synced
+    drag_move.reset_drag_move()
+
+
+def test_press_off_entity_does_not_start_drag():
+    make_entity(None, 0, 0, card=False)
+    assert not drag_move.begin_drag(Event(FakeCanvas(), 700, 500))
+    assert drag_move.g["eid"] is None
+
+
+def test_press_on_unplaced_entity_does_not_start_drag():
+    eid = make_entity(None, 0, 0, card=False)
+    del ecs.cmp_spatial[eid]
+    assert not drag_move.begin_drag(Event(FakeCanvas(), 400, 300))
+
+
+def test_motion_moves_only_the_dragged_entity_and_is_coalesced(synced):
+    eid = make_entity(None, 10, 20, card=False)
+    canvas = FakeCanvas()
+    assert drag_move.begin_drag(Event(canvas, 410, 320))
+    assert ("raise", rendering.entity_tag(eid)) in canvas.calls
+
+    for x, y in ((412, 321), (420, 325), (430, 328)):
+        drag_move.on_drag_motion(Event(canvas, x, y))
+    assert len(canvas.idle) == 1
+    canvas.run_idle()
+
+    assert [c for c in canvas.calls if c[0] == "move"] == [("move", rendering.entity_tag(eid), 20, 8)]
+    assert ecs.cmp_spatial[eid] == {"x": 10, "y": 20}  # world untouched mid-drag
+    assert synced == []
+
+
+def test_release_commits_spatial_and_syncs_only_that_entity(synced):
+    eid = make_entity(None, 10, 20, card=False)
+    other = make_entity(None, 500, 500, card=False)
+    canvas = FakeCanvas()
+    drag_move.begin_drag(Event(canvas, 410, 320))
+    drag_move.on_drag_motion(Event(canvas, 420, 325))
+    canvas.run_idle()
+    drag_move.on_drag_motion(Event(canvas, 435, 310))
+    drag_move.on_drag_release(Event(canvas, 440, 300))
+
+    moved = [c for c in canvas.calls if c[0] == "move"]
+    assert sum(c[2] for c in moved) == 30
+    assert sum(c[3] for c in moved) == -20
+    assert canvas.idle == {}
+    assert ecs.cmp_spatial[eid] == {"x": 40, "y": 0}
+    assert ecs.cmp_spatial[other] == {"x": 500, "y": 500}
+    assert synced == [eid]
+    assert drag_move.g["eid"] is None
+
+
+def test_release_scales_pixels_to_world_by_zoom(synced):
+    cm.set_zoom(2, 1)
+    eid = make_entity(None, 0, 0, card=False)
+    canvas = FakeCanvas()
+    drag_move.begin_drag(Event(canvas, 400, 300))
+    drag_move.on_drag_release(Event(canvas, 421, 280))
+    assert ecs.cmp_spatial[eid] == {"x": 11, "y": -10}  # 21/2 rounds half up
+
+
+def test_click_without_motion_commits_nothing(synced):
+    eid = make_entity(None, 10, 20, card=False)
+    canvas = FakeCanvas()
+    drag_move.begin_drag(Event(canvas, 410, 320))
+    drag_move.on_drag_release(Event(canvas, 410, 320))
+    assert synced == []
+    assert ecs.cmp_spatial[eid] == {"x": 10, "y": 20}
+
+
+def test_press_dispatch_prefers_drag_then_placement_then_band(monkeypatch):
+    placed = []
+
+    def place(event):
+        placed.append(event)
+        return False
+
+    monkeypatch.setattr(rendering, "place_selected_component", place)
+    eid = make_entity(None, 0, 0, card=False)
+    canvas = FakeCanvas()
+
+    rendering.on_canvas_press(Event(canvas, 400, 300))
+    assert drag_move.g["eid"] == eid and placed == []
+    assert rendering.g_highlight["selected"] == {eid}
+
+    drag_move.reset_drag_move()
+    event = Event(canvas, 700, 500)
+    rendering.on_canvas_press(event)
+    assert placed == [event]
+    assert selection.g["band-active"]
+
+
+def test_dragging_a_selected_entity_moves_the_whole_selection(synced):
+    a = make_entity(None, 0, 0, card=False)
+    b = make_entity(None, 300, 0, card=False)
+    c = make_entity(None, 0, 300, card=False)
+    selection.select((a, b))
+    canvas = FakeCanvas()
+
+    drag_move.begin_drag(Event(canvas, 400, 300))
+    assert ("addtag", drag_move.DRAG_TAG, rendering.entity_tag(a)) in canvas.calls
+    assert ("addtag", drag_move.DRAG_TAG, rendering.entity_tag(b)) in canvas.calls
+    drag_move.on_drag_motion(Event(canvas, 410, 305))
+    canvas.run_idle()
+    assert [call for call in canvas.calls if call[0] == "move"] == [("move", drag_move.DRAG_TAG, 10, 5)]
+
+    drag_move.on_drag_release(Event(canvas, 420, 310))
+    assert ("dtag", drag_move.DRAG_TAG) in canvas.calls
+    assert ecs.cmp_spatial[a] == {"x": 20, "y": 10}
+    assert ecs.cmp_spatial[b] == {"x": 320, "y": 10}
+    assert ecs.cmp_spatial[c] == {"x": 0, "y": 300}
+
+
+def test_shift_press_adds_to_selection():
+    a = make_entity(None, 0, 0, card=False)
+    b = make_entity(None, 300, 0, card=False)
+    selection.select((a,))
+    drag_move.begin_drag(Event(FakeCanvas(), 700, 300, state=0x0001))
+    assert rendering.g_highlight["selected"] == {a, b}
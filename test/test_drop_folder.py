@@ -0,0 +1,208 @@
+import json
+import time
+
+import pytest
+import lionscliapp as app
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import persist_queue
+from patchboard_atlas import drop_folder as df
+from patchboard_atlas import component_registry as reg
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state(tmp_path):
+    reset()
+    app.reset()
+    app.declare_app("test", "0.1")
+    app.declare_projectdir(".patchboard-atlas")
+    app.execroot.set_execroot(tmp_path)
+    yield
+    df.reset_drop_folder()
+
+
+def card(name, title=None):
+    return {
+        "schema_version": 1,
+        "title": title or name,
+        "inbox": f"/{name}/inbox",
+        "outbox": f"/{name}/outbox",
+        "channels": {"in": [], "out": []},
+    }
+
+
+def drop(drop_dir, filename, data):
+    (drop_dir / filename).write_text(json.dumps(data), encoding="utf-8")
+
+
+def pump(until, timeout=5.0):
+    totals = [0, 0, 0]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for i, count in enumerate(df.process_drop_events()):
+            totals[i] += count
+        if until(totals):
+            break
+        time.sleep(0.02)
+    return tuple(totals)
+
+
+@pytest.fixture
+def drop_dir(tmp_path):
+    d = tmp_path / "drop"
+    d.mkdir()
+    df.g["drop-dir"] = d
+    return d
+
+
+# --- pure helpers ---
+
+def test_diff_snapshots():
+    old = {"a.json": (1, 10), "b.json": (1, 10)}
+    new = {"a.json": (2, 10), "c.json": (1, 5)}
+    assert df.diff_snapshots(old, new) == {"a.json": df.UPSERT, "c.json": df.UPSERT, "b.json": df.DELETE}
+
+
+def test_snapshot_ignores_non_cards(drop_dir):
+    drop(drop_dir, "a.json", card("a"))
+    (drop_dir / "notes.txt").write_text("x")
+    (drop_dir / ".tmp.json").write_text("x")
+    assert set(df.snapshot_dir(drop_dir)) == {"a.json"}
+
+
+# --- apply_drop_batch ---
+
+def test_apply_upsert_and_delete(drop_dir):
+    drop(drop_dir, "a.json", card("a"))
+    drop(drop_dir, "b.json", card("b"))
+    assert df.apply_drop_batch({"a.json": df.UPSERT, "b.json": df.UPSERT}) == (2, 0, 0)
+    assert len(ecs.cmp_entities) == 2
+
+    (drop_dir / "a.json").unlink()
+    assert df.apply_drop_batch({"a.json": df.DELETE}) == (0, 1, 0)
+    assert list(reg.loaded_component_id_cards) == [reg.canonical_inbox_key("/b/inbox")]
+    assert len(ecs.cmp_entities) == 1
+
+
+def test_apply_unchanged_card_is_skipped(drop_dir):
+    drop(drop_dir, "a.json", card("a"))
+    df.apply_drop_batch({"a.json": df.UPSERT})
+    eid = next(iter(ecs.cmp_entities))
+    assert df.apply_drop_batch({"a.json": df.UPSERT}) == (0, 0, 0)
+    assert ecs.cmp_entities == {eid}
+
+
+def test_apply_modified_card_keeps_placement(drop_dir):
+    drop(drop_dir, "a.json", card("a"))
+    df.apply_drop_batch({"a.json": df.UPSERT})
+    old_eid = next(iter(ecs.cmp_entities))
+    ecs.cmp_spatial[old_eid] = {"x": 5, "y": 7}
+
+    drop(drop_dir, "a.json", card("a", title="Renamed"))
+    assert df.apply_drop_batch({"a.json": df.UPSERT}) == (1, 0, 0)
+    assert ecs.cmp_entities == {old_eid}
+    assert ecs.cmp_card_ref[old_eid]["title"] == "Renamed"
+    assert ecs.cmp_spatial[old_eid] == {"x": 5, "y": 7}
+
+
+def test_apply_modified_card_keeps_wires(drop_dir):
+    drop(drop_dir, "a.json", card("a"))
+    drop(drop_dir, "b.json", card("b"))
+    df.apply_drop_batch({"a.json": df.UPSERT, "b.json": df.UPSERT})
+    wire_id = (reg.canonical_inbox_key("/a/inbox"), "out", "in", reg.canonical_inbox_key("/b/inbox"))
+    ecs.add_wire(wire_id)
+
+    drop(drop_dir, "a.json", card("a", title="Renamed"))
+    assert df.apply_drop_batch({"a.json": df.UPSERT}) == (1, 0, 0)
+    assert wire_id in ecs.cmp_wires
+
+
+def test_apply_reads_each_file_once(drop_dir, monkeypatch):
+    drop(drop_dir, "a.json", card("a"))
+    df.apply_drop_batch({"a.json": df.UPSERT})
+    drop(drop_dir, "a.json", card("a", title="Renamed"))
+
+    reads = []
+    real_read_text = type(drop_dir).read_text
+    monkeypatch.setattr(type(drop_dir), "read_text",
+                        lambda self, *a, **kw: reads.append(self.name) or real_read_text(self, *a, **kw))
+    assert df.apply_drop_batch({"a.json": df.UPSERT}) == (1, 0, 0)
+    assert reads == ["a.json"]
+    st = (drop_dir / "a.json").stat()
+    assert df.idx_drop_file_sig["a.json"] == (st.st_mtime_ns, st.st_size)
+    eid = reg.find_entity_by_inbox(reg.canonical_inbox_key("/a/inbox"))
+    assert ecs.cmp_card_ref[eid] is reg.loaded_component_id_cards[reg.canonical_inbox_key("/a/inbox")]
+
+
+def test_apply_invalid_card_counts_failure(drop_dir):
+    (drop_dir / "bad.json").write_text("{nope", encoding="utf-8")
+    assert df.apply_drop_batch({"bad.json": df.UPSERT}) == (0, 0, 1)
+
+
+def test_apply_listing_removes_missing_names(drop_dir):
+    drop(drop_dir, "a.json", card("a"))
+    drop(drop_dir, "b.json", card("b"))
+    df.apply_drop_batch({"a.json": df.UPSERT, "b.json": df.UPSERT})
+    assert df.apply_drop_batch({}, listing={"b.json"}) == (0, 1, 0)
+    assert list(df.idx_drop_file_to_key) == ["b.json"]
+
+
+# --- persisted index ---
+
+def test_restart_diffs_against_saved_index(drop_dir, monkeypatch):
+    monkeypatch.setattr(df, "POLL_S", 0.05)
+    drop(drop_dir, "a.json", card("a"))
+    drop(drop_dir, "b.json", card("b"))
+    df.apply_drop_batch({"a.json": df.UPSERT, "b.json": df.UPSERT})
+    persist_queue.flush_persist_queue()
+
+    reset()                              # app closed
+    (drop_dir / "b.json").unlink()
+    reg.load_persisted_cards()
+    a_eid = reg.find_entity_by_inbox(reg.canonical_inbox_key("/a/inbox"))
+
+    known = df.load_drop_index(drop_dir)
+    assert set(known) == {"a.json", "b.json"}
+    ingest = df._ingest_dropped
+    read = []
+    monkeypatch.setattr(df, "_ingest_dropped", lambda path, name: read.append(name) or ingest(path, name))
+    df.start_drop_thread(drop_dir, known)
+    assert pump(lambda t: t[1] >= 1) == (0, 1, 0)
+    assert read == []                    # a.json is unchanged: not re-read
+    assert list(reg.loaded_component_id_cards) == [reg.canonical_inbox_key("/a/inbox")]
+    assert ecs.cmp_entities == {a_eid}
+    assert list(df.idx_drop_file_to_key) == ["a.json"]
+
+
+def test_index_for_another_folder_is_ignored(drop_dir, tmp_path):
+    drop(drop_dir, "a.json", card("a"))
+    df.apply_drop_batch({"a.json": df.UPSERT})
+    persist_queue.flush_persist_queue()
+    df.idx_drop_file_to_key.clear()
+    assert df.load_drop_index(tmp_path / "elsewhere") == {}
+    assert df.idx_drop_file_to_key == {}
+
+
+# --- thread ---
+
+@pytest.mark.parametrize("backend", ["inotify", "poll"])
+def test_thread_batches_new_and_deleted_files(drop_dir, monkeypatch, backend):
+    if backend == "poll":
+        monkeypatch.setattr(df.inotify, "init", lambda: None)
+    monkeypatch.setattr(df, "POLL_S", 0.05)
+    drop(drop_dir, "pre.json", card("pre"))
+    df.start_drop_thread(drop_dir)
+
+    assert pump(lambda t: t[0] >= 1) == (1, 0, 0)
+    if backend == "inotify" and df.g["backend"] != "inotify":
+        pytest.skip("inotify unavailable")
+
+    for i in range(50):
+        drop(drop_dir, f"c{i}.json", card(f"c{i}"))
+    assert pump(lambda t: t[0] >= 50) == (50, 0, 0)
+    assert len(ecs.cmp_entities) == 51
+
+    (drop_dir / "c0.json").unlink()
+    assert pump(lambda t: t[1] >= 1) == (0, 1, 0)
+    assert len(ecs.cmp_entities) == 50
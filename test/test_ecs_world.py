@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import pytest
 
 from patchboard_atlas import ecs_world as ecs
@@ -77,3 +80,298 @@ def test_reset_ecs_clears_all_state():
     assert ecs.cmp_entities == set()
     assert ecs.cmp_card_ref == {}
     assert ecs.cmp_spatial == {}
+
+
+# --- wires ---
+
+WIRE_AB = ("/a/inbox", "out1", "in1", "/b/inbox")
+WIRE_AC = ("/a/inbox", "out1", "in1", "/c/inbox")
+WIRE_CB = ("/c/inbox", "out2", "in1", "/b/inbox")
+
+
+def _entity_with_inbox(inbox):
+    eid = ecs.allocate_entity()
+    ecs.cmp_card_ref[eid] = {"title": inbox, "inbox": inbox, "outbox": inbox + "-out"}
+    return eid
+
+
+def test_add_wire_creates_record_and_indices():
+    record = ecs.add_wire(WIRE_AB)
+    assert ecs.cmp_wires[WIRE_AB] is record
+    assert record["wire_id"] == WIRE_AB
+    assert ecs.wires_from("/a/inbox", "out1") == {WIRE_AB}
+    assert ecs.wires_to("/b/inbox", "in1") == {WIRE_AB}
+    assert ecs.wires_touching_inbox("/a/inbox") == {WIRE_AB}
+    assert ecs.wires_touching_inbox("/b/inbox") == {WIRE_AB}
+
+
+def test_add_wire_is_idempotent():
+    first = ecs.add_wire(WIRE_AB)
+    second = ecs.add_wire(WIRE_AB)
+    assert first is second
+    assert len(ecs.cmp_wires) == 1
+
+
+def test_fan_out_and_fan_in_indices():
+    ecs.add_wire(WIRE_AB)
+    ecs.add_wire(WIRE_AC)
+    ecs.add_wire(WIRE_CB)
+    assert ecs.wires_from("/a/inbox", "out1") == {WIRE_AB, WIRE_AC}
+    assert ecs.wires_to("/b/inbox", "in1") == {WIRE_AB, WIRE_CB}
+    assert ecs.wires_touching_inbox("/c/inbox") == {WIRE_AC, WIRE_CB}
+
+
+def test_remove_wire_drops_empty_index_buckets():
+    ecs.add_wire(WIRE_AB)
+    ecs.cmp_wire_style[WIRE_AB] = {"color": "red"}
+    ecs.remove_wire(WIRE_AB)
+    assert ecs.cmp_wires == {}
+    assert ecs.cmp_wire_style == {}
+    assert ecs.idx_wires_out == {}
+    assert ecs.idx_wires_in == {}
+    assert ecs.idx_wires_by_inbox == {}
+
+
+def test_remove_wire_tolerates_unknown_wire():
+    ecs.remove_wire(WIRE_AB)
+    assert ecs.cmp_wires == {}
+
+
+def test_wires_touching_entity_uses_card_inbox():
+    eid = _entity_with_inbox("/c/inbox")
+    ecs.add_wire(WIRE_AB)
+    ecs.add_wire(WIRE_CB)
+    assert ecs.wires_touching_entity(eid) == {WIRE_CB}
+
+
+def test_ecs_world_does_not_depend_on_registry():
+    code = ("import sys; from patchboard_atlas import ecs_world as ecs; "
+            "eid = ecs.allocate_entity(); ecs.cmp_card_ref[eid] = {'inbox': '/a/inbox'}; "
+            "ecs.add_wire(('/a/inbox', 'o', 'i', '/b/inbox')); ecs.wires_touching_entity(eid); "
+            "print('patchboard_atlas.component_registry' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_wires_touching_entity_without_card_is_empty():
+    eid = ecs.allocate_entity()
+    assert ecs.wires_touching_entity(eid) == set()
+
+
+def test_remove_entity_cascades_to_its_wires():
+    eid = _entity_with_inbox("/c/inbox")
+    ecs.add_wire(WIRE_AB)
+    ecs.add_wire(WIRE_AC)
+    ecs.add_wire(WIRE_CB)
+    ecs.remove_entity(eid)
+    assert set(ecs.cmp_wires) == {WIRE_AB}
+    assert ecs.wires_touching_inbox("/c/inbox") == set()
+    assert ecs.wires_from("/a/inbox", "out1") == {WIRE_AB}
+
+
+def test_reset_ecs_clears_wires():
+    ecs.add_wire(WIRE_AB)
+    ecs.reset_ecs()
+    assert ecs.cmp_wires == {}
+    assert ecs.idx_wires_by_inbox == {}
+
+
+# ============================================================
+# COLUMNAR SPATIAL STORAGE
+# ============================================================
+
+def test_spatial_behaves_like_a_dict():
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 10, "y": -20}
+    assert eid in ecs.cmp_spatial
+    assert ecs.cmp_spatial[eid] == {"x": 10, "y": -20}
+    assert ecs.cmp_spatial[eid]["x"] == 10
+    assert dict(ecs.cmp_spatial[eid]) == {"x": 10, "y": -20}
+    assert list(ecs.cmp_spatial) == [eid]
+    assert ecs.cmp_spatial.get(999) is None
+
+
+def test_spatial_row_is_a_live_view():
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 1, "y": 2}
+    row = ecs.cmp_spatial[eid]
+    row["x"] = 50
+    assert ecs.cmp_spatial[eid]["x"] == 50
+    ecs.cmp_spatial.set_xy(eid, 7, 8)
+    assert row == {"x": 7, "y": 8}
+
+
+def test_spatial_extra_keys_are_kept():
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 0, "y": 0, "width": 100, "height": 50}
+    assert ecs.cmp_spatial[eid] == {"x": 0, "y": 0, "width": 100, "height": 50}
+    ecs.cmp_spatial[eid] = {"x": 1, "y": 1}
+    assert ecs.cmp_spatial[eid] == {"x": 1, "y": 1}
+
+
+def test_spatial_slots_are_reused():
+    eids = [ecs.allocate_entity() for _ in range(3)]
+    for i, eid in enumerate(eids):
+        ecs.cmp_spatial[eid] = {"x": i, "y": i}
+    del ecs.cmp_spatial[eids[1]]
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 9, "y": 9}
+
+    assert len(ecs.cmp_spatial.slot_eid) == 3
+    assert sorted(ecs.cmp_spatial.iter_xy()) == [(eids[0], 0, 0), (eids[2], 2, 2), (eid, 9, 9)]
+
+
+def test_stale_spatial_row_raises_after_removal():
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 1, "y": 2}
+    row = ecs.cmp_spatial[eid]
+    ecs.remove_entity(eid)
+    other = ecs.allocate_entity()
+    ecs.cmp_spatial[other] = {"x": 3, "y": 4}
+    with pytest.raises(KeyError):
+        row["x"]
+
+
+def test_spatial_rejects_non_integer_coordinates():
+    eid = ecs.allocate_entity()
+    with pytest.raises(TypeError):
+        ecs.cmp_spatial[eid] = {"x": 1.5, "y": 0}
+    with pytest.raises(KeyError):
+        ecs.cmp_spatial[eid] = {"x": 1}
+    assert eid not in ecs.cmp_spatial
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def test_query_intersects_tables_in_eid_order():
+    eids = [ecs.allocate_entity() for _ in range(5)]
+    for eid in reversed(eids):
+        ecs.cmp_card_ref[eid] = {"title": str(eid)}
+    ecs.cmp_spatial[eids[3]] = {"x": 0, "y": 0}
+    ecs.cmp_spatial[eids[1]] = {"x": 0, "y": 0}
+
+    assert ecs.query("entities", "card_ref") == tuple(eids)
+    assert ecs.query("entities", "card_ref", "spatial") == (eids[1], eids[3])
+
+
+def test_query_is_cached_until_membership_changes():
+    a = ecs.allocate_entity()
+    ecs.cmp_spatial[a] = {"x": 0, "y": 0}
+    first = ecs.query("entities", "spatial")
+    assert ecs.query("entities", "spatial") is first
+
+    ecs.cmp_spatial.set_xy(a, 5, 5)
+    ecs.cmp_spatial[a] = {"x": 6, "y": 6}
+    assert ecs.query("entities", "spatial") is first
+
+    b = ecs.allocate_entity()
+    assert ecs.query("entities", "spatial") == first
+    ecs.cmp_spatial[b] = {"x": 1, "y": 1}
+    assert ecs.query("entities", "spatial") == (a, b)
+
+
+def test_query_sees_removals():
+    a = ecs.allocate_entity()
+    b = ecs.allocate_entity()
+    ecs.cmp_card_ref[a] = {"title": "a"}
+    ecs.cmp_card_ref[b] = {"title": "b"}
+    assert ecs.query("entities", "card_ref") == (a, b)
+
+    ecs.remove_entity(a)
+    assert ecs.query("entities", "card_ref") == (b,)
+    ecs.cmp_card_ref.pop(b)
+    assert ecs.query("entities", "card_ref") == ()
+
+
+def test_tracked_tables_bump_only_on_membership_change():
+    eid = ecs.allocate_entity()
+    version = ecs.cmp_card_ref.version
+    ecs.cmp_card_ref[eid] = {"title": "a"}
+    assert ecs.cmp_card_ref.version == version + 1
+    ecs.cmp_card_ref[eid] = {"title": "b"}
+    assert ecs.cmp_card_ref.version == version + 1
+
+    version = ecs.cmp_entities.version
+    ecs.cmp_entities.add(eid)
+    assert ecs.cmp_entities.version == version
+    ecs.cmp_entities.discard(eid)
+    assert ecs.cmp_entities.version == version + 1
+
+
+# ============================================================
+# CHANGE JOURNAL
+# ============================================================
+
+def kinds(events):
+    return [(kind, eid, component) for _seq, kind, eid, component in events]
+
+
+def test_journal_first_drain_reports_overflow():
+    ecs.allocate_entity()
+    ecs.subscribe("t")
+    assert ecs.drain_journal("t") == (True, [])
+    assert ecs.drain_journal("t") == (False, [])
+
+
+def test_journal_records_entity_and_component_changes():
+    ecs.subscribe("t")
+    ecs.drain_journal("t")
+
+    eid = ecs.allocate_entity()
+    ecs.cmp_card_ref[eid] = {"title": "a"}
+    ecs.cmp_spatial[eid] = {"x": 0, "y": 0}
+    ecs.cmp_spatial.set_xy(eid, 4, 5)
+    ecs.remove_entity(eid)
+
+    overflowed, events = ecs.drain_journal("t")
+    assert overflowed is False
+    assert kinds(events) == [
+        (ecs.ENTITY_ADDED, eid, None),
+        (ecs.COMPONENT_SET, eid, "card_ref"),
+        (ecs.COMPONENT_SET, eid, "spatial"),
+        (ecs.COMPONENT_SET, eid, "spatial"),
+        (ecs.COMPONENT_CLEARED, eid, "spatial"),
+        (ecs.COMPONENT_CLEARED, eid, "card_ref"),
+        (ecs.ENTITY_REMOVED, eid, None),
+    ]
+    assert ecs.drain_journal("t") == (False, [])
+
+
+def test_journal_cursors_are_independent():
+    ecs.subscribe("a")
+    ecs.subscribe("b")
+    ecs.drain_journal("a")
+    ecs.drain_journal("b")
+
+    first = ecs.allocate_entity()
+    assert kinds(ecs.drain_journal("a")[1]) == [(ecs.ENTITY_ADDED, first, None)]
+    second = ecs.allocate_entity()
+    assert kinds(ecs.drain_journal("a")[1]) == [(ecs.ENTITY_ADDED, second, None)]
+    assert kinds(ecs.drain_journal("b")[1]) == [
+        (ecs.ENTITY_ADDED, first, None),
+        (ecs.ENTITY_ADDED, second, None),
+    ]
+    assert ecs.g_journal == []
+
+
+def test_journal_is_silent_without_subscribers():
+    ecs.allocate_entity()
+    assert ecs.g_journal == []
+
+
+def test_lagging_subscriber_overflows(monkeypatch):
+    monkeypatch.setattr(ecs, "JOURNAL_MAX", 10)
+    ecs.subscribe("slow")
+    ecs.subscribe("fast")
+    ecs.drain_journal("slow")
+    ecs.drain_journal("fast")
+    for _ in range(30):
+        ecs.allocate_entity()
+        ecs.drain_journal("fast")
+
+    assert len(ecs.g_journal) <= 10
+    assert ecs.drain_journal("slow") == (True, [])
+    ecs.allocate_entity()
+    assert len(ecs.drain_journal("slow")[1]) == 1
@@ -0,0 +1,161 @@
+import json
+import os
+import queue
+
+import pytest
+
+from patchboard_atlas import log
+from patchboard_atlas import filetalk_writer as fw
+from patchboard_atlas import component_registry as reg
+from patchboard_atlas import router_projection as rp
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    fw.reset_filetalk_writer()
+
+
+def route(n, channel="out"):
+    return fw.route_record(f"/src{n}/outbox", channel, "in", f"/dst{n}/inbox")
+
+
+def messages(dirpath):
+    return sorted(name for name in os.listdir(dirpath))
+
+
+def read_message(dirpath, name):
+    return json.loads((dirpath / name).read_text(encoding="utf-8"))
+
+
+# ============================================================
+# COALESCING
+# ============================================================
+
+def test_coalesce_groups_by_channel():
+    grouped = fw.coalesce_requests([(fw.LINK, route(1)), (fw.UNLINK, route(2)), (fw.LINK, route(3))])
+    assert grouped == {fw.LINK: [route(1), route(3)], fw.UNLINK: [route(2)]}
+
+
+def test_coalesce_last_request_per_route_wins():
+    grouped = fw.coalesce_requests([(fw.LINK, route(1)), (fw.UNLINK, route(1))])
+    assert grouped == {fw.UNLINK: [route(1)]}
+
+
+# ============================================================
+# ATOMIC BATCH WRITES
+# ============================================================
+
+def test_write_batch_one_message_per_channel(tmp_path):
+    requests = [(fw.LINK, route(n)) for n in range(200)] + [(fw.UNLINK, route(500))]
+    written = fw.write_batch(str(tmp_path), requests)
+
+    assert len(written) == 2
+    names = messages(tmp_path)
+    assert len(names) == 2
+    assert not any(name.endswith(".tmp") for name in names)
+
+    by_channel = {read_message(tmp_path, n)["channel"]: read_message(tmp_path, n) for n in names}
+    assert len(by_channel[fw.LINK]["routes"]) == 200
+    assert by_channel[fw.UNLINK]["routes"] == [route(500)]
+    assert by_channel[fw.LINK]["sender"] == "patchboard-atlas"
+
+
+def test_write_batch_unlinks_before_links(tmp_path):
+    fw.write_batch(str(tmp_path), [(fw.LINK, route(1)), (fw.UNLINK, route(2))])
+    names = messages(tmp_path)
+    assert [read_message(tmp_path, n)["channel"] for n in names] == [fw.UNLINK, fw.LINK]
+
+
+def test_write_batch_empty_writes_nothing(tmp_path):
+    assert fw.write_batch(str(tmp_path), []) == []
+    assert messages(tmp_path) == []
+
+
+# ============================================================
+# WRITER THREAD
+# ============================================================
+
+def test_request_before_start_is_refused():
+    assert fw.request_routes(fw.LINK, [route(1)]) is False
+
+
+def test_unknown_channel_raises(tmp_path):
+    fw.start_filetalk_writer(tmp_path)
+    with pytest.raises(ValueError):
+        fw.request_routes("relink", [route(1)])
+
+
+def test_writer_thread_writes_queued_requests(tmp_path):
+    assert fw.start_filetalk_writer(tmp_path) is True
+    for n in range(50):
+        assert fw.request_routes(fw.LINK, [route(n)]) is True
+    fw.flush_filetalk_writer()
+
+    routes = []
+    for name in messages(tmp_path):
+        message = read_message(tmp_path, name)
+        assert message["channel"] == fw.LINK
+        routes.extend(message["routes"])
+    assert sorted(r["source-folder"] for r in routes) == sorted(f"/src{n}/outbox" for n in range(50))
+    assert fw.g["written"] == len(messages(tmp_path))
+    assert fw.g["errors"] == 0
+
+
+def test_stop_writes_everything_queued(tmp_path):
+    fw.start_filetalk_writer(tmp_path)
+    fw.request_routes(fw.UNLINK, [route(1), route(2)])
+    fw.stop_filetalk_writer()
+
+    names = messages(tmp_path)
+    assert len(names) == 1
+    assert read_message(tmp_path, names[0])["routes"] == [route(1), route(2)]
+    assert fw.g["thread"] is None
+
+
+@pytest.mark.parametrize("error", [OSError("disk full"), ValueError("bad route")])
+def test_write_failure_is_logged_and_flush_returns(tmp_path, monkeypatch, error):
+    def broken(inbox_dir, requests):
+        raise error
+
+    monkeypatch.setattr(fw, "write_batch", broken)
+    fw.start_filetalk_writer(tmp_path)
+    fw.request_routes(fw.LINK, [route(1)])
+    fw.flush_filetalk_writer()
+    assert fw.g["errors"] == 1
+    assert log.g_log == []                       # nothing logged off the Tk thread
+    assert fw.report_write_errors() == 1
+    assert [(r["category"], r["level"]) for r in log.g_log] == [("router", "error")]
+    assert log.g_log[0]["context"] == {"inbox": str(tmp_path)}
+    assert fw.report_write_errors() == 0
+
+    monkeypatch.undo()
+    fw.request_routes(fw.LINK, [route(2)])
+    fw.flush_filetalk_writer()
+    assert len(messages(tmp_path)) == 1
+
+
+def test_full_queue_refuses_without_blocking(tmp_path):
+    fw.g["queue"] = queue.Queue(maxsize=1)
+    assert fw.request_routes(fw.LINK, [route(1)]) is True
+    assert fw.request_routes(fw.LINK, [route(2)]) is False
+    assert fw.g["rejected"] == 1
+    fw.g["queue"] = None
+
+
+def test_request_wires_uses_card_folders(tmp_path):
+    src_key = reg.canonical_inbox_key("/a/inbox")
+    dst_key = reg.canonical_inbox_key("/b/inbox")
+    reg.loaded_component_id_cards[src_key] = {"inbox": "/a/inbox", "outbox": "/a/outbox"}
+    reg.loaded_component_id_cards[dst_key] = {"inbox": "/b/inbox", "outbox": "/b/outbox"}
+
+    assert rp.wire_to_route((src_key, "out", "in", dst_key)) == fw.route_record(
+        "/a/outbox", "out", "in", "/b/inbox")
+
+    fw.start_filetalk_writer(tmp_path)
+    fw.request_wires(fw.LINK, [(src_key, "out", "in", dst_key)])
+    fw.stop_filetalk_writer()
+    names = messages(tmp_path)
+    assert read_message(tmp_path, names[0])["routes"][0]["source-folder"] == "/a/outbox"
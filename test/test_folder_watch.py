@@ -0,0 +1,133 @@
+import json
+import time
+
+import pytest
+import lionscliapp as app
+
+from patchboard_atlas import paths
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import folder_watch as fw
+from patchboard_atlas import component_registry as reg
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state(tmp_path):
+    reset()
+    app.reset()
+    app.declare_app("test", "0.1")
+    app.declare_projectdir(".patchboard-atlas")
+    app.execroot.set_execroot(tmp_path)
+    yield
+    fw.reset_folder_watch()
+
+
+def wait_for_events(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    merged = {}
+    while time.monotonic() < deadline:
+        merged.update(fw.drain_events())
+        if merged:
+            return merged
+        time.sleep(0.02)
+    return merged
+
+
+def make_component(tmp_path, name):
+    inbox = tmp_path / name / "inbox"
+    outbox = tmp_path / name / "outbox"
+    inbox.mkdir(parents=True)
+    outbox.mkdir(parents=True)
+    return {
+        "schema_version": 1,
+        "title": name,
+        "inbox": str(inbox),
+        "outbox": str(outbox),
+        "channels": {"in": [], "out": []},
+    }
+
+
+# --- pure helpers ---
+
+def test_group_by_parent_shares_parent():
+    groups = fw.group_by_parent({"/x/a", "/x/b", "/y/c"})
+    assert groups == {"/x": {"a": "/x/a", "b": "/x/b"}, "/y": {"c": "/y/c"}}
+
+
+def test_scan_parent_reports_presence(tmp_path):
+    (tmp_path / "here").mkdir()
+    children = {"here": str(tmp_path / "here"), "gone": str(tmp_path / "gone")}
+    assert fw.scan_parent(str(tmp_path), children) == {
+        str(tmp_path / "here"): True,
+        str(tmp_path / "gone"): False,
+    }
+
+
+def test_scan_missing_parent_reports_absent(tmp_path):
+    children = {"a": str(tmp_path / "nope" / "a")}
+    assert fw.scan_parent(str(tmp_path / "nope"), children) == {str(tmp_path / "nope" / "a"): False}
+
+
+def test_merge_events_last_state_wins():
+    assert fw.merge_events([{"/a": False}, {"/a": True, "/b": False}]) == {"/a": True, "/b": False}
+
+
+# --- watch thread ---
+
+@pytest.mark.parametrize("backend", ["inotify", "poll"])
+def test_thread_reports_vanish_and_appear(tmp_path, monkeypatch, backend):
+    if backend == "poll":
+        monkeypatch.setattr(fw.inotify, "init", lambda: None)
+    monkeypatch.setattr(fw, "POLL_MIN_S", 0.02)
+    watched = tmp_path / "comp" / "inbox"
+    watched.mkdir(parents=True)
+    fw.start_watch_thread([str(watched)])
+    time.sleep(0.1)
+    if backend == "inotify" and fw.g["backend"] != "inotify":
+        pytest.skip("inotify unavailable")
+
+    watched.rmdir()
+    assert wait_for_events() == {paths.canonical_folder(str(watched)): False}
+
+    watched.mkdir()
+    assert wait_for_events() == {paths.canonical_folder(str(watched)): True}
+
+
+def test_unrelated_sibling_changes_are_not_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(fw, "POLL_MIN_S", 0.02)
+    watched = tmp_path / "inbox"
+    watched.mkdir()
+    fw.start_watch_thread([str(watched)])
+    time.sleep(0.1)
+    (tmp_path / "other").mkdir()
+    assert wait_for_events(timeout=0.3) == {}
+
+
+# --- registry integration ---
+
+def test_process_folder_events_culls_vanished_card(tmp_path, monkeypatch):
+    monkeypatch.setattr(fw, "POLL_MIN_S", 0.02)
+    card_dir = tmp_path / "cards"
+    card_dir.mkdir()
+    card_a = make_component(tmp_path, "a")
+    card_b = make_component(tmp_path, "b")
+    (card_dir / "a.json").write_text(json.dumps(card_a), encoding="utf-8")
+    (card_dir / "b.json").write_text(json.dumps(card_b), encoding="utf-8")
+    reg.ingest_cards_from_folder(card_dir)
+
+    fw.refresh_watch_set()
+    fw.start_watch_thread(fw.g["folder-keys"])
+    time.sleep(0.1)
+
+    (tmp_path / "a" / "outbox").rmdir()
+    deadline = time.monotonic() + 5.0
+    culled = []
+    while not culled and time.monotonic() < deadline:
+        culled = fw.process_folder_events()
+        time.sleep(0.02)
+
+    key_a = reg.canonical_inbox_key(card_a["inbox"])
+    assert culled == [key_a]
+    assert key_a not in reg.loaded_component_id_cards
+    assert len(ecs.cmp_entities) == 1
+    assert paths.canonical_folder(card_a["inbox"]) not in fw.g["folder-keys"]
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from patchboard_atlas import frame_monitor as fm
+from patchboard_atlas import rendering
+from patchboard_atlas import gui_scaffold
+from patchboard_atlas import paths
+from patchboard_atlas import log
+from patchboard_atlas.reset import reset
+
+
+class FakeRoot:
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        after_id = f"after{self.next_id}"
+        self.pending[after_id] = (ms, fn)
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def fire(self, fn_name):
+        for after_id, (_ms, fn) in list(self.pending.items()):
+            if fn.__name__ == fn_name:
+                del self.pending[after_id]
+                fn()
+                return
+        raise AssertionError(f"{fn_name} not scheduled")
+
+
+@pytest.fixture
+def root(monkeypatch):
+    root = FakeRoot()
+    readouts = []
+    monkeypatch.setitem(gui_scaffold.widgets, "root", root)
+    monkeypatch.setattr(gui_scaffold, "set_frame_readout", readouts.append)
+    root.readouts = readouts
+    yield root
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    reset()
+
+
+def test_bucket_index():
+    assert fm.bucket_index(0.3) == 0
+    assert fm.bucket_index(1) == 0
+    assert fm.bucket_index(7) == fm.BUCKETS_MS.index(10)
+    assert fm.bucket_index(5000) == len(fm.BUCKETS_MS)
+
+
+def test_sync_all_records_duration():
+    rendering.sync_all()
+    rendering.sync_all()
+    assert len(fm.g_samples["sync"]) == 2
+    assert sum(fm.g_hist["sync"]) == 2
+
+
+def test_render_paths_have_separate_histograms():
+    rendering.reproject_all()
+    rendering.sync_entities([])
+    rendering.sync_entities([])
+    assert [len(fm.g_samples[name]) for name in fm.SYNC_PATHS] == [0, 1, 2]
+    assert sum(fm.g_hist["reproject"]) == 1 and sum(fm.g_hist["incremental"]) == 2
+    assert set(fm.frame_snapshot()) == {"buckets", "sync", "reproject", "incremental", "latency"}
+    assert "reproj p95" in fm.frame_readout() and "incr p95" in fm.frame_readout()
+
+
+def test_percentile_and_ring_bound():
+    for i in range(fm.SYNC_SAMPLES + 30):
+        fm.record_sync((i % 100) / 1000)
+    assert len(fm.g_samples["sync"]) == fm.SYNC_SAMPLES
+    assert sum(fm.g_hist["sync"]) == fm.SYNC_SAMPLES + 30
+    assert fm.percentile(fm.g_samples["sync"], 0.95) == pytest.approx(0.094)
+    assert fm.percentile([], 0.95) == 0.0
+
+
+def test_probe_measures_lag_against_scheduled_time(root, monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr(fm.time, "perf_counter", lambda: clock["now"])
+    fm.enable_frame_monitor()
+    assert fm.g["probe-due"] == pytest.approx(100.0 + fm.PROBE_MS / 1000)
+
+    clock["now"] = fm.g["probe-due"] + 0.030   # the loop was busy 30 ms
+    root.fire("_probe")
+    assert fm.g_samples["latency"][-1] == pytest.approx(0.030)
+    assert fm.g_hist["latency"][fm.BUCKETS_MS.index(50)] == 1
+    assert fm.g["probe-id"] in root.pending     # re-armed
+
+
+def test_readout_and_stop(root):
+    fm.enable_frame_monitor()
+    fm.record_sync(0.004)
+    root.fire("_readout")
+    assert root.readouts[-1].startswith("sync 4.0ms")
+    assert "items 0" in root.readouts[-1]
+
+    fm.enable_frame_monitor(False)
+    assert root.pending == {}
+    fm.start_frame_monitor()                    # disabled: no timers
+    assert root.pending == {}
+
+
+def test_console_show_and_dump(tmp_path, monkeypatch):
+    monkeypatch.setattr(paths, "profile_dir", lambda: tmp_path)
+    fm.record_sync(0.003)
+    fm.record_latency(0.150)
+    assert not fm.handle_console_command("prof show")
+    assert fm.handle_console_command("frames show")
+    messages = [r["message"] for r in log.g_log if r["category"] == "profile"]
+    assert "sync: 1 samples" in messages and "latency: 1 samples" in messages
+
+    assert fm.handle_console_command("frames dump")
+    data = json.loads((tmp_path / "frames.json").read_text(encoding="utf-8"))
+    assert data["sync"]["histogram"]["<=5ms"] == 1
+    assert data["latency"]["histogram"]["<=200ms"] == 1
+    assert data["latency"]["p95-ms"] == 150.0
+
+    assert fm.handle_console_command("frames reset")
+    assert sum(fm.g_hist["sync"]) == 0 and not fm.g_samples["latency"]
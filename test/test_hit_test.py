@@ -0,0 +1,126 @@
+import pytest
+
+from patchboard_atlas import hit_test as ht
+from patchboard_atlas import rendering
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+class Event:
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    cm.set_viewport(800, 600)
+    yield
+    reset()
+
+
+def test_perimeter_hit_and_miss():
+    eid = make_entity(None, 0, 0, ch_in=(), ch_out=())
+    assert ht.hit_test(0, 0) == (eid, "perimeter")
+    assert ht.hit_test(59, 29) == (eid, "perimeter")
+    assert ht.hit_test(100, 0) is None
+
+
+def test_anchor_hit_beats_perimeter():
+    eid = make_entity(None, 0, 0, ch_in=["a"], ch_out=["x", "y"])
+    ax, ay = rendering.channel_anchor(eid, "out", "y")
+    assert ht.hit_test(ax - 3, ay + 2) == (eid, ("out", "y"))
+    bx, by = rendering.channel_anchor(eid, "in", "a")
+    assert ht.hit_test(bx - 4, by) == (eid, ("in", "a"))  # just outside the body
+
+
+def test_anchor_radius_follows_zoom():
+    cm.set_zoom(1, 2)
+    assert ht.anchor_radius() == 2 * ht.ANCHOR_PX
+    cm.set_zoom(4, 1)
+    assert ht.anchor_radius() == 2
+
+
+def test_overlap_prefers_highest_eid():
+    a = make_entity(None, 0, 0, ch_in=(), ch_out=())
+    b = make_entity(None, 40, 0, ch_in=(), ch_out=())
+    assert ht.hit_test(50, 0) == (b, "perimeter")
+    assert ht.hit_test(-50, 0) == (a, "perimeter")
+
+
+def test_index_follows_moves_unplace_and_removal():
+    eid = make_entity(None, 0, 0, ch_in=(), ch_out=())
+    assert ht.hit_test(0, 0) == (eid, "perimeter")
+
+    ecs.cmp_spatial.set_xy(eid, 1000, 1000)
+    assert ht.hit_test(0, 0) is None
+    assert ht.hit_test(1000, 1000) == (eid, "perimeter")
+
+    del ecs.cmp_spatial[eid]
+    assert ht.hit_test(1000, 1000) is None
+
+    ecs.cmp_spatial[eid] = {"x": 5, "y": 5}
+    assert ht.hit_test(0, 0) == (eid, "perimeter")
+    ecs.remove_entity(eid)
+    assert ht.hit_test(0, 0) is None
+    assert ht.idx_cells == {}
+
+
+def test_entity_spanning_cells_is_found_from_each():
+    eid = make_entity(None, ht.CELL, ht.CELL, ch_in=(), ch_out=())
+    assert ht.hit_test(ht.CELL - 10, ht.CELL - 10) == (eid, "perimeter")
+    assert ht.hit_test(ht.CELL + 10, ht.CELL + 10) == (eid, "perimeter")
+
+
+def test_entities_in_box():
+    a = make_entity(None, 0, 0, ch_in=(), ch_out=())
+    b = make_entity(None, 500, 0, ch_in=(), ch_out=())
+    make_entity(None, 0, 500, ch_in=(), ch_out=())
+    assert ht.entities_in_box(-100, -100, 600, 50) == {a, b}
+
+
+def test_hit_test_event_unprojects_through_camera():
+    eid = make_entity(None, 1000, 0, ch_in=(), ch_out=())
+    cm.g_cam["x"] = 1000
+    assert ht.hit_test_event(Event(400, 300)) == (eid, "perimeter")
+    cm.set_zoom(1, 2)
+    assert ht.hit_test_event(Event(400 + 25, 300)) == (eid, "perimeter")
+    assert ht.hit_test_event(Event(400 + 40, 300)) is None
+
+
+def test_hover_syncs_only_on_change(monkeypatch):
+    synced = []
+    monkeypatch.setattr(rendering, "sync_entity", synced.append)
+    eid = make_entity(None, 0, 0, ch_in=(), ch_out=())
+
+    for x in (400, 405, 410):
+        ht.on_canvas_motion(Event(x, 300))
+    assert synced == [eid]
+    assert rendering.g_highlight["hover"] == eid
+
+    ht.on_canvas_motion(Event(700, 300))
+    assert synced == [eid, eid]
+    assert rendering.g_highlight["hover"] is None
+
+
+def test_hover_outline_flows_through_render_intent():
+    eid = make_entity(None, 0, 0, ch_in=(), ch_out=())
+    rendering.rebuild_render_intent()
+    assert perimeter_outline(eid) == rendering.PERIMETER_OUTLINE
+    ht.set_hover((eid, "perimeter"))
+    assert perimeter_outline(eid) == rendering.HOVER_OUTLINE
+
+
+def perimeter_outline(eid):
+    return rendering.RENDER[("entity", eid, "perimeter")]["outline"]
+
+
+def test_describe_hit():
+    eid = make_entity(None, 0, 0, ch_in=(), ch_out=["x"])
+    text = ht.describe_hit((eid, ("out", "x")))
+    assert f"Entity {eid}" in text
+    assert f"c{eid}" in text
+    assert "out channel: x" in text
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+
+# Budget for `import patchboard_atlas.cliapp`, cumulative microseconds as
+# reported by -X importtime.  Eager imports (Tk, tkintertester, the GUI
+# and runtime modules) cost ~120 ms; the lazy entrypoint ~25 ms.
+IMPORT_BUDGET_US = 80_000
+RUNS = 3
+
+GUI_MODULES = (
+    "tkinter",
+    "tkintertester",
+    "patchboard_atlas.gui_scaffold",
+    "patchboard_atlas.startup",
+    "patchboard_atlas.rendering",
+    "patchboard_atlas.reset",
+)
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative_us} from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative_us = cumulative_us.strip()
+        if not cumulative_us.isdigit():
+            continue  # header line
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def import_cliapp():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import patchboard_atlas.cliapp"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       103 |        103 |     lionscliapp.declarations\n"
+        "import time:       902 |      26648 | patchboard_atlas.cliapp\n"
+    )
+    assert parse_importtime(stderr) == {
+        "lionscliapp.declarations": 103,
+        "patchboard_atlas.cliapp": 26648,
+    }
+
+
+def test_cliapp_import_skips_gui_modules():
+    times = import_cliapp()
+    assert "patchboard_atlas.cliapp" in times
+    loaded = [name for name in GUI_MODULES if name in times]
+    assert loaded == []
+
+
+def test_cliapp_import_within_budget():
+    best = min(import_cliapp()["patchboard_atlas.cliapp"] for _ in range(RUNS))
+    assert best <= IMPORT_BUDGET_US, f"cliapp import took {best} us (budget {IMPORT_BUDGET_US} us)"
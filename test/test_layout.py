@@ -0,0 +1,131 @@
+import pytest
+
+from patchboard_atlas import layout
+from patchboard_atlas import rendering
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas.reset import reset
+from conftest import inbox_key, make_entity
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    reset()
+
+
+def run_to_completion():
+    layout.g["thread"].join()
+    states = []
+    while layout.g["thread"] is not None:
+        states.append(layout.apply_layout_state())
+    return states
+
+
+def test_grid_positions_are_distinct_and_near_square():
+    points = layout.grid_positions(10, origin=(5, 7))
+    assert len(set(points)) == 10
+    assert points[0] == (5, 7)
+    assert points[4] == (5, 7 + layout.GRID_DY)  # 4 columns for 10 nodes
+
+
+def test_assign_layers_longest_path_and_cycles():
+    assert layout.assign_layers(4, [(0, 1), (1, 2), (0, 2), (2, 3)]) == [0, 1, 2, 3]
+    layers = layout.assign_layers(3, [(0, 1), (1, 2), (2, 0)])
+    assert sorted(layers) == [0, 1, 2]
+
+
+def test_layered_positions_put_sources_left_and_loose_below():
+    positions = layout.layered_positions(5, [(0, 1), (0, 2), (1, 3)])
+    assert positions[0][0] < positions[1][0] < positions[3][0]
+    assert positions[1][0] == positions[2][0]
+    assert positions[1] != positions[2]
+    wired_bottom = max(positions[i][1] for i in range(4))
+    assert positions[4][1] > wired_bottom
+
+
+def test_force_positions_separate_nodes_and_pull_wired_ones_together():
+    xs = [0.0, 1.0, 2.0, 1000.0]
+    ys = [0.0, 0.0, 0.0, 0.0]
+    layout.force_positions(xs, ys, [(0, 3)], iterations=40)
+    distance = lambda i, j: ((xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2) ** 0.5
+    assert distance(0, 1) > 50 and distance(1, 2) > 50
+    assert distance(0, 3) < 1000
+
+
+def test_force_positions_keep_fixed_nodes():
+    xs = [0.0, 10.0]
+    ys = [0.0, 0.0]
+    layout.force_positions(xs, ys, [], fixed=[True, False], iterations=10)
+    assert (xs[0], ys[0]) == (0.0, 0.0)
+    assert xs[1] > 10.0
+
+
+def test_force_positions_report_progress_and_stop():
+    seen = []
+    xs = [float(i) for i in range(20)]
+    ys = [0.0] * 20
+    layout.force_positions(xs, ys, [], iterations=100,
+                           on_progress=lambda it, xs, ys: seen.append(it),
+                           should_stop=lambda: len(seen) >= 2)
+    assert seen == [layout.PREVIEW_EVERY, 2 * layout.PREVIEW_EVERY]
+
+
+def test_wire_edges_resolve_inboxes_to_indices():
+    a = make_entity("a", register=True)
+    b = make_entity("b", register=True)
+    c = make_entity("c", register=True)
+    ecs.add_wire((inbox_key("a"), "out1", "in1", inbox_key("b")))
+    ecs.add_wire((inbox_key("b"), "out1", "in1", inbox_key("c")))
+    ecs.add_wire((inbox_key("x"), "out1", "in1", inbox_key("a")))  # endpoint not loaded
+    assert layout.wire_edges((a, b, c)) == [(0, 1), (1, 2)]
+    assert layout.wire_edges((c, b)) == [(1, 0)]
+
+
+def test_start_layout_grid_places_unplaced_below_existing():
+    placed = make_entity(None, 0, 0, card=False)
+    loose = [make_entity(card=False) for _ in range(6)]
+    assert layout.start_layout("grid", "unplaced") == 6
+    states = run_to_completion()
+    assert states[-1] == "done"
+    assert ecs.cmp_spatial[placed] == {"x": 0, "y": 0}
+    points = [(ecs.cmp_spatial[e]["x"], ecs.cmp_spatial[e]["y"]) for e in loose]
+    assert len(set(points)) == 6
+    assert all(y >= layout.BLOCK_GAP for _x, y in points)
+
+
+def test_start_layout_force_previews_and_finishes(monkeypatch):
+    synced = []
+    monkeypatch.setattr(rendering, "sync_entities", lambda eids: synced.append(list(eids)))
+    anchor = make_entity("f0", 0, 0, register=True)
+    nodes = [make_entity(f"f{i}", register=True) for i in range(1, 30)]
+    for i in range(1, 30):
+        ecs.add_wire((inbox_key(f"f{i - 1}"), "out1", "in1", inbox_key(f"f{i}")))
+
+    assert layout.start_layout("force", "unplaced") == 29
+    assert layout.start_layout("grid", "unplaced") == 0  # one at a time
+    states = run_to_completion()
+    assert states[-1] == "done"
+    assert ecs.cmp_spatial[anchor] == {"x": 0, "y": 0}
+    assert all(e in ecs.cmp_spatial for e in nodes)
+    assert synced and all(anchor not in batch for batch in synced)
+
+
+def test_cancel_layout_restores_original_placement():
+    a = make_entity(None, 10, 10, card=False)
+    b = make_entity(card=False)
+    assert layout.start_layout("force", "all") == 2
+    layout.apply_positions([(500, 500), (600, 600)])  # a preview has landed
+    assert ecs.cmp_spatial[b] == {"x": 600, "y": 600}
+
+    assert layout.cancel_layout()
+    assert ecs.cmp_spatial[a] == {"x": 10, "y": 10}
+    assert b not in ecs.cmp_spatial
+    assert not layout.cancel_layout()
+
+
+def test_nothing_to_lay_out():
+    make_entity(None, 0, 0, card=False)
+    assert layout.start_layout("grid", "unplaced") == 0
+    with pytest.raises(ValueError):
+        layout.start_layout("spiral", "all")
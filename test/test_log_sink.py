@@ -0,0 +1,114 @@
+import json
+import queue
+import threading
+import time
+
+import pytest
+
+from patchboard_atlas import log
+from patchboard_atlas import log_sink
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    log_sink.stop_log_sink()
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_stop_writes_all_records(tmp_path):
+    log_sink.start_log_sink(tmp_path)
+    log.log("startup", "one")
+    log.log("startup", "two", "w")
+    log_sink.stop_log_sink()
+    records = read_lines(tmp_path / log_sink.LOG_FILENAME)
+    assert [r["message"] for r in records] == ["one", "two"]
+    assert records[1]["level"] == "warning"
+
+
+def test_flush_writes_held_back_record(tmp_path):
+    log_sink.start_log_sink(tmp_path)
+    log.log("a", "only")
+    log_sink.flush_log_sink()
+    records = read_lines(tmp_path / log_sink.LOG_FILENAME)
+    assert records[0]["message"] == "only"
+
+
+def test_attach_context_is_persisted(tmp_path):
+    log_sink.start_log_sink(tmp_path)
+    log.log("startup", "culled")
+    log.attach_context({"inbox": "/tmp/inbox"})
+    log.log("startup", "next")
+    log_sink.stop_log_sink()
+    records = read_lines(tmp_path / log_sink.LOG_FILENAME)
+    assert records[0]["context"] == {"inbox": "/tmp/inbox"}
+
+
+def test_held_record_is_released_when_quiet(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_sink, "HOLD_S", 0.02)
+    log_sink.start_log_sink(tmp_path)
+    log.log("startup", "last words", "e")
+    path = tmp_path / log_sink.LOG_FILENAME
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:  # the file is created before the line lands
+        if path.exists() and path.read_text(encoding="utf-8").endswith("\n"):
+            break
+        time.sleep(0.01)
+    assert read_lines(path)[0]["message"] == "last words"
+    assert log_sink.g["pending"] is None
+
+
+def test_concurrent_loggers_write_each_record_once(tmp_path):
+    log_sink.start_log_sink(tmp_path)
+
+    def worker(n):
+        for i in range(300):
+            log.log("thread", f"{n}-{i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log_sink.stop_log_sink()
+    messages = [r["message"] for r in read_lines(tmp_path / log_sink.LOG_FILENAME)]
+    assert sorted(messages) == sorted(f"{n}-{i}" for n in range(4) for i in range(300))
+
+
+def test_stop_unsubscribes(tmp_path):
+    log_sink.start_log_sink(tmp_path)
+    log_sink.stop_log_sink()
+    assert log_sink.on_log_record not in log.g_listeners
+    log.log("a", "after stop")
+    assert len(log.g_log) == 1
+
+
+def test_rotation_by_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_sink, "MAX_BYTES", 200)
+    monkeypatch.setattr(log_sink, "BACKUP_COUNT", 2)
+    log_sink.start_log_sink(tmp_path)
+    for i in range(20):
+        log.log("bulk", f"message {i}")
+        log_sink.flush_log_sink()
+    log_sink.stop_log_sink()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == [
+        log_sink.LOG_FILENAME,
+        log_sink.LOG_FILENAME + ".1",
+        log_sink.LOG_FILENAME + ".2",
+    ]
+    last = read_lines(tmp_path / log_sink.LOG_FILENAME)
+    assert last[-1]["message"] == "message 19"
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    monkeypatch.setitem(log_sink.g, "queue", queue.Queue(maxsize=1))
+    monkeypatch.setitem(log_sink.g, "dropped", 0)
+    log_sink._enqueue({"message": "kept"})
+    log_sink._enqueue({"message": "dropped"})
+    assert log_sink.g["dropped"] == 1
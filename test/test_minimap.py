@@ -0,0 +1,156 @@
+import pytest
+
+from patchboard_atlas import minimap as mm
+from patchboard_atlas import rendering
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.items = {}
+        self.configured = 0
+        self.idle = {}
+        self.next_id = 0
+
+    def create_rectangle(self, x0, y0, x1, y1, **options):
+        self.next_id += 1
+        self.items[self.next_id] = {"coords": (x0, y0, x1, y1), **options}
+        return self.next_id
+
+    def itemconfigure(self, item_id, **options):
+        self.configured += 1
+        self.items[item_id].update(options)
+
+    def coords(self, item_id, *coords):
+        self.items[item_id]["coords"] = coords
+
+    def after_idle(self, fn):
+        self.next_id += 1
+        idle_id = f"idle{self.next_id}"
+        self.idle[idle_id] = fn
+        return idle_id
+
+    def after_cancel(self, idle_id):
+        self.idle.pop(idle_id, None)
+
+    def run_idle(self):
+        idle, self.idle = self.idle, {}
+        for fn in idle.values():
+            fn()
+
+
+class Event:
+    def __init__(self, widget, x, y):
+        self.widget = widget
+        self.x = x
+        self.y = y
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    cm.set_viewport(800, 600)
+    yield
+    reset()
+
+
+def test_rebuild_fits_extent_and_counts():
+    make_entity(None, 0, 0)
+    make_entity(None, 10, 10)
+    make_entity(None, 5000, 3000)
+    mm.sync_density()
+    assert sum(mm.g_counts) == 3
+    assert mm.g["cell-world"] == 128     # 5000 wide needs 44 cells of 128
+    assert mm.g_counts[mm.cell_index(0, 0)] == 2
+    assert len(mm.g_dirty) == mm.GRID_W * mm.GRID_H
+
+
+def test_move_updates_two_cells_only():
+    a = make_entity(None, 0, 0)
+    make_entity(None, 1000, 1000)
+    mm.sync_density()
+    mm.g_dirty.clear()
+    old = mm.cell_index(0, 0)
+
+    ecs.cmp_spatial.set_xy(a, 500, 0)
+    mm.sync_density()
+    new = mm.cell_index(500, 0)
+    assert mm.g_dirty == {old, new}
+    assert mm.g_counts[old] == 0 and mm.g_counts[new] == 1
+
+
+def test_unplace_and_remove_decrement():
+    a = make_entity(None, 0, 0)
+    b = make_entity(None, 100, 0)
+    mm.sync_density()
+    del ecs.cmp_spatial[a]
+    ecs.remove_entity(b)
+    mm.sync_density()
+    assert sum(mm.g_counts) == 0 and mm.g_cell_of == {}
+
+
+def test_move_outside_extent_refits():
+    a = make_entity(None, 0, 0)
+    make_entity(None, 10, 10)
+    mm.sync_density()
+    assert mm.g["cell-world"] == mm.MIN_CELL_WORLD
+    ecs.cmp_spatial.set_xy(a, 100000, 0)
+    mm.sync_density()
+    assert mm.g["cell-world"] > mm.MIN_CELL_WORLD
+    assert mm.g_counts[mm.cell_index(100000, 0)] == 1
+    assert sum(mm.g_counts) == 2
+
+
+def test_draw_cost_is_fixed_and_incremental():
+    for i in range(500):
+        make_entity(None, i * 7 % 3000, i * 13 % 2000)
+    canvas = FakeCanvas()
+    mm.sync_density()
+    mm.draw_minimap(canvas)
+    assert len(canvas.items) == mm.GRID_W * mm.GRID_H + 1
+    assert canvas.configured == mm.GRID_W * mm.GRID_H
+
+    canvas.configured = 0
+    mm.sync_density()
+    mm.draw_minimap(canvas)
+    assert canvas.configured == 0 and len(canvas.items) == mm.GRID_W * mm.GRID_H + 1
+
+
+def test_cell_color_log_scale():
+    assert mm.cell_color(0) == mm.BACKGROUND
+    assert mm.cell_color(1) == mm.RAMP[1]
+    assert mm.cell_color(3) == mm.RAMP[2]
+    assert mm.cell_color(10 ** 6) == mm.RAMP[-1]
+
+
+def test_viewport_rect_follows_camera_and_zoom():
+    mm.fit_extent((0, 0, 0, 0))
+    ox, oy = mm.g["origin"]
+    scale = mm.CELL_PX / mm.g["cell-world"]
+    x0, y0, x1, y1 = mm.viewport_rect()
+    assert x1 - x0 == pytest.approx(800 * scale, abs=1)
+    assert (x0 + x1) / 2 == pytest.approx(-ox * scale, abs=1)
+    cm.g_cam["zoom-num"], cm.g_cam["zoom-den"] = 2, 1
+    x0, _y0, x1, _y1 = mm.viewport_rect()
+    assert x1 - x0 == pytest.approx(400 * scale, abs=1)
+
+
+def test_click_jumps_camera(monkeypatch):
+    reprojects = []
+    monkeypatch.setattr(rendering, "reproject_all", lambda: reprojects.append(1))
+    mm.fit_extent((0, 0, 0, 0))
+    canvas = FakeCanvas()
+    mm.g["canvas"] = canvas
+    mm.draw_minimap(canvas)
+
+    mm.on_minimap_press(Event(canvas, 10, 20))
+    mm.on_minimap_press(Event(canvas, 40, 30))
+    assert len(canvas.idle) == 1
+    canvas.run_idle()
+    assert (cm.g_cam["x"], cm.g_cam["y"]) == mm.minimap_to_world(40, 30)
+    assert reprojects == [1]
+    x0, y0, x1, y1 = canvas.items[mm.g["view-item"]]["coords"]
+    assert ((x0 + x1) / 2, (y0 + y1) / 2) == pytest.approx((40, 30), abs=1)
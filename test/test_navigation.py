@@ -0,0 +1,151 @@
+import pytest
+
+from patchboard_atlas import navigation as nav
+from patchboard_atlas import rendering
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas.reset import reset
+
+
+class FakeCanvas:
+    """Records canvas.move/scale calls and runs after/after_idle on demand."""
+
+    def __init__(self):
+        self.calls = []
+        self.idle = {}
+        self.timers = {}
+        self.next_id = 0
+
+    def move(self, tag, dx, dy):
+        self.calls.append(("move", tag, dx, dy))
+
+    def scale(self, tag, x, y, fx, fy):
+        self.calls.append(("scale", tag, x, y, fx, fy))
+
+    def after_idle(self, fn):
+        self.next_id += 1
+        idle_id = f"idle{self.next_id}"
+        self.idle[idle_id] = fn
+        return idle_id
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        timer_id = f"after{self.next_id}"
+        self.timers[timer_id] = fn
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+        self.idle.pop(timer_id, None)
+
+    def run_idle(self):
+        idle, self.idle = self.idle, {}
+        for fn in idle.values():
+            fn()
+
+    def run_timers(self):
+        timers, self.timers = self.timers, {}
+        for fn in timers.values():
+            fn()
+
+
+class Event:
+    def __init__(self, widget, x=0, y=0, state=0, delta=0, num=None):
+        self.widget = widget
+        self.x = x
+        self.y = y
+        self.state = state
+        self.delta = delta
+        self.num = num
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    reset()
+    cm.set_viewport(800, 600)
+    reprojections = []
+    monkeypatch.setattr(rendering, "reproject_all", lambda: reprojections.append(dict(cm.g_cam)))
+    yield reprojections
+    nav.reset_navigation()
+
+
+def world_at(px, py):
+    cm.g_event["x"] = px
+    cm.g_event["y"] = py
+    cm.load_pt("event")
+    cm.project_to("w")
+    return cm.get_xy()
+
+
+def moves(canvas):
+    return [call for call in canvas.calls if call[0] == "move"]
+
+
+def test_pan_coalesces_motion_into_one_move_per_frame(clean_state):
+    canvas = FakeCanvas()
+    nav.on_pan_press(Event(canvas, 100, 100))
+    for x in range(101, 131):
+        nav.on_pan_motion(Event(canvas, x, 100))
+    assert len(canvas.idle) == 1
+    canvas.run_idle()
+
+    assert moves(canvas) == [("move", tag, 30, 0) for tag in nav.MOVE_TAGS]
+    assert cm.g_cam["x"] == -30
+    assert clean_state == []
+
+
+def test_pan_release_commits_camera_and_reprojects_once(clean_state):
+    canvas = FakeCanvas()
+    cm.set_zoom(2, 1)
+    nav.on_pan_press(Event(canvas, 0, 0))
+    nav.on_pan_motion(Event(canvas, 15, -9))
+    canvas.run_idle()
+    nav.on_pan_motion(Event(canvas, 21, -40))
+    nav.on_pan_release(Event(canvas, 21, -40))
+
+    assert sum(call[2] for call in moves(canvas)) == 21 * len(nav.MOVE_TAGS)
+    assert (cm.g_cam["x"], cm.g_cam["y"]) == (-11, 20)  # 21/2 rounds to 11, 40/2 = 20
+    assert len(clean_state) == 1
+    assert canvas.idle == {}
+
+
+def test_zoom_keeps_world_point_under_pointer():
+    canvas = FakeCanvas()
+    cm.g_cam["x"] = 137
+    cm.g_cam["y"] = -52
+    before = world_at(650, 120)
+
+    nav.on_wheel(Event(canvas, 650, 120, delta=120))
+    assert (cm.g_cam["zoom-num"], cm.g_cam["zoom-den"]) == (3, 2)
+    after = world_at(650, 120)
+    assert abs(after[0] - before[0]) <= 1 and abs(after[1] - before[1]) <= 1
+
+    scales = [call for call in canvas.calls if call[0] == "scale"]
+    assert [call[1] for call in scales] == list(nav.MOVE_TAGS)
+    assert scales[0][2:] == (650, 120, 1.5, 1.5)
+
+
+def test_wheel_burst_settles_with_one_reproject(clean_state):
+    canvas = FakeCanvas()
+    for _ in range(3):
+        nav.on_wheel(Event(canvas, 400, 300, num=5))
+    assert (cm.g_cam["zoom-num"], cm.g_cam["zoom-den"]) == (1, 3)
+    assert clean_state == []
+    assert len(canvas.timers) == 1
+    canvas.run_timers()
+    assert len(clean_state) == 1
+
+
+def test_zoom_clamps_at_last_level():
+    canvas = FakeCanvas()
+    for _ in range(20):
+        nav.on_wheel(Event(canvas, 400, 300, delta=120))
+    assert (cm.g_cam["zoom-num"], cm.g_cam["zoom-den"]) == nav.ZOOM_LEVELS[-1]
+
+
+def test_shift_wheel_scrolls(clean_state):
+    canvas = FakeCanvas()
+    nav.on_wheel(Event(canvas, 0, 0, state=nav.SHIFT_MASK, delta=120))
+    assert moves(canvas) == [("move", tag, 0, nav.SCROLL_PX) for tag in nav.MOVE_TAGS]
+    assert cm.g_cam["y"] == -nav.SCROLL_PX
+    canvas.run_timers()
+    assert len(clean_state) == 1
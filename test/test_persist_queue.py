@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+
+import pytest
+
+from patchboard_atlas import persist_queue as pq
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    pq.reset_persist_queue()
+
+
+def test_write_lands_after_flush(tmp_path):
+    path = tmp_path / "cards" / "a.json"
+    pq.enqueue_write(path, b"one")
+    assert pq.flush_persist_queue() == []
+    assert path.read_bytes() == b"one"
+    assert os.listdir(tmp_path / "cards") == ["a.json"]
+
+
+def test_last_operation_per_path_wins(tmp_path):
+    a = tmp_path / "a.json"
+    b = tmp_path / "b.json"
+    with pq.g["cond"]:  # hold the writer so every op lands in one batch
+        pq.enqueue_write(a, b"1")
+        pq.enqueue_write(a, b"2")
+        pq.enqueue_write(b, b"x")
+        pq.enqueue_delete(b)
+        pq.enqueue_write(a, b"3")
+    pq.flush_persist_queue()
+
+    assert a.read_bytes() == b"3"
+    assert not b.exists()
+    assert pq.g["coalesced"] >= 3
+
+
+def test_write_after_delete_recreates(tmp_path):
+    path = tmp_path / "a.json"
+    pq.enqueue_write(path, b"old")
+    pq.enqueue_delete(path)
+    pq.enqueue_write(path, b"new")
+    pq.flush_persist_queue()
+    assert path.read_bytes() == b"new"
+
+
+def test_sequential_writes_are_durable_in_order(tmp_path):
+    path = tmp_path / "a.json"
+    for n in range(200):
+        pq.enqueue_write(path, str(n).encode())
+        if n % 37 == 0:
+            pq.flush_persist_queue()
+            assert path.read_bytes() == str(n).encode()
+    pq.flush_persist_queue()
+    assert path.read_bytes() == b"199"
+
+
+def test_replace_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / "a.json"
+    path.write_bytes(b"intact")
+
+    def crash(src, dst):
+        raise OSError("simulated crash before rename")
+
+    monkeypatch.setattr(os, "replace", crash)
+    pq.enqueue_write(path, b"half-written")
+    failures = pq.flush_persist_queue()
+
+    assert failures == [(str(path), "simulated crash before rename")]
+    assert path.read_bytes() == b"intact"
+
+
+def test_enqueue_does_not_wait_for_io(tmp_path, monkeypatch):
+    gate = threading.Event()
+    real_write = pq.write_atomic
+
+    def slow_write(path, data):
+        gate.wait(5)
+        real_write(path, data)
+
+    monkeypatch.setattr(pq, "write_atomic", slow_write)
+    for n in range(50):
+        pq.enqueue_write(tmp_path / f"{n}.json", b"{}")
+    assert pq.pending_count() > 0
+    gate.set()
+    pq.flush_persist_queue()
+    assert len(os.listdir(tmp_path)) == 50
+
+
+def test_unexpected_error_does_not_hang_flush(tmp_path, monkeypatch):
+    def broken(path, data):
+        raise ValueError("not an OSError")
+
+    monkeypatch.setattr(pq, "write_atomic", broken)
+    pq.enqueue_write(tmp_path / "a.json", b"{}")
+    (failure,) = pq.flush_persist_queue()
+    assert failure[0] == str(tmp_path / "a.json") and "ValueError" in failure[1]
+
+    monkeypatch.undo()
+    pq.enqueue_write(tmp_path / "b.json", b"{}")
+    assert pq.flush_persist_queue() == []
+    assert (tmp_path / "b.json").exists()
+
+
+def test_reset_flushes(tmp_path):
+    path = tmp_path / "a.json"
+    pq.enqueue_write(path, json.dumps({"k": 1}).encode())
+    reset()
+    assert json.loads(path.read_text()) == {"k": 1}
+    assert pq.g["thread"] is None
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from patchboard_atlas import profiling as prof
+from patchboard_atlas import rendering
+from patchboard_atlas import paths
+from patchboard_atlas import log
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas.component_registry import canonical_inbox_key
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    reset()
+
+
+def test_disabled_hooks_record_nothing():
+    @prof.timed("stage")
+    def stage(x):
+        return x + 1
+
+    assert stage(1) == 2
+    with prof.span("block"):
+        pass
+    prof.count("things", 5)
+    assert prof.g_spans == {} and prof.g_counters == {}
+
+
+def test_spans_and_counters_accumulate_when_enabled():
+    prof.enable_profiling()
+
+    @prof.timed("stage")
+    def stage():
+        return "ok"
+
+    stage()
+    stage()
+    with prof.span("block"):
+        pass
+    prof.count("things")
+    prof.count("things", 4)
+    assert prof.g_spans["stage"]["count"] == 2
+    assert prof.g_spans["block"]["count"] == 1
+    assert prof.g_counters == {"things": 5}
+
+
+def test_timed_records_even_when_stage_raises():
+    prof.enable_profiling()
+
+    @prof.timed("stage")
+    def stage():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        stage()
+    assert prof.g_spans["stage"]["count"] == 1
+
+
+def test_rebuild_counts_skipped_wires():
+    prof.enable_profiling()
+    make_entity("a", 0, 0)
+    make_entity("b")
+    ecs.add_wire((canonical_inbox_key("/a/inbox"), "out1", "in1", canonical_inbox_key("/b/inbox")))
+    rendering.rebuild_render_intent()
+    assert prof.g_counters["wires-skipped"] == 1
+    assert prof.g_spans["intent-rebuild"]["count"] == 1
+
+
+def test_export_json(tmp_path):
+    prof.enable_profiling()
+    with prof.span("load"):
+        pass
+    prof.count("items-created", 3)
+    path = prof.export_json(tmp_path / "profile.json")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["enabled"] is True
+    assert data["spans"]["load"]["count"] == 1
+    assert data["counters"] == {"items-created": 3}
+
+
+def test_console_command(tmp_path, monkeypatch):
+    monkeypatch.setattr(paths, "profile_dir", lambda: tmp_path)
+    assert not prof.handle_console_command("filter all")
+    assert prof.handle_console_command("prof on")
+    assert prof.g["enabled"]
+    prof.count("x")
+    assert prof.handle_console_command("prof show")
+    assert any(r["category"] == "profile" and r["message"].startswith("x ")
+               for r in log.g_log)
+    assert prof.handle_console_command("prof export")
+    assert (tmp_path / "profile.json").exists()
+    assert prof.handle_console_command("prof reset")
+    assert prof.g_counters == {}
+    assert prof.handle_console_command("prof off")
+    assert not prof.g["enabled"]
+
+
+def test_capture_writes_prof_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(paths, "profile_dir", lambda: tmp_path / "profiles")
+    assert prof.stop_capture() is None
+    assert prof.start_capture()
+    assert not prof.start_capture()
+    sum(range(1000))
+    path = prof.stop_capture()
+    assert path.suffix == ".prof" and path.exists()
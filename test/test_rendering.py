@@ -0,0 +1,179 @@
+import pytest
+
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import rendering as r
+from patchboard_atlas.component_registry import canonical_inbox_key
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+
+
+def wire(src, src_ch, dst_ch, dst):
+    return (canonical_inbox_key(f"/{src}/inbox"), src_ch, dst_ch, canonical_inbox_key(f"/{dst}/inbox"))
+
+
+# --- rebuild_render_intent ---
+
+def test_rebuild_emits_component_elements_for_placed_only():
+    a = make_entity("a", 0, 0)
+    make_entity("b")
+    r.rebuild_render_intent()
+    assert set(r.RENDER) == {("entity", a, "perimeter"), ("entity", a, "title")}
+    assert r.RENDER_OWNED[("entity", a)] == set(r.RENDER)
+
+
+def test_rebuild_emits_wire_between_placed_components():
+    make_entity("a", 0, 0)
+    make_entity("b", 400, 0)
+    w = wire("a", "out1", "in1", "b")
+    ecs.add_wire(w)
+    r.rebuild_render_intent()
+    desc = r.RENDER[("wire", w, "body")]
+    assert desc["type"] == "line"
+    half_w = r.COMPONENT_W // 2
+    assert desc["coords"] == [half_w, 0, 400 - half_w, 0]
+    assert "kind|wire" in desc["tags"]
+
+
+def test_wire_with_unplaced_endpoint_is_not_emitted():
+    make_entity("a", 0, 0)
+    make_entity("b")
+    ecs.add_wire(wire("a", "out1", "in1", "b"))
+    r.rebuild_render_intent()
+    assert not any(ek[0] == "wire" for ek in r.RENDER)
+
+
+def test_orthogonal_routing():
+    make_entity("a", 0, 0)
+    make_entity("b", 400, 100)
+    w = wire("a", "out1", "in1", "b")
+    ecs.add_wire(w)
+    ecs.cmp_wire_style[w] = {"routing_mode": "orthogonal"}
+    r.rebuild_render_intent()
+    x0, y0, mx, my0, mx2, y1, x1, y1b = r.RENDER[("wire", w, "body")]["coords"]
+    assert (my0, mx2, y1b) == (y0, mx, y1)
+    assert mx == (x0 + x1) // 2
+    assert (y0, y1) == (0, 100)
+
+
+def test_wire_tags_avoid_paths():
+    make_entity("a", 0, 0)
+    make_entity("b", 400, 0)
+    w = wire("a", "out1", "in1", "b")
+    ecs.add_wire(w)
+    r.rebuild_render_intent()
+    for tag in r.RENDER[("wire", w, "body")]["tags"]:
+        assert "/" not in tag and " " not in tag
+
+
+def test_wire_tags_released_and_never_reused():
+    make_entity("a", 0, 0)
+    make_entity("b", 400, 0)
+    make_entity("c", 800, 0)
+    w1 = wire("a", "out1", "in1", "b")
+    w2 = wire("b", "out1", "in1", "c")
+    ecs.add_wire(w1)
+    r.sync_wires([w1], [])
+    tag1 = r.wire_tag(w1)
+
+    ecs.remove_wire(w1)
+    r.sync_wires([], [w1])
+    assert w1 not in r.g_wire_tags
+
+    ecs.add_wire(w2)
+    r.sync_all()
+    assert r.wire_tag(w2) != tag1
+
+    ecs.remove_wire(w2)
+    r.sync_all()
+    assert r.g_wire_tags == {}
+
+
+# --- channel anchors ---
+
+def test_anchors_spread_along_edges():
+    eid = make_entity("a", 0, 0, ch_in=("x", "y", "z"), ch_out=("o",))
+    anchors = r.channel_anchors(eid)
+    half_w = r.COMPONENT_W // 2
+    ys = [anchors["in"][name][1] for name in ("x", "y", "z")]
+    assert all(anchors["in"][name][0] == -half_w for name in ("x", "y", "z"))
+    assert ys == sorted(ys) and len(set(ys)) == 3
+    assert anchors["out"]["o"] == (half_w, 0)
+
+
+def test_anchor_cache_reused_until_spatial_changes():
+    eid = make_entity("a", 0, 0)
+    first = r.channel_anchors(eid)
+    assert r.channel_anchors(eid) is first
+    ecs.cmp_spatial[eid] = {"x": 10, "y": 0}
+    moved = r.channel_anchors(eid)
+    assert moved is not first
+    assert moved["out"]["out1"][0] == first["out"]["out1"][0] + 10
+
+
+def test_anchor_cache_invalidated_on_channel_change():
+    eid = make_entity("a", 0, 0)
+    first = r.channel_anchors(eid)
+    ecs.cmp_card_ref[eid]["channels"]["out"].append("out2")
+    second = r.channel_anchors(eid)
+    assert second is not first
+    assert "out2" in second["out"]
+
+
+def test_unknown_channel_anchors_at_edge_middle():
+    eid = make_entity("a", 0, 0)
+    assert r.channel_anchor(eid, "in", "nope") == (-(r.COMPONENT_W // 2), 0)
+
+
+# --- incremental update ---
+
+def test_update_entity_intent_touches_only_incident_wires():
+    make_entity("a", 0, 0)
+    b = make_entity("b", 400, 0)
+    make_entity("c", 0, 400)
+    make_entity("d", 400, 400)
+    w_ab = wire("a", "out1", "in1", "b")
+    w_cd = wire("c", "out1", "in1", "d")
+    ecs.add_wire(w_ab)
+    ecs.add_wire(w_cd)
+    r.rebuild_render_intent()
+    untouched = r.RENDER[("wire", w_cd, "body")]
+
+    ecs.cmp_spatial[b] = {"x": 500, "y": 50}
+    owners = r.update_entity_intent(b)
+
+    assert owners == [("entity", b), ("wire", w_ab)]
+    assert r.RENDER[("wire", w_cd, "body")] is untouched
+    half_w = r.COMPONENT_W // 2
+    assert r.RENDER[("wire", w_ab, "body")]["coords"][2:] == [500 - half_w, 50]
+    assert r.RENDER[("entity", b, "perimeter")]["x0"] == 500 - half_w
+
+
+def test_update_entity_intent_unplaced_retracts():
+    a = make_entity("a", 0, 0)
+    make_entity("b", 400, 0)
+    w = wire("a", "out1", "in1", "b")
+    ecs.add_wire(w)
+    r.rebuild_render_intent()
+
+    del ecs.cmp_spatial[a]
+    r.update_entity_intent(a)
+    assert ("entity", a) not in r.RENDER_OWNED
+    assert ("wire", w, "body") not in r.RENDER
+
+
+def test_reset_rendering_clears_caches():
+    eid = make_entity("a", 0, 0)
+    r.rebuild_render_intent()
+    r.channel_anchors(eid)
+    r.reset_rendering()
+    assert r.RENDER == {}
+    assert r.RENDER_OWNED == {}
+    assert r.g_anchor_cache == {}
+    assert r.idx_placed_inbox == {}
+    assert r.g_wire_tags == {}
+    assert r.g["wire-tag-seq"] == 0
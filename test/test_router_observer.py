@@ -0,0 +1,199 @@
+import json
+import os
+import time
+
+import pytest
+
+from patchboard_atlas import paths
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import rendering
+from patchboard_atlas import router_observer as ro
+from patchboard_atlas import router_projection as rp
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    ro.reset_router_observer()
+
+
+def route(n):
+    return {
+        "source-folder": f"/src{n}/outbox",
+        "source-channel": "out",
+        "destination-folder": f"/dst{n}/inbox",
+        "destination-channel": "in",
+    }
+
+
+@pytest.fixture
+def router(tmp_path):
+    outbox = tmp_path / "outbox"
+    outbox.mkdir()
+    return outbox, tmp_path / "routes.json"
+
+
+def publish(routes_path, routes):
+    routes_path.write_text(json.dumps({"routes": routes}), encoding="utf-8")
+
+
+def notice(outbox, n, channel=ro.ROUTES_CHANGED):
+    path = outbox / f"{n:06d}.json"
+    path.write_text(json.dumps({"channel": channel}), encoding="utf-8")
+    return path
+
+
+def test_default_routes_path_is_beside_outbox(router):
+    outbox, routes_path = router
+    assert ro.default_routes_path(outbox) == routes_path
+
+
+def test_many_notices_coalesce_into_one_reload(router):
+    outbox, routes_path = router
+    publish(routes_path, [route(1), route(2)])
+    for n in range(40):
+        notice(outbox, n)
+
+    backlog = ro.process_notice_batch(outbox, routes_path)
+
+    assert backlog == 0
+    assert os.listdir(outbox) == []
+    m = ro.g["metrics"]
+    assert m["notices"] == 40
+    assert m["reloads"] == 1
+    assert m["coalesced"] == 39
+    assert m["pending"] == 1
+
+    added, removed = ro.apply_router_state()
+    assert len(added) == 2 and removed == []
+    assert len(ecs.cmp_wires) == 2
+    assert ro.g["metrics"]["applied"] == 1
+    assert ro.g["metrics"]["pending"] == 0
+
+
+def test_batches_are_bounded(router, monkeypatch):
+    outbox, routes_path = router
+    monkeypatch.setattr(ro, "NOTICE_BATCH", 10)
+    publish(routes_path, [route(1)])
+    for n in range(25):
+        notice(outbox, n)
+
+    assert ro.process_notice_batch(outbox, routes_path) == 15
+    assert ro.g["metrics"]["backlog"] == 15
+    assert len(os.listdir(outbox)) == 15
+
+
+def test_unapplied_result_is_replaced_not_queued(router):
+    outbox, routes_path = router
+    publish(routes_path, [route(1)])
+    notice(outbox, 1)
+    ro.process_notice_batch(outbox, routes_path)
+
+    publish(routes_path, [route(2), route(3)])
+    os.utime(routes_path, ns=(time.time_ns() + 10**9,) * 2)
+    notice(outbox, 2)
+    ro.process_notice_batch(outbox, routes_path)
+
+    added, removed = ro.apply_router_state()
+    assert sorted(w[0] for w in added) == sorted(
+        paths.canonical_folder(f"/src{n}/outbox") for n in (2, 3))
+    assert ro.apply_router_state() is None
+
+
+def test_unchanged_routes_apply_nothing(router):
+    outbox, routes_path = router
+    publish(routes_path, [route(1)])
+    notice(outbox, 1)
+    ro.process_notice_batch(outbox, routes_path)
+    ro.apply_router_state()
+
+    notice(outbox, 2)
+    ro.process_notice_batch(outbox, routes_path)
+    assert ro.apply_router_state() is None
+
+
+def test_other_notices_and_malformed_are_logged(router):
+    from patchboard_atlas import log
+
+    outbox, routes_path = router
+    notice(outbox, 1, channel="component-started")
+    notice(outbox, 2, channel="component-started")
+    (outbox / "000003.json").write_text("{not json", encoding="utf-8")
+    (outbox / ".000004.json.tmp").write_text("{}", encoding="utf-8")
+
+    ro.process_notice_batch(outbox, routes_path)
+    assert os.listdir(outbox) == [".000004.json.tmp"]
+    assert ro.apply_router_state() is None
+
+    messages = [record["message"] for record in log.g_log]
+    assert "Router notice 'component-started' x2" in messages
+    assert any("malformed" in msg for msg in messages)
+
+
+def test_lag_is_measured_from_oldest_notice(router):
+    outbox, routes_path = router
+    publish(routes_path, [route(1)])
+    path = notice(outbox, 1)
+    old = time.time() - 5
+    os.utime(path, (old, old))
+
+    ro.process_notice_batch(outbox, routes_path)
+    ro.apply_router_state()
+    assert ro.g["metrics"]["lag-s"] >= 5
+    assert ro.g["metrics"]["max-lag-s"] >= 5
+
+
+def test_observer_thread_drains_outbox(router):
+    outbox, routes_path = router
+    publish(routes_path, [route(1)])
+    ro.start_observer_thread(outbox, routes_path)
+    for n in range(20):
+        notice(outbox, n)
+
+    deadline = time.monotonic() + 5
+    while os.listdir(outbox) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    ro.stop_observer_thread()
+
+    assert os.listdir(outbox) == []
+    assert ro.g["metrics"]["notices"] == 20
+    added, _removed = ro.apply_router_state()
+    assert len(added) == 1
+
+
+def link(src, dst):
+    return {
+        "source-folder": f"/{src}/outbox",
+        "source-channel": "out1",
+        "destination-folder": f"/{dst}/inbox",
+        "destination-channel": "in1",
+    }
+
+
+def test_route_change_rerenders_only_changed_wires(router, monkeypatch):
+    outbox, routes_path = router
+    for i, name in enumerate("abcd"):
+        make_entity(name, i * 300, 0)
+    publish(routes_path, [link("a", "b"), link("c", "d")])
+    notice(outbox, 1)
+    ro.process_notice_batch(outbox, routes_path)
+    (ab, cd), _ = ro.sync_router_wires()
+    rendering.rebuild_render_intent()
+
+    publish(routes_path, [link("a", "b"), link("b", "c")])
+    os.utime(routes_path, ns=(time.time_ns() + 10**9,) * 2)
+    notice(outbox, 2)
+    ro.process_notice_batch(outbox, routes_path)
+    emitted = []
+    emit_wire = rendering.emit_wire
+    monkeypatch.setattr(rendering, "emit_entity", lambda eid: pytest.fail("entity re-emitted"))
+    monkeypatch.setattr(rendering, "emit_wire", lambda wire_id: emitted.append(wire_id) or emit_wire(wire_id))
+    monkeypatch.setattr(rendering, "sync_all", lambda: pytest.fail("full rebuild"))
+
+    (bc,), removed = ro.sync_router_wires()
+    assert removed == [cd] and emitted == [bc]
+    assert ("wire", cd) not in rendering.RENDER_OWNED
+    assert ("wire", ab) in rendering.RENDER_OWNED and ("wire", bc) in rendering.RENDER_OWNED
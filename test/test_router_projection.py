@@ -0,0 +1,159 @@
+import json
+import os
+
+import pytest
+
+from patchboard_atlas import paths
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import router_projection as rp
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+
+
+def route(src, src_ch, dst_ch, dst):
+    return {
+        "source-folder": src,
+        "source-channel": src_ch,
+        "destination-folder": dst,
+        "destination-channel": dst_ch,
+    }
+
+
+ROUTE_AB = route("/a/outbox", "out1", "in1", "/b/inbox")
+ROUTE_BC = route("/b/outbox", "out1", "in1", "/c/inbox")
+
+
+def write_routes(path, routes, mtime_ns=None):
+    path.write_text(json.dumps(routes), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_first_read_parses(tmp_path):
+    path = tmp_path / "routes.json"
+    write_routes(path, [ROUTE_AB])
+    assert rp.read_routes_if_changed(path) == [ROUTE_AB]
+
+
+def test_unchanged_stat_skips_read(tmp_path, monkeypatch):
+    path = tmp_path / "routes.json"
+    write_routes(path, [ROUTE_AB])
+    rp.read_routes_if_changed(path)
+
+    def fail_open(*args, **kwargs):
+        raise AssertionError("file should not be opened")
+
+    monkeypatch.setattr("builtins.open", fail_open)
+    assert rp.read_routes_if_changed(path) is None
+
+
+def test_same_content_new_mtime_skips_parse(tmp_path, monkeypatch):
+    path = tmp_path / "routes.json"
+    write_routes(path, [ROUTE_AB], mtime_ns=1_000_000_000)
+    rp.read_routes_if_changed(path)
+    write_routes(path, [ROUTE_AB], mtime_ns=2_000_000_000)
+
+    def fail_loads(*args, **kwargs):
+        raise AssertionError("content should not be parsed")
+
+    monkeypatch.setattr(rp.json, "loads", fail_loads)
+    assert rp.read_routes_if_changed(path) is None
+    assert rp.g["routes-stat"][0] == 2_000_000_000
+
+
+def test_changed_content_parses(tmp_path):
+    path = tmp_path / "routes.json"
+    write_routes(path, [ROUTE_AB], mtime_ns=1_000_000_000)
+    rp.read_routes_if_changed(path)
+    write_routes(path, [ROUTE_AB, ROUTE_BC], mtime_ns=2_000_000_000)
+    assert rp.read_routes_if_changed(path) == [ROUTE_AB, ROUTE_BC]
+
+
+def test_invalid_json_keeps_previous_state(tmp_path):
+    path = tmp_path / "routes.json"
+    write_routes(path, [ROUTE_AB], mtime_ns=1_000_000_000)
+    rp.reload_routes(path)
+    path.write_text("{partial", encoding="utf-8")
+    assert rp.reload_routes(path) is None
+    assert rp.loaded_router_routes == [ROUTE_AB]
+
+
+def test_missing_file_returns_none(tmp_path):
+    assert rp.reload_routes(tmp_path / "routes.json") is None
+
+
+def test_routes_object_form(tmp_path):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps({"routes": [ROUTE_AB]}), encoding="utf-8")
+    assert rp.read_routes_if_changed(path) == [ROUTE_AB]
+
+
+def test_install_routes_diffs_wires():
+    added, removed = rp.install_routes([ROUTE_AB])
+    assert len(added) == 1 and removed == []
+    wire_ab = added[0]
+    assert set(ecs.cmp_wires) == {wire_ab}
+
+    added, removed = rp.install_routes([ROUTE_AB, ROUTE_BC])
+    assert len(added) == 1 and removed == []
+    assert rp.loaded_router_routes == [ROUTE_AB, ROUTE_BC]
+
+    added, removed = rp.install_routes([ROUTE_BC])
+    assert added == [] and removed == [wire_ab]
+    assert wire_ab not in ecs.cmp_wires
+    assert rp.loaded_router_routes == [ROUTE_BC]
+
+
+def test_install_routes_maps_outbox_to_component_inbox():
+    eid = make_entity("a")
+    added, _ = rp.install_routes([ROUTE_AB])
+    src_inbox, src_ch, dst_ch, dst_inbox = added[0]
+    assert src_inbox == paths.canonical_folder("/a/inbox")
+    assert dst_inbox == paths.canonical_folder("/b/inbox")
+    assert (src_ch, dst_ch) == ("out1", "in1")
+    assert ecs.wires_touching_entity(eid) == {added[0]}
+
+
+def test_install_routes_skips_malformed_records():
+    added, _ = rp.install_routes([ROUTE_AB, {"source-folder": "/x"}])
+    assert len(added) == 1
+    assert rp.loaded_router_routes == [ROUTE_AB]
+
+
+def test_route_loaded_before_card_is_reprojected():
+    rp.install_routes([ROUTE_AB])
+    a = make_entity("a")
+    assert ecs.wires_touching_entity(a) == set()
+
+    added, removed = rp.sync_route_projection()
+    assert len(added) == 1 and len(removed) == 1
+    assert ecs.wires_touching_entity(a) == set(added)
+    assert len(ecs.cmp_wires) == 1
+    assert rp.sync_route_projection() == ([], [])
+
+
+def test_wire_cascaded_by_remove_entity_comes_back():
+    make_entity("a")
+    b = make_entity("b")
+    rp.install_routes([ROUTE_AB])
+    assert len(ecs.cmp_wires) == 1
+
+    ecs.remove_entity(b)           # re-ingest: old entity goes, wires cascade
+    make_entity("b")
+    assert len(ecs.cmp_wires) == 0
+    added, removed = rp.sync_route_projection()
+    assert len(added) == 1 and removed == []
+    assert len(ecs.cmp_wires) == 1
+    assert rp.install_routes([ROUTE_AB]) == ([], [])
+
+
+def test_reinstalling_same_routes_restores_missing_wire():
+    rp.install_routes([ROUTE_AB])
+    ecs.clear_wires()
+    added, _ = rp.install_routes([ROUTE_AB])
+    assert len(added) == 1 and len(ecs.cmp_wires) == 1
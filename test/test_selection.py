@@ -0,0 +1,174 @@
+import pytest
+
+from patchboard_atlas import selection
+from patchboard_atlas import rendering
+from patchboard_atlas import gui_scaffold
+from patchboard_atlas import tree_projection as tp
+from patchboard_atlas import component_registry as reg
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas.reset import reset
+from conftest import inbox_key, make_entity
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.idle = {}
+        self.next_id = 0
+
+    def after_idle(self, fn):
+        self.next_id += 1
+        idle_id = f"idle{self.next_id}"
+        self.idle[idle_id] = fn
+        return idle_id
+
+    def after_cancel(self, idle_id):
+        self.idle.pop(idle_id, None)
+
+    def run_idle(self):
+        idle, self.idle = self.idle, {}
+        for fn in idle.values():
+            fn()
+
+
+class Event:
+    def __init__(self, widget, x=0, y=0, state=0):
+        self.widget = widget
+        self.x = x
+        self.y = y
+        self.state = state
+
+
+@pytest.fixture(autouse=True)
+def syncs(monkeypatch):
+    reset()
+    cm.set_viewport(800, 600)
+    syncs = {"entities": [], "all": 0}
+    real_sync_entities = rendering.sync_entities
+
+    def sync_entities(eids):
+        syncs["entities"].append(list(eids))
+        real_sync_entities(eids)
+
+    def sync_all():
+        syncs["all"] += 1
+
+    monkeypatch.setattr(rendering, "sync_entities", sync_entities)
+    monkeypatch.setattr(rendering, "sync_all", sync_all)
+    monkeypatch.setattr(tp, "rebuild_tree", lambda: None)
+    monkeypatch.setattr(gui_scaffold, "set_status", lambda message, color: None)
+    yield syncs
+    reset()
+
+
+def test_band_selects_intersecting_entities():
+    a = make_entity(None, 0, 0, card=False)
+    b = make_entity(None, 200, 0, card=False)
+    make_entity(None, 0, 400, card=False)
+    canvas = FakeCanvas()
+
+    selection.begin_band(Event(canvas, 380, 280))   # world (-20, -20)
+    selection.on_band_motion(Event(canvas, 500, 310))
+    selection.on_band_motion(Event(canvas, 560, 320))
+    assert len(canvas.idle) == 1
+    canvas.run_idle()
+    band = rendering.RENDER[selection.BAND_OWNER + ("rect",)]
+    assert (band["x0"], band["y0"], band["x1"], band["y1"]) == (-20, -20, 160, 20)
+
+    selection.on_band_release(Event(canvas, 560, 320))
+    assert selection.selected() == (a, b)
+    assert selection.BAND_OWNER + ("rect",) not in rendering.RENDER
+
+
+def test_band_handles_reverse_drag_and_shift_adds():
+    a = make_entity(None, 0, 0, card=False)
+    b = make_entity(None, 300, 300, card=False)
+    canvas = FakeCanvas()
+    selection.select((a,))
+
+    selection.begin_band(Event(canvas, 720, 620, state=0x0001))
+    selection.on_band_release(Event(canvas, 680, 580))
+    assert selection.selected() == (a, b)
+
+
+def test_empty_click_clears_selection():
+    a = make_entity(None, 0, 0, card=False)
+    selection.select((a,))
+    canvas = FakeCanvas()
+    selection.begin_band(Event(canvas, 700, 50))
+    selection.on_band_release(Event(canvas, 700, 50))
+    assert selection.selected() == ()
+
+
+def test_selection_outline_flows_through_render_intent():
+    a = make_entity(None, 0, 0, card=False)
+    rendering.rebuild_render_intent()
+    selection.select((a,))
+    assert rendering.RENDER[("entity", a, "perimeter")]["outline"] == rendering.SELECTED_OUTLINE
+    selection.clear_selection()
+    assert rendering.RENDER[("entity", a, "perimeter")]["outline"] == rendering.PERIMETER_OUTLINE
+
+
+def test_bulk_move_is_one_mutation_pass_and_one_sync(syncs):
+    eids = [make_entity(None, i * 10, 0, card=False) for i in range(50)]
+    other = make_entity(None, 5000, 5000, card=False)
+    rendering.rebuild_render_intent()
+
+    moved = selection.bulk_move(eids, 7, -3)
+    assert moved == eids
+    assert syncs["entities"] == [eids]
+    assert ecs.cmp_spatial[eids[10]] == {"x": 107, "y": -3}
+    assert ecs.cmp_spatial[other] == {"x": 5000, "y": 5000}
+    assert rendering.RENDER[("entity", eids[10], "perimeter")]["x0"] == 107 - rendering.COMPONENT_W // 2
+
+
+def test_bulk_move_skips_unplaced():
+    a = make_entity(None, 0, 0, card=False)
+    b = make_entity(None, 0, 0, card=False)
+    del ecs.cmp_spatial[b]
+    assert selection.bulk_move([a, b], 1, 1) == [a]
+    assert b not in ecs.cmp_spatial
+
+
+def test_bulk_move_rerenders_wires_between_moved_entities():
+    a = make_entity("a", 0, 0, register=True)
+    b = make_entity("b", 500, 0, register=True)
+    wire_id = (inbox_key("a"), "out1", "in1", inbox_key("b"))
+    ecs.add_wire(wire_id)
+    rendering.rebuild_render_intent()
+
+    selection.bulk_move([a, b], 0, 100)
+    coords = rendering.RENDER[("wire", wire_id, "body")]["coords"]
+    assert coords[1] == 100 and coords[3] == 100
+
+
+def test_bulk_unplace(syncs):
+    a = make_entity(None, 0, 0, card=False)
+    b = make_entity(None, 300, 0, card=False)
+    rendering.rebuild_render_intent()
+    selection.select((a, b))
+
+    selection.unplace_selected()
+    assert a not in ecs.cmp_spatial and b not in ecs.cmp_spatial
+    assert a in ecs.cmp_entities
+    assert syncs["entities"][-1] == [a, b]
+    assert ("entity", a, "perimeter") not in rendering.RENDER
+    assert selection.selected() == ()
+
+
+def test_bulk_remove_drops_entities_cards_and_wires(syncs, tmp_path, monkeypatch):
+    from patchboard_atlas import paths
+    monkeypatch.setattr(paths, "component_id_cards_dir", lambda: tmp_path)
+    a = make_entity("a", 0, 0, register=True)
+    b = make_entity("b", 500, 0, register=True)
+    c = make_entity("c", 0, 500, register=True)
+    ecs.add_wire((inbox_key("a"), "out1", "in1", inbox_key("b")))
+    ecs.add_wire((inbox_key("b"), "out1", "in1", inbox_key("c")))
+    selection.select((a, b))
+
+    selection.remove_selected()
+    assert ecs.cmp_entities == {c}
+    assert set(reg.loaded_component_id_cards) == {inbox_key("c")}
+    assert len(ecs.cmp_wires) == 0
+    assert syncs["all"] == 1
+    assert selection.selected() == ()
@@ -0,0 +1,80 @@
+import pytest
+
+from patchboard_atlas import text_metrics as tm
+from patchboard_atlas import rendering
+from patchboard_atlas import gui_scaffold
+from patchboard_atlas.reset import reset
+from conftest import make_entity
+
+
+FONT = ("Consolas", 10)
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    reset()
+
+
+class CountingFont:
+    def __init__(self):
+        self.calls = 0
+
+    def measure(self, text):
+        self.calls += 1
+        return 7 * len(text)
+
+
+@pytest.fixture
+def tk_font(monkeypatch):
+    font = CountingFont()
+    monkeypatch.setitem(gui_scaffold.widgets, "root", object())
+    monkeypatch.setitem(tm.g_fonts, FONT, font)
+    return font
+
+
+def test_estimate_without_tk():
+    assert tm.measure(FONT, "") == 0
+    assert tm.measure(FONT, "abcde") == round(5 * tm.ESTIMATE_EM * 10 * 4 / 3)
+    assert tm.estimate_width(("Consolas", -12), "ab") == round(2 * tm.ESTIMATE_EM * 12)
+
+
+def test_measure_pays_once_per_distinct_text(tk_font):
+    for _ in range(3):
+        assert tm.measure(FONT, "hello") == 35
+    assert tk_font.calls == 1
+    assert tm.g_stats == {"hits": 2, "misses": 1}
+
+
+def test_lru_evicts_least_recently_used(tk_font, monkeypatch):
+    monkeypatch.setattr(tm, "MAX_ENTRIES", 2)
+    tm.measure(FONT, "a")
+    tm.measure(FONT, "b")
+    tm.measure(FONT, "a")          # "a" is now most recent
+    tm.measure(FONT, "c")
+    assert list(tm.g_width_cache) == [(FONT, "a"), (FONT, "c")]
+
+
+def test_fit_text(tk_font):
+    assert tm.fit_text(FONT, "short", 100) == "short"
+    fitted = tm.fit_text(FONT, "a-very-long-inbox-derived-title", 70)
+    assert fitted == "a-very-lo" + tm.ELLIPSIS
+    assert 7 * len(fitted) <= 70
+    calls = tk_font.calls
+    assert tm.fit_text(FONT, "a-very-long-inbox-derived-title", 70) == fitted
+    assert tk_font.calls == calls
+    assert (FONT, "a-very-lo" + tm.ELLIPSIS) not in tm.g_width_cache
+
+
+def test_fit_text_degenerate_width(tk_font):
+    assert tm.fit_text(FONT, "abc", 1) == tm.ELLIPSIS
+
+
+def test_rule_title_truncates_long_titles():
+    title = "/srv/patchboard/components/very-long-component-name/inbox"
+    eid = make_entity(title, 0, 0, ch_in=(), ch_out=())
+    rendering.rebuild_render_intent()
+    text = rendering.RENDER[("entity", eid, "title")]["text"]
+    assert text.endswith(tm.ELLIPSIS) and title.startswith(text[:-1])
+    assert tm.measure(rendering.TITLE_FONT, text) <= rendering.COMPONENT_W - rendering.TITLE_PAD
@@ -0,0 +1,196 @@
+import json
+
+import pytest
+import lionscliapp as app
+
+from patchboard_atlas import paths
+from patchboard_atlas import persist_queue
+from patchboard_atlas import workspace as ws
+from patchboard_atlas import ecs_world as ecs
+from patchboard_atlas import coord_machine as cm
+from patchboard_atlas import component_registry as reg
+from patchboard_atlas.reset import reset
+
+
+@pytest.fixture(autouse=True)
+def clean_state(tmp_path):
+    reset()
+    app.reset()
+    app.declare_app("test", "0.1")
+    app.declare_projectdir(".patchboard-atlas")
+    app.execroot.set_execroot(tmp_path)
+
+
+def card(name):
+    return {
+        "schema_version": 1,
+        "title": name,
+        "inbox": f"/{name}/inbox",
+        "outbox": f"/{name}/outbox",
+        "channels": {"in": ["a"], "out": ["b"]},
+    }
+
+
+def persist_cards(*names):
+    folder = paths.component_id_cards_dir()
+    folder.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (folder / f"{name}.json").write_text(json.dumps(card(name)), encoding="utf-8")
+
+
+def build_world():
+    persist_cards("alpha", "beta", "gamma")
+    reg.load_persisted_cards()
+    alpha = reg.find_entity_by_inbox(reg.canonical_inbox_key("/alpha/inbox"))
+    gamma = reg.find_entity_by_inbox(reg.canonical_inbox_key("/gamma/inbox"))
+    ecs.cmp_spatial[alpha] = {"x": 10, "y": -20}
+    ecs.cmp_spatial[gamma] = {"x": 300, "y": 40}
+    cm.g_cam["x"] = 55
+    cm.g_cam["y"] = -7
+    cm.set_zoom(3, 2)
+    return alpha, gamma
+
+
+def world_state():
+    placed = {ecs.cmp_card_ref[eid]["title"]: dict(ecs.cmp_spatial[eid]) for eid in ecs.cmp_spatial}
+    titles = sorted(card["title"] for card in ecs.cmp_card_ref.values())
+    return titles, placed, dict(cm.g_cam)
+
+
+def restart():
+    """Drop in-memory state as if the process restarted."""
+    reset()
+
+
+def test_encode_decode_round_trip():
+    alpha, gamma = build_world()
+    meta, spatial = ws.decode_snapshot(ws.encode_snapshot())
+    assert sorted(spatial) == sorted([(alpha, 10, -20), (gamma, 300, 40)])
+    assert meta["cam"] == {"x": 55, "y": -7, "zoom-num": 3, "zoom-den": 2}
+    assert len(meta["cards"]) == 3
+
+
+def test_decode_rejects_corruption():
+    build_world()
+    data = bytearray(ws.encode_snapshot())
+    data[20] ^= 0xFF
+    with pytest.raises(ValueError):
+        ws.decode_snapshot(bytes(data))
+    with pytest.raises(ValueError):
+        ws.decode_snapshot(b"junk")
+
+
+def test_full_restore_reproduces_world_without_reading_cards(monkeypatch):
+    build_world()
+    before = world_state()
+    next_id = ecs.g["next_entity_id"]
+    ws.save_snapshot()
+    restart()
+
+    monkeypatch.setattr(reg, "load_persisted_cards", lambda: pytest.fail("cards re-ingested"))
+    assert ws.restore_snapshot() == "full"
+    assert world_state() == before
+    assert ecs.g["next_entity_id"] == next_id
+    for eid, card_obj in ecs.cmp_card_ref.items():
+        assert reg.loaded_component_id_cards[reg.canonical_inbox_key(card_obj["inbox"])] is card_obj
+
+
+def test_changed_card_files_restore_layout_only():
+    build_world()
+    before = world_state()
+    ws.save_snapshot()
+    persist_cards("delta")
+    restart()
+
+    assert ws.restore_snapshot() == "layout"
+    titles, placed, cam = world_state()
+    assert titles == ["alpha", "beta", "delta", "gamma"]
+    assert placed == before[1]
+    assert cam == before[2]
+
+
+def test_missing_or_corrupt_snapshot_falls_back_to_cards():
+    persist_cards("alpha")
+    assert ws.restore_snapshot() == "cards"
+    assert len(ecs.cmp_card_ref) == 1
+
+    restart()
+    paths.workspace_file().write_bytes(b"garbage")
+    assert ws.restore_snapshot() == "cards"
+    assert len(ecs.cmp_card_ref) == 1
+
+
+def test_save_is_atomic_and_leaves_no_temp_file():
+    build_world()
+    ws.save_snapshot()
+    assert sorted(p.name for p in paths.project_dir().iterdir() if p.is_file()) == ["workspace.snapshot"]
+
+
+def test_autosave_is_debounced():
+    ws.restore_snapshot()
+    ws.save_snapshot()
+    saves = ws.g["saves"]
+
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 1, "y": 1}
+    assert ws.save_if_due(now=100.0) is False
+    ecs.cmp_spatial.set_xy(eid, 2, 2)
+    assert ws.save_if_due(now=100.5) is False
+    assert ws.save_if_due(now=101.6) is True
+    assert ws.g["saves"] == saves + 1
+    assert ws.save_if_due(now=200.0) is False
+
+
+def test_autosave_max_delay_under_continuous_change():
+    ws.restore_snapshot()
+    ws.save_snapshot()
+    eid = ecs.allocate_entity()
+    saved = False
+    for step in range(100):
+        ecs.cmp_spatial.set_xy(eid, step, 0)
+        saved = ws.save_if_due(now=10.0 + step * 0.5) or saved
+        if saved:
+            break
+    assert saved
+    assert step * 0.5 >= ws.MAX_DELAY_S
+
+
+def test_autosave_waits_for_pending_card_writes(monkeypatch):
+    ws.restore_snapshot()
+    ws.save_snapshot()
+    saves = ws.g["saves"]
+    eid = ecs.allocate_entity()
+    ecs.cmp_spatial[eid] = {"x": 1, "y": 1}
+    monkeypatch.setattr(persist_queue, "pending_count", lambda: 3)
+    monkeypatch.setattr(persist_queue, "flush_persist_queue", lambda: pytest.fail("Tk thread blocked"))
+    assert ws.save_if_due(now=100.0) is False
+    assert ws.save_if_due(now=101.5) is False
+    monkeypatch.undo()
+    assert ws.save_if_due(now=101.6) is True
+    assert ws.g["saves"] == saves + 1
+
+
+def test_autosave_under_sustained_card_writes(monkeypatch):
+    ws.restore_snapshot()
+    ws.save_snapshot()
+    saves = ws.g["saves"]
+    eid = ecs.allocate_entity()
+    flushes = []
+    monkeypatch.setattr(persist_queue, "pending_count", lambda: 1)
+    monkeypatch.setattr(persist_queue, "flush_persist_queue", lambda: flushes.append(1) or [])
+    step = 0
+    while step * 0.25 < ws.MAX_DELAY_S:
+        ecs.cmp_spatial.set_xy(eid, step, 0)  # never quiet, and the queue never drains
+        assert ws.save_if_due(now=100.0 + step * 0.25) is False
+        step += 1
+    assert ws.save_if_due(now=100.0 + step * 0.25) is True
+    assert ws.g["saves"] == saves + 1
+    assert flushes == [1]
+
+
+def test_camera_move_marks_dirty():
+    ws.restore_snapshot()
+    ws.save_snapshot()
+    assert ws.note_changes(now=49.0) is False
+    cm.g_cam["x"] = 999
+    assert ws.note_changes(now=50.0) is True